@@ -0,0 +1,183 @@
+import random
+import sys
+import time
+from bisect import bisect_right
+
+# Achievements defined as data and checked incrementally. Each rule is a
+# dict with a name, description, color and `when`: stat -> value, all of
+# which must be reached at the same time to earn it, e.g.
+#
+#   {"name": "Speed Demon", ..., "when": {"speed_level": 3, "streak": 5}}
+#
+# Stats are whole numbers the game reports through Tracker.update()
+# whenever one changes. RuleSet sorts every condition into a list of
+# thresholds per stat, and a Tracker keeps a pointer to the next threshold
+# of each stat that hasn't been reached. An update that stays below it,
+# which is nearly every update, costs one comparison however many rules
+# there are; one that reaches it only re-checks the rules whose thresholds
+# it passed. A stat may also go down (a broken streak), which moves its
+# pointer back so those thresholds can be crossed again.
+
+NOTHING = ()  # update() result when nothing was earned
+_END = float('inf')
+
+
+class RuleSet:
+    def __init__(self, rules, labels=None):
+        # labels: stat -> format string for describe(), e.g. '{} points'
+        self.rules = list(rules)
+        self.labels = labels or {}
+        self.by_name = {}
+        self.names = [rule['name'] for rule in self.rules]
+        self.needs = []  # per rule, its ((stat, value), ...) conditions
+        conditions = {}  # stat -> [(value, rule index)]
+        for index, rule in enumerate(self.rules):
+            name = rule['name']
+            if name in self.by_name:
+                raise ValueError(f'duplicate achievement {name!r}')
+            if not rule['when']:
+                raise ValueError(f'achievement {name!r} has no conditions')
+            self.by_name[name] = rule
+            for stat, value in rule['when'].items():
+                if value <= 0:
+                    raise ValueError(f'achievement {name!r}: {stat} must be positive')
+                conditions.setdefault(stat, []).append((value, index))
+            self.needs.append(tuple(rule['when'].items()))
+        self.thresholds = {}  # stat -> ascending values
+        self.owners = {}      # stat -> rule index of each threshold
+        for stat, entries in conditions.items():
+            entries.sort()
+            self.thresholds[stat] = [value for value, _ in entries]
+            self.owners[stat] = [index for _, index in entries]
+
+    def tracker(self, earned=None, **values):
+        # earned: set of names already earned, updated in place. values:
+        # starting stats (default 0); a rule already met by these is only
+        # earned once a stat crosses its threshold again.
+        return Tracker(self, set() if earned is None else earned, values)
+
+    def milestones(self, stat):
+        # [(value, name)] ascending, of the rules that only need `stat`
+        return sorted((rule['when'][stat], rule['name']) for rule in self.rules
+                      if len(rule['when']) == 1 and stat in rule['when'])
+
+    def describe(self, name):
+        # What a rule needs, e.g. '25 points' or 'speed level 3 + 5 hits'
+        return ' + '.join(self.labels.get(stat, stat + ' {}').format(value)
+                          for stat, value in self.by_name[name]['when'].items())
+
+
+class Tracker:
+    __slots__ = ('rules', 'earned', 'values', 'pointers', 'next')
+
+    def __init__(self, rules, earned, values):
+        self.rules = rules
+        self.earned = earned
+        self.values = dict.fromkeys(rules.thresholds, 0)
+        self.values.update(values)
+        self.pointers = {}
+        self.next = {}  # stat -> value that reaches its next threshold
+        for stat, thresholds in rules.thresholds.items():
+            self._seek(stat, bisect_right(thresholds, self.values[stat]))
+
+    def copy(self):
+        other = Tracker.__new__(Tracker)
+        other.rules = self.rules
+        other.earned = set(self.earned)
+        other.values = dict(self.values)
+        other.pointers = dict(self.pointers)
+        other.next = dict(self.next)
+        return other
+
+    def update(self, stat, value):
+        # Set a stat; returns a tuple of the names of achievements this
+        # earned, lowest threshold first
+        values = self.values
+        old = values.get(stat, 0)
+        values[stat] = value
+        target = self.next.get(stat)
+        if target is None:
+            return NOTHING  # no rule uses this stat
+        if value < target:
+            if value < old:
+                self._seek(stat, bisect_right(self.rules.thresholds[stat], value, 0, self.pointers[stat]))
+            return NOTHING
+
+        rules = self.rules
+        start = self.pointers[stat]
+        end = bisect_right(rules.thresholds[stat], value, start)
+        self._seek(stat, end)
+        earned = self.earned
+        names = rules.names
+        needs = rules.needs
+        new = []
+        for index in rules.owners[stat][start:end]:
+            name = names[index]
+            if name in earned:
+                continue
+            for s, v in needs[index]:
+                if values.get(s, 0) < v:
+                    break
+            else:
+                earned.add(name)
+                new.append(name)
+        return tuple(new)
+
+    def _seek(self, stat, pointer):
+        thresholds = self.rules.thresholds[stat]
+        self.pointers[stat] = pointer
+        self.next[stat] = thresholds[pointer] if pointer < len(thresholds) else _END
+
+
+def _scan(rules, earned, values):
+    # Check every rule on every update, for comparison in benchmark()
+    new = []
+    for rule in rules.rules:
+        if rule['name'] not in earned and all(values.get(s, 0) >= v for s, v in rule['when'].items()):
+            earned.add(rule['name'])
+            new.append(rule['name'])
+    return new
+
+
+def benchmark(count=10_000, hits=200_000):
+    # Per-hit cost of checking `count` generated rules over games that
+    # report score and streak on every hit, incrementally and by scanning
+    rng = random.Random(0)
+    stats = ('score', 'streak', 'speed_level', 'seconds')
+    rules = RuleSet({'name': f'rule{i}', 'when': {stat: rng.randrange(1, 2000)
+                                                   for stat in rng.sample(stats, rng.randrange(1, 3))}}
+                    for i in range(count))
+    updates = []
+    score = streak = 0
+    for _ in range(hits):
+        score = score + 1 if rng.random() > 0.001 else 0  # a new game
+        streak = streak + 1 if score and rng.random() > 0.1 else 0
+        updates.append((score, streak))
+
+    results = {'rules': count}
+    tracker = rules.tracker()
+    earned = 0
+    start = time.perf_counter()
+    for score, streak in updates:
+        earned += len(tracker.update('score', score))
+        earned += len(tracker.update('streak', streak))
+    results['incremental_ns_per_hit'] = (time.perf_counter() - start) / hits * 1e9
+    results['earned'] = earned
+
+    sample = updates[:hits // 100]
+    done = set()
+    values = {}
+    start = time.perf_counter()
+    for score, streak in sample:
+        values['score'] = score
+        _scan(rules, done, values)
+        values['streak'] = streak
+        _scan(rules, done, values)
+    results['scan_ns_per_hit'] = (time.perf_counter() - start) / len(sample) * 1e9
+    return results
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for name, value in benchmark(count).items():
+        print(f'{name:>24}: {value:,.0f}')
@@ -0,0 +1,262 @@
+import sys
+import time
+
+import numpy as np
+
+from paddle_physics import (
+    WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, HIT, MISS, NO_EVENTS,
+)
+
+# Headless rules for Bounce Master's arena mode: hundreds to thousands of
+# balls at once, bouncing off the walls, the paddle and each other. A ball
+# that gets past the paddle is gone; the game ends with the last one, and
+# every paddle hit scores a point. Like paddle_batch, the balls are kept as
+# one array per field so each rule is a few whole-array operations.
+#
+# Ball-ball contacts use a uniform grid broad phase: balls are sorted by the
+# grid cell (one ball diameter square) their centre is in, and each ball is
+# only tested against the balls in its own cell and four of its neighbours
+# (the other four are covered from the other side), found by binary search
+# in the sorted cells. That keeps the work near-linear in the number of
+# balls instead of testing every pair. Contacts are equal-mass elastic
+# collisions; overlapping balls are also pushed apart.
+
+BALL_RADIUS = 4
+MIN_SPEED, MAX_SPEED = 2.0, 4.0  # pixels per step; contacts never go faster
+MIN_SPEED_X = 1.0                # keeps every ball crossing the field
+COLORS = 4                       # ball colour indices, for the renderer
+
+# The half neighbourhood of a grid cell: itself, then right, down-left,
+# down and down-right
+_NEIGHBOURS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class Arena:
+    def __init__(self, balls, seed=None, radius=BALL_RADIUS, respawn=False):
+        # respawn: serve a lost ball again from the right instead of
+        # removing it, so the number of balls never changes (benchmarks)
+        self.radius = radius
+        self.respawn = respawn
+        self.rng = np.random.default_rng(seed)
+        self.paddle_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.score = 0
+        self.steps = 0
+        self.over = False
+        self.cell = 2 * radius
+        self.cols = -(-WIDTH // self.cell)
+        self.rows = -(-HEIGHT // self.cell)
+        self.x, self.y = self._spread(balls)
+        self.vx, self.vy = self._serve_velocity(balls)
+        self.color = self.rng.integers(0, COLORS, balls).astype(np.int8)
+
+    @property
+    def balls(self):
+        return len(self.x)
+
+    def _spread(self, n):
+        # Non-overlapping start positions: distinct random cells of a grid
+        # with a little more than a diameter between centres, filling the
+        # field from the right
+        gap = 2 * self.radius + 2
+        cols = (WIDTH - PADDLE_WIDTH - 2 * self.radius) // gap
+        rows = (HEIGHT - 2 * self.radius) // gap
+        if n > cols * rows:
+            raise ValueError(f'at most {cols * rows} balls fit in the arena')
+        # The rightmost cells that hold n balls with room to spare
+        used = min(cols, max(-(-2 * n // rows), cols // 3))
+        picks = self.rng.choice(used * rows, n, replace=False)
+        x = WIDTH - self.radius - 1 - (picks // rows) * gap
+        y = self.radius + 1 + (picks % rows) * gap
+        return x.astype(np.float64), y.astype(np.float64)
+
+    def _serve_velocity(self, n):
+        speed = self.rng.uniform(MIN_SPEED, MAX_SPEED, n)
+        angle = self.rng.uniform(0, 2 * np.pi, n)
+        vx = speed * np.cos(angle)
+        vx = np.where(np.abs(vx) < MIN_SPEED_X, np.copysign(MIN_SPEED_X, vx), vx)
+        return vx, speed * np.sin(angle)
+
+    def step(self, up, down):
+        # Advance one frame. Mutates the arena and returns a tuple of
+        # events: (HIT, score) when the paddle hit any balls, (MISS, balls
+        # left) when any got past it.
+        if self.over:
+            return NO_EVENTS
+        self.steps += 1
+        r = self.radius
+
+        # Paddle movement
+        if up and self.paddle_y > 0:
+            self.paddle_y -= PADDLE_SPEED
+        if down and self.paddle_y < HEIGHT - PADDLE_HEIGHT:
+            self.paddle_y += PADDLE_SPEED
+
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        old_x = x.copy()
+        x += vx
+        y += vy
+
+        # Walls: top, bottom and right reflect
+        low = y < r
+        y[low] = 2 * r - y[low]
+        vy[low] = np.abs(vy[low])
+        high = y > HEIGHT - r
+        y[high] = 2 * (HEIGHT - r) - y[high]
+        vy[high] = -np.abs(vy[high])
+        right = x > WIDTH - r
+        x[right] = 2 * (WIDTH - r) - x[right]
+        vx[right] = -np.abs(vx[right])
+
+        # Paddle face: balls crossing it this step within its height
+        face = PADDLE_WIDTH + r
+        hit = (x < face) & (old_x >= face) & (y > self.paddle_y - r) & (y < self.paddle_y + PADDLE_HEIGHT + r)
+        x[hit] = 2 * face - x[hit]
+        vx[hit] = np.abs(vx[hit])
+        hits = int(np.count_nonzero(hit))
+
+        self._collide()
+
+        # Contacts may have nudged balls into the walls
+        np.clip(y, r, HEIGHT - r, out=y)
+        np.minimum(x, WIDTH - r, out=x)
+
+        events = NO_EVENTS
+        if hits:
+            self.score += hits
+            events += ((HIT, self.score),)
+        lost = x < -r
+        if lost.any():
+            self._lose(lost)
+            events += ((MISS, self.balls),)
+        return events
+
+    def _lose(self, lost):
+        r = self.radius
+        if self.respawn:
+            n = int(np.count_nonzero(lost))
+            self.x[lost] = WIDTH - r - 1
+            self.y[lost] = self.rng.uniform(r, HEIGHT - r, n)
+            vx, vy = self._serve_velocity(n)
+            self.vx[lost] = -np.abs(vx)
+            self.vy[lost] = vy
+            return
+        keep = ~lost
+        self.x = self.x[keep]
+        self.y = self.y[keep]
+        self.vx = self.vx[keep]
+        self.vy = self.vy[keep]
+        self.color = self.color[keep]
+        if not len(self.x):
+            self.over = True
+
+    def pairs(self):
+        # Index arrays (i, j) of every pair of balls whose centres are less
+        # than a diameter apart; each pair once
+        x, y = self.x, self.y
+        n = len(x)
+        cell = self.cell
+        cols, rows = self.cols, self.rows
+        cx = np.clip((x // cell).astype(np.int64), 0, cols - 1)
+        cy = np.clip((y // cell).astype(np.int64), 0, rows - 1)
+        ids = cy * cols + cx
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+
+        # Every (ball, neighbour cell) to look up, with one binary search
+        # for where each cell's balls start and end in the sorted order
+        balls = np.tile(np.arange(n), len(_NEIGHBOURS))
+        dx = np.repeat([d[0] for d in _NEIGHBOURS], n)
+        dy = np.repeat([d[1] for d in _NEIGHBOURS], n)
+        nx = cx[balls] + dx
+        ny = cy[balls] + dy
+        valid = (nx >= 0) & (nx < cols) & (ny < rows)
+        balls = balls[valid]
+        targets = ny[valid] * cols + nx[valid]
+        own = (dx == 0)[valid] & (dy == 0)[valid]
+        start = np.searchsorted(sorted_ids, targets, 'left')
+        counts = np.searchsorted(sorted_ids, targets, 'right') - start
+
+        # Expand each lookup into one candidate pair per ball in the cell
+        total = int(counts.sum())
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        i = np.repeat(balls, counts)
+        j = order[np.repeat(start, counts) + np.arange(total) - first]
+        # Within a ball's own cell, each pair once and never with itself
+        keep = np.where(np.repeat(own, counts), i < j, True)
+        i = i[keep]
+        j = j[keep]
+        ddx = x[j] - x[i]
+        ddy = y[j] - y[i]
+        close = ddx * ddx + ddy * ddy < (2 * self.radius) ** 2
+        return i[close], j[close]
+
+    def _collide(self):
+        i, j = self.pairs()
+        if not len(i):
+            return
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        n = len(x)
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        dist = np.sqrt(dx * dx + dy * dy)
+        dist = np.maximum(dist, 1e-9)
+        nx = dx / dist
+        ny = dy / dist
+
+        # Equal masses: approaching pairs swap their velocity along the
+        # line between centres. Impulses from several contacts add up.
+        closing = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+        closing = np.minimum(closing, 0.0)
+        ix = closing * nx
+        iy = closing * ny
+        vx += np.bincount(i, ix, n) - np.bincount(j, ix, n)
+        vy += np.bincount(i, iy, n) - np.bincount(j, iy, n)
+        # A ball in several contacts at once can pick up more than its share,
+        # and the minimum x speed adds some too; cap it so crowds can't heat up
+        slow = np.abs(vx) < MIN_SPEED_X
+        if slow.any():
+            vx[slow] = np.where(vx[slow] < 0, -MIN_SPEED_X, MIN_SPEED_X)
+        speed = np.sqrt(vx * vx + vy * vy)
+        fast = speed > MAX_SPEED
+        if fast.any():
+            scale = MAX_SPEED / speed[fast]
+            vx[fast] *= scale
+            vy[fast] *= scale
+
+        # Push overlapping balls apart, half the overlap each
+        push = (2 * self.radius - dist) / 2
+        px = push * nx
+        py = push * ny
+        x += np.bincount(j, px, n) - np.bincount(i, px, n)
+        y += np.bincount(j, py, n) - np.bincount(i, py, n)
+
+    def sprite_positions(self):
+        # Top-left corner of every ball's sprite, as a list of (x, y)
+        r = self.radius
+        return list(zip((self.x - r).astype(np.int32).tolist(), (self.y - r).astype(np.int32).tolist()))
+
+
+def tracking_bot(arena):
+    # Follow the nearest ball still heading for the paddle
+    coming = arena.vx < 0
+    if not coming.any():
+        return False, False
+    target = arena.y[coming][np.argmin(arena.x[coming])]
+    middle = arena.paddle_y + PADDLE_HEIGHT // 2
+    return target < middle - PADDLE_SPEED, target > middle + PADDLE_SPEED
+
+
+def benchmark(balls=1000, steps=600):
+    # Physics steps per second with a constant number of balls
+    arena = Arena(balls, seed=0, respawn=True)
+    start = time.perf_counter()
+    for _ in range(steps):
+        arena.step(*tracking_bot(arena))
+    elapsed = time.perf_counter() - start
+    return steps / elapsed
+
+
+if __name__ == '__main__':
+    balls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    print(f'{benchmark(balls, steps):,.0f} steps/sec with {balls:,} balls')
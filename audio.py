@@ -0,0 +1,138 @@
+import io
+import math
+import sys
+import threading
+import time
+import wave
+from array import array
+
+import pygame
+
+# Sound effects and music for both games. Every effect is loaded once, from
+# its file or, if the file is missing, from a tone synthesized in memory,
+# and plays on a fixed pool of mixer channels taken in turn (the oldest
+# voice is cut off when all are busy). Playing an effect is a dict lookup
+# and a Channel.play(): nothing is loaded or allocated while the game runs.
+# load() is slow (mixer start-up, file decoding) and is meant to run off
+# the frame thread; until it is done every call here is a no-op.
+#
+# Effects are given as {name: (file, tone, volume)}, where tone is the
+# fallback (start Hz, end Hz, milliseconds): a sine sweep that fades out.
+
+VOICES = 8            # channels in the effect pool
+SAMPLE_RATE = 22050   # of synthesized tones; the mixer converts as needed
+AMPLITUDE = 12000     # peak of synthesized tones, out of 32767
+
+_tones = {}  # tone -> WAV bytes, shared by every AudioManager
+_tones_lock = threading.Lock()
+
+
+def synthesize(tone):
+    # WAV bytes for a (start Hz, end Hz, milliseconds) sweep, made once
+    with _tones_lock:
+        data = _tones.get(tone)
+        if data is not None:
+            return data
+        start_hz, end_hz, ms = tone
+        count = SAMPLE_RATE * ms // 1000
+        samples = array('h', bytes(2 * count))
+        phase = 0.0
+        for i in range(count):
+            t = i / count
+            phase += 2 * math.pi * (start_hz + (end_hz - start_hz) * t) / SAMPLE_RATE
+            samples[i] = int(AMPLITUDE * (1 - t) * math.sin(phase))
+        if sys.byteorder == 'big':
+            samples.byteswap()  # WAV data is little-endian
+        out = io.BytesIO()
+        with wave.open(out, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(samples.tobytes())
+        data = _tones[tone] = out.getvalue()
+        return data
+
+
+class AudioManager:
+    def __init__(self, effects, music=None, music_volume=0.5, voices=VOICES):
+        self.effects = effects
+        self.music = music
+        self.music_volume = music_volume
+        self.voices = voices
+        self.sounds = {}
+        self.channels = ()
+        self.next_voice = 0
+        self.has_music = False
+        self.music_on = False
+        self.ready = threading.Event()  # set once load() has finished
+        self.loaded_at = None           # time.perf_counter() when it did
+
+    def load(self):
+        # Start the mixer, then load or synthesize every effect and open the
+        # music stream. Safe to call from a background thread.
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error:
+            print("No audio device found; sound is off.")
+            self.loaded_at = time.perf_counter()
+            self.ready.set()
+            return
+        if pygame.mixer.get_num_channels() < self.voices:
+            pygame.mixer.set_num_channels(self.voices)
+        sounds = {}
+        for name, (path, tone, volume) in self.effects.items():
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError):
+                print(f"No sound file {path}; using a synthesized {name} sound.")
+                sound = pygame.mixer.Sound(file=io.BytesIO(synthesize(tone)))
+            sound.set_volume(volume)
+            sounds[name] = sound
+        if self.music is not None:
+            try:
+                pygame.mixer.music.load(self.music)
+                pygame.mixer.music.set_volume(self.music_volume)
+                self.has_music = True
+            except (pygame.error, FileNotFoundError):
+                print(f"No background music file found. Add '{self.music}' to enable music.")
+        # play() may run on the frame thread meanwhile: it only uses the
+        # channels once it finds a sound, so they must be there first
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.voices)]
+        self.sounds = sounds
+        self.loaded_at = time.perf_counter()
+        self.ready.set()
+        if self.music_on:
+            self.play_music()  # asked for while loading
+
+    def start(self):
+        # load() on a daemon thread
+        thread = threading.Thread(target=self.load, name='audio', daemon=True)
+        thread.start()
+        return thread
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        channels = self.channels
+        voice = self.next_voice
+        self.next_voice = (voice + 1) % len(channels)
+        channels[voice].play(sound)
+
+    def play_music(self):
+        # Loop the music from the start; remembered until load() is done
+        self.music_on = True
+        if self.has_music and self.ready.is_set():
+            pygame.mixer.music.play(-1)
+
+    def stop_music(self):
+        self.music_on = False
+        if self.has_music and self.ready.is_set():
+            pygame.mixer.music.stop()
+
+    def stop(self):
+        # Silence everything, e.g. before pygame.quit()
+        self.stop_music()
+        for channel in self.channels:
+            channel.stop()
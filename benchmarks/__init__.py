@@ -0,0 +1,120 @@
+import importlib
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+# Micro-benchmarks for the hot paths of both games, run headless. Each case
+# is a setup function returning a zero-argument callable that performs one
+# operation (a physics step, a frame, a HUD render, a save); the runner
+# times it with timeit and reports nanoseconds per operation. Results can be
+# written as JSON and compared against a stored baseline, where any case
+# slower than its baseline by more than its tolerance, and by more than
+# NOISE_NS, counts as a regression. Each side is the best of several runs.
+#
+#   python -m benchmarks                      run everything, print a table
+#   python -m benchmarks --json out.json      also write the results
+#   python -m benchmarks --save-baseline      record a new baseline
+#   python -m benchmarks paddle snake         only cases whose name contains
+#                                             one of the given words
+#
+# Timings are only comparable on the same machine, so re-record the
+# baseline when the hardware changes.
+
+# Run pygame without a window or sound card; must happen before it's imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+TOLERANCE = 0.4  # allowed slowdown against the baseline (0.4 = 40%)
+NOISE_NS = 500   # slowdowns smaller than this are timer and cache noise
+REPEAT = 5
+
+CASES = {}  # name -> (setup, tolerance or None for the default)
+CLEANUPS = []  # called once every case has run
+
+
+def case(name, tolerance=None):
+    def register(setup):
+        CASES[name] = (setup, tolerance)
+        return setup
+    return register
+
+
+def cleanup(fn):
+    # For setups that start threads or open files: fn runs after the last
+    # case, before the scratch directory is removed
+    CLEANUPS.append(fn)
+
+
+def measure(op, repeat=REPEAT):
+    # Best and median time per call over repeat runs of about 0.2s each
+    timer = timeit.Timer(op)
+    number, _ = timer.autorange()
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    return {'best_ns': times[0] * 1e9, 'median_ns': times[len(times) // 2] * 1e9, 'loops': number}
+
+
+def run(words=(), repeat=REPEAT):
+    # Runs the cases whose name contains one of words (all by default)
+    # inside a scratch directory, so the save benchmarks never touch the
+    # real high score or achievements
+    importlib.import_module('benchmarks.cases')  # registers the cases
+    import persistence
+
+    results = {}
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix='bench-')
+    os.chdir(scratch)
+    try:
+        for name, (setup, _) in CASES.items():
+            if not words or any(word in name for word in words):
+                results[name] = measure(setup(), repeat)
+        while CLEANUPS:
+            CLEANUPS.pop()()
+        persistence.flush()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE, noise_ns=NOISE_NS):
+    # (name, baseline ns, current ns) for every case slower than allowed.
+    # Cases missing from either side are skipped. Sub-microsecond cases
+    # swing by well over the tolerance from run to run, so a slowdown also
+    # has to exceed noise_ns in absolute terms.
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        allowed = CASES[name][1] if CASES[name][1] is not None else tolerance
+        limit = max(base['best_ns'] * (1 + allowed), base['best_ns'] + noise_ns)
+        if result['best_ns'] > limit:
+            regressions.append((name, base['best_ns'], result['best_ns']))
+    return regressions
+
+
+def format_ns(ns):
+    if ns >= 1e6:
+        return f'{ns / 1e6:.2f} ms'
+    if ns >= 1e3:
+        return f'{ns / 1e3:.2f} us'
+    return f'{ns:.0f} ns'
+
+
+def print_report(report, baseline=None, out=sys.stdout):
+    for name, result in report['results'].items():
+        line = f"{name:<28} {format_ns(result['best_ns']):>10}  (median {format_ns(result['median_ns'])})"
+        base = baseline and baseline['results'].get(name)
+        if base:
+            line += f"  {result['best_ns'] / base['best_ns'] - 1:+.0%} vs baseline"
+        print(line, file=out)
@@ -0,0 +1,54 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+import benchmarks
+
+parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Bounce Master benchmarks')
+parser.add_argument('words', nargs='*', help='only run cases whose name contains one of these')
+parser.add_argument('--json', metavar='FILE', help="write the results as JSON to FILE ('-' for stdout)")
+parser.add_argument('--baseline', default=benchmarks.BASELINE, help='baseline to compare against')
+parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+parser.add_argument('--tolerance', type=float, default=benchmarks.TOLERANCE,
+                    help='allowed slowdown against the baseline (default %(default)s)')
+parser.add_argument('--noise', type=float, default=benchmarks.NOISE_NS,
+                    help='slowdowns under this many nanoseconds never count (default %(default)s)')
+parser.add_argument('--repeat', type=int, default=benchmarks.REPEAT, help='timing runs per case')
+args = parser.parse_args()
+
+baseline = None
+if os.path.exists(args.baseline):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+# Keep stdout clean for the JSON when it goes there
+log = sys.stderr if args.json == '-' else sys.stdout
+with contextlib.redirect_stdout(log):
+    report = benchmarks.run(args.words, args.repeat)
+regressions = []
+if baseline and not args.save_baseline:
+    regressions = benchmarks.compare(report, baseline, args.tolerance, args.noise)
+report['regressions'] = [name for name, _, _ in regressions]
+benchmarks.print_report(report, baseline, log)
+
+if args.json == '-':
+    json.dump(report, sys.stdout, indent=2)
+    print()
+elif args.json:
+    with open(args.json, 'w') as f:
+        json.dump(report, f, indent=2)
+if args.save_baseline:
+    # Cases left out of this run keep their old baseline
+    results = dict(baseline['results']) if baseline else {}
+    results.update(report['results'])
+    with open(args.baseline, 'w') as f:
+        json.dump({'python': report['python'], 'platform': report['platform'],
+                   'results': results}, f, indent=2)
+        f.write('\n')
+    print(f'Baseline saved to {args.baseline}', file=log)
+
+for name, base, current in regressions:
+    print(f'REGRESSION {name}: {benchmarks.format_ns(base)} -> {benchmarks.format_ns(current)}', file=sys.stderr)
+sys.exit(1 if regressions else 0)
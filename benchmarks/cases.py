@@ -0,0 +1,253 @@
+import json
+import random
+
+import pygame
+
+import arena
+import audio
+import game_loop
+import paddle_physics
+import paddle_render
+import persistence
+import replay
+import snake_render
+import snake_rules
+import snake_world
+import text_cache
+import toasts
+from benchmarks import case, cleanup
+from paddle_physics import WIDTH, HEIGHT, ACHIEVEMENTS, YELLOW
+from snake_body import SnakeBody
+
+# The benchmark cases. Each setup builds its fixtures and returns the
+# operation to time; fixtures mirror what the games do per frame.
+
+RALLY_STEPS = 3000  # physics steps before a bot rally restarts
+
+_display = None
+
+
+def _screen():
+    global _display
+    if _display is None:
+        pygame.init()
+        _display = pygame.display.set_mode((WIDTH, HEIGHT))
+    return _display
+
+
+def _font():
+    _screen()
+    return pygame.font.SysFont('Arial', 24)
+
+
+def _rally():
+    # Bot-driven paddle game. The ball speeds up as the score climbs, so the
+    # game restarts every RALLY_STEPS steps to keep the timed work the same
+    # from run to run.
+    state = paddle_physics.GameState()
+    steps = 0
+
+    def advance():
+        nonlocal state, steps
+        steps += 1
+        if state.over or steps % RALLY_STEPS == 0:
+            state = paddle_physics.GameState()
+        return state, paddle_physics.step(state, *paddle_physics.tracking_bot(state))
+    return advance
+
+
+def _long_snake(width, height, length):
+    # Snake laid out row by row, as after a long game
+    cells = [(x if y % 2 == 0 else width - 1 - x, y) for y in range(height) for x in range(width)]
+    return SnakeBody(width, height, reversed(cells[:length]))
+
+
+@case('paddle.step')
+def paddle_step():
+    # One physics step, as paddle_game.play_game runs SIM_RATE times a second
+    return _rally()
+
+
+@case('paddle.frame')
+def paddle_frame():
+    # Everything play_game does for one frame apart from input and the
+    # clock: a physics step with recording, interpolation and a dirty redraw
+    rally = _rally()
+    font = _font()
+    renderer = paddle_render.DirtyRenderer(_screen(), font)
+    achievement_toasts = toasts.ToastQueue(font)
+    recorder = replay.Recorder(replay.PADDLE)
+    timestep = game_loop.FixedTimestep(60)
+    state, _ = rally()
+    view = paddle_render.InterpolatedView(state)
+    frame = 0
+
+    def op():
+        nonlocal view, frame
+        frame += 1
+        view.snapshot()
+        recorder.record(0)
+        state, events = rally()
+        if view.state is not state:
+            view = paddle_render.InterpolatedView(state)
+            renderer.invalidate()
+        for kind, value in events:
+            if kind == paddle_physics.ACHIEVEMENT:
+                achievement_toasts.push(value)
+        view.blend(timestep.alpha)
+        renderer.draw(view, 0, achievement_toasts.update(frame * 16))
+    return op
+
+
+@case('paddle.check_achievements')
+def check_achievements():
+    # The achievement updates of one paddle hit (score and streak), with
+    # the score climbing through the milestones game after game
+    tracker = paddle_physics.RULES.tracker()
+    score = 0
+
+    def op():
+        nonlocal score
+        score = score + 1 if score < 250 else 0
+        tracker.update('score', score)
+        tracker.update('streak', score % 20)
+    return op
+
+
+@case('arena.step')
+def arena_step():
+    # One arena physics step with 1,000 balls
+    game = arena.Arena(1000, seed=0, respawn=True)
+    return lambda: game.step(*arena.tracking_bot(game))
+
+
+@case('arena.frame')
+def arena_frame():
+    # One arena frame with 1,000 balls: a physics step and a full redraw
+    game = arena.Arena(1000, seed=0, respawn=True)
+    renderer = paddle_render.ArenaRenderer(_screen(), _font(), game.radius)
+
+    def op():
+        game.step(*arena.tracking_bot(game))
+        renderer.draw(game)
+    return op
+
+
+@case('snake.random_food')
+def random_food():
+    snake = _long_snake(20, 20, 200)
+    rng = random.Random(0)
+    return lambda: snake_rules.random_food(snake, rng)
+
+
+@case('snake.collision')
+def snake_collision():
+    # The `new_head in snake` check of every move, on a long snake
+    snake = _long_snake(20, 20, 200)
+    cells = [(x, y) for y in range(20) for x in range(20)]
+    i = 0
+
+    def op():
+        nonlocal i
+        i += 1
+        return cells[i % 400] in snake
+    return op
+
+
+@case('snake.world_frame')
+def snake_world_frame():
+    # A frame of snake_game --world on a 10,000 x 10,000 world with a
+    # 100,000-cell snake: a move with its incremental redraw every fourth
+    # frame, and the camera blit (a 30 x 20 cell view fills the display)
+    state = snake_render.coiled_state(10_000, 10_000, 100_000)
+    renderer = snake_render.WorldRenderer(_screen(), 30, 20)
+    frame = 0
+
+    def op():
+        nonlocal state, frame
+        frame += 1
+        if frame % 4 == 0:
+            snake_world.step(state, snake_world.food_bot(state))
+            if state.over:
+                state = snake_render.coiled_state(10_000, 10_000, 100_000)
+                renderer.invalidate()
+            renderer.moved(state)
+        renderer.draw(state, (frame % 4) / 4)
+    return op
+
+
+@case('audio.play')
+def audio_play():
+    # A paddle hit's sound effect, on the dummy audio driver: a channel
+    # from the pool and a synthesized blip
+    sounds = audio.AudioManager({'hit': ('missing.wav', (880, 660, 60), 0.3)})
+    sounds.load()
+    return lambda: sounds.play('hit')
+
+
+@case('render.hud_font')
+def hud_font():
+    # The three HUD lines rasterised with font.render every frame, the way
+    # the play screen used to draw them
+    font = _font()
+    state = paddle_physics.GameState()
+
+    def op():
+        for line in paddle_render.hud_lines(state, 0):
+            font.render(line, True, YELLOW)
+    return op
+
+
+@case('render.hud_cached')
+def hud_cached():
+    # The same HUD through text_cache, with the score changing every 60
+    # frames (about a paddle hit a second)
+    font = _font()
+    state = paddle_physics.GameState()
+    frame = 0
+
+    def op():
+        nonlocal frame
+        frame += 1
+        state.score = frame // 60
+        for line in paddle_render.hud_lines(state, 0):
+            text_cache.render(font, line, True, YELLOW)
+    return op
+
+
+@case('storage.save_achievements')
+def save_achievements():
+    # Frame-thread cost of paddle_game.save_achievements (the disk write
+    # happens on the persistence thread)
+    import paddle_game
+
+    persistence.get_writer()
+    earned = {achievement['name'] for achievement in ACHIEVEMENTS}
+    return lambda: paddle_game.save_achievements(earned)
+
+
+@case('storage.record_score')
+def record_score():
+    # Frame-thread cost of saving a score at game over, as PlayScene does:
+    # record() and a flush() that hands the batch to the writer thread
+    import leaderboard
+
+    board = leaderboard.Leaderboard('bench.db', background=True)
+    board.preload('bench', 'player')
+    cleanup(board.close)
+    score = 0
+
+    def op():
+        nonlocal score
+        score = (score + 7) % 1000
+        board.record('bench', 'player', score)
+        board.flush()
+    return op
+
+
+@case('storage.atomic_write', tolerance=1.0)
+def atomic_write():
+    # The writer thread's own cost per file: temp file, fsync and rename.
+    # Disk latency is noisy, hence the loose tolerance.
+    data = json.dumps([achievement['name'] for achievement in ACHIEVEMENTS])
+    return lambda: persistence.atomic_write('achievements.json', data)
@@ -0,0 +1,50 @@
+import json
+import os
+import threading
+
+import pygame
+
+import persistence
+
+# Font lookup that only scans the system fonts once. pygame.font.SysFont
+# builds its table of installed fonts the first time it is called, which
+# can take seconds (it runs fc-list on Linux). The resolved file for each
+# font name is remembered in FONT_CACHE, so later starts open the file
+# directly; a cached file that has since gone away is looked up again.
+
+FONT_CACHE = 'font_cache.json'
+
+_paths = None  # name -> font file, or None for pygame's default font
+_lock = threading.Lock()
+
+
+def _load_cache():
+    global _paths
+    if _paths is None:
+        persistence.recover(FONT_CACHE)
+        try:
+            with open(FONT_CACHE, 'r') as f:
+                _paths = json.load(f)
+        except (OSError, ValueError):
+            _paths = {}
+    return _paths
+
+
+def resolve(name):
+    # Font file for a system font name (None: not installed, use the default)
+    with _lock:
+        paths = _load_cache()
+        if name in paths and (paths[name] is None or os.path.exists(paths[name])):
+            return paths[name]
+    path = pygame.font.match_font(name)
+    with _lock:
+        paths[name] = path
+        persistence.write_json(FONT_CACHE, paths)
+    return path
+
+
+def load(name, size):
+    # Same as pygame.font.SysFont(name, size), minus the system font scan
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(resolve(name), size)
@@ -0,0 +1,196 @@
+import json
+import time
+import tracemalloc
+from collections import deque
+
+import pygame
+
+import fonts
+
+# Opt-in instrumentation for the game loops, to find out where frame time
+# goes when the game stutters. The loop calls start_frame() at the top of
+# each frame, lap(phase) as each phase finishes and end_frame() once the
+# frame is on screen; time since the previous lap is charged to the phase.
+#
+# The last WINDOW frames are kept per phase for rolling p50/p95/p99. One
+# frame in ALLOC_EVERY runs under tracemalloc and records how many blocks
+# it left allocated and its peak traced memory; tracing slows everything
+# down, so those frames are left out of the timings. F3 toggles an on-screen
+# panel with the figures, and every frame can be logged as one JSON line.
+
+PHASES = ('wait', 'events', 'physics', 'achievements', 'draw', 'flip')
+WINDOW = 600        # frames in the rolling percentiles (10 s at 60 FPS)
+ALLOC_EVERY = 60    # frames between allocation samples
+REFRESH_EVERY = 15  # frames between overlay updates
+TOGGLE_KEY = pygame.K_F3
+
+PANEL_BACKGROUND = (0, 0, 0)
+PANEL_TEXT = (200, 255, 200)
+PANEL_WARN = (255, 200, 64)  # frame p99 over budget
+MARGIN = 4
+
+
+def percentiles(values):
+    # (p50, p95, p99, max) of a sequence, in the same units
+    if not values:
+        return (0.0, 0.0, 0.0, 0.0)
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return (ordered[last // 2], ordered[last * 95 // 100], ordered[last * 99 // 100], ordered[last])
+
+
+class FrameProfiler:
+    def __init__(self, log_path=None, window=WINDOW, alloc_every=ALLOC_EVERY, fps=60, visible=True):
+        # visible: show the panel from the start (F3 toggles it either way)
+        self.times = {phase: deque(maxlen=window) for phase in PHASES + ('frame',)}
+        self.allocs = deque(maxlen=max(1, window // alloc_every))  # (blocks, bytes, peak)
+        self.alloc_every = alloc_every
+        self.budget = 1.0 / fps if fps else None
+        self.log = open(log_path, 'w') if log_path else None
+        self.frame = 0
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.started = self.last = 0.0
+        self.sampling = False  # this frame is an allocation sample
+        self.tracing = False   # tracemalloc was started here and not stopped yet
+        self.visible = visible
+        # Loaded up front: a font lookup the first time the panel is shown
+        # would itself be a stutter in the middle of a game
+        self.font = fonts.load('monospace', 13)
+        self.panel = None
+
+    def start_frame(self):
+        # Also discards a frame that was never ended (pause, game over)
+        self._stop_tracing()
+        self.frame += 1
+        for phase in PHASES:
+            self.current[phase] = 0.0
+        self.sampling = bool(self.alloc_every and self.frame % self.alloc_every == 0
+                             and not tracemalloc.is_tracing())
+        if self.sampling:
+            tracemalloc.start()
+            self.tracing = True
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        total = time.perf_counter() - self.started
+        record = None
+        if self.log is not None:
+            record = {'frame': self.frame, 'ms': round(total * 1000, 3),
+                      'phases': {phase: round(t * 1000, 3) for phase, t in self.current.items()}}
+        if self.sampling:
+            blocks = len(tracemalloc.take_snapshot().traces)
+            size, peak = tracemalloc.get_traced_memory()
+            self._stop_tracing()
+            self.allocs.append((blocks, size, peak))
+            if record is not None:
+                record['alloc'] = {'blocks': blocks, 'bytes': size, 'peak': peak}
+        else:
+            times = self.times
+            for phase, t in self.current.items():
+                times[phase].append(t)
+            times['frame'].append(total)
+        if record is not None:
+            self.log.write(json.dumps(record) + '\n')
+        if self.visible and (self.panel is None or self.frame % REFRESH_EVERY == 0):
+            self.panel = self._render_panel()
+
+    def abort_frame(self):
+        # The frame won't be ended (the loop is leaving early): drop it, and
+        # stop tracing if it was an allocation sample
+        self._stop_tracing()
+
+    def _stop_tracing(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        self.sampling = False
+
+    def stats(self):
+        # {phase or 'frame': (p50, p95, p99, max) in ms}
+        return {name: tuple(t * 1000 for t in percentiles(times))
+                for name, times in self.times.items()}
+
+    def handle_event(self, event):
+        # True if the event toggled the overlay; the caller should repaint
+        # whatever it covered
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.visible = not self.visible
+            self.panel = None
+            return True
+        return False
+
+    def draw(self, screen):
+        # Blit the overlay at the top right; returns its rect, or None when
+        # hidden
+        if not self.visible or self.panel is None:
+            return None
+        rect = self.panel.get_rect(topright=(screen.get_width() - MARGIN, MARGIN))
+        screen.blit(self.panel, rect)
+        return rect
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+        self._stop_tracing()
+
+    def _render_panel(self):
+        stats = self.stats()
+        lines = [('ms      p50   p95   p99   max', PANEL_TEXT)]
+        for name in ('frame',) + PHASES:
+            p50, p95, p99, worst = stats[name]
+            over = name == 'frame' and self.budget and p99 > self.budget * 1000
+            lines.append((f'{name[:6]:<6}{p50:6.2f}{p95:6.2f}{p99:6.2f}{worst:6.1f}',
+                          PANEL_WARN if over else PANEL_TEXT))
+        if self.allocs:
+            blocks, size, peak = self.allocs[-1]
+            lines.append((f'alloc {blocks} blk {size // 1024}K pk {peak // 1024}K', PANEL_TEXT))
+        # Opaque background: the dirty renderer blits the panel over its
+        # previous copy, which would darken a translucent one every frame
+        surfaces = [self.font.render(text, True, color, PANEL_BACKGROUND) for text, color in lines]
+        width = max(surface.get_width() for surface in surfaces) + 2 * MARGIN
+        height = sum(surface.get_height() for surface in surfaces) + 2 * MARGIN
+        panel = pygame.Surface((width, height))
+        panel.fill(PANEL_BACKGROUND)
+        y = MARGIN
+        for surface in surfaces:
+            panel.blit(surface, (MARGIN, y))
+            y += surface.get_height()
+        return panel
+
+
+class NullProfiler:
+    # Stands in for FrameProfiler when profiling is off
+    def start_frame(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def abort_frame(self):
+        pass
+
+    def handle_event(self, event):
+        return False
+
+    def draw(self, screen):
+        return None
+
+    def close(self):
+        pass
+
+
+def create(enabled, log_path=None, fps=60):
+    # FrameProfiler when enabled (or logging), otherwise a no-op stand-in.
+    # Logging alone starts with the panel hidden.
+    if enabled or log_path:
+        return FrameProfiler(log_path, fps=fps, visible=enabled)
+    return NullProfiler()
@@ -0,0 +1,42 @@
+import time
+
+# Fixed-timestep accumulator shared by the game loops. The simulation always
+# advances in steps of exactly 1 / step_rate seconds, however fast or slow
+# frames are rendered, so game speed no longer depends on machine load and
+# the same inputs always give the same result. Under load a frame simply runs
+# several steps (frames are skipped, not slowed down); alpha tells the
+# renderer how far it is between the last two steps for interpolation.
+
+
+class FixedTimestep:
+    def __init__(self, step_rate, max_steps_per_frame=8, clock=time.perf_counter):
+        self.step_time = 1.0 / step_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+
+    def reset(self):
+        # Forget elapsed time, e.g. after a pause, so we don't catch up on it
+        self.accumulator = 0.0
+        self.last = None
+
+    def advance(self):
+        # Number of simulation steps to run this frame
+        now = self.clock()
+        if self.last is not None:
+            self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps_per_frame:
+            # Too far behind to catch up: drop the backlog instead of
+            # spending ever longer frames on it
+            steps = self.max_steps_per_frame
+            self.accumulator = steps * self.step_time
+        self.accumulator -= steps * self.step_time
+        return steps
+
+    @property
+    def alpha(self):
+        # Fraction of a step elapsed since the last one, in [0, 1)
+        return self.accumulator / self.step_time
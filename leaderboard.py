@@ -0,0 +1,393 @@
+import csv
+import getpass
+import os
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Leaderboard shared by both games, in SQLite (WAL mode, so a reader never
+# waits for the writer). Every finished game is a row in `scores`, which
+# gives each player a history; `best` holds each player's best score per
+# game and is what rankings are based on.
+#
+# Writes are batched: record() only queues the score and flush() (or
+# reaching BATCH_SIZE) inserts the whole batch in one transaction. Reads
+# are served from memory where possible: each game keeps a count of
+# players per best score in a Fenwick tree, so the rank of any score or
+# player is a few list lookups however many rows there are, and top-K
+# lists are cached and kept up to date as scores come in.
+#
+# A game's frame thread must not touch disk, so the games open the board
+# with background=True: flush() then hands the batch to a writer thread
+# with its own connection and returns at once. After preload(game, player)
+# at the menu, record(), best(), rank(), players() and high_score() for that
+# game are served from memory.
+
+DB_FILE = 'leaderboard.db'
+BATCH_SIZE = 256  # queued scores that trigger a flush
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (game, player, played_at);
+CREATE TABLE IF NOT EXISTS best (
+    game TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (game, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS best_by_score ON best (game, score DESC);
+'''
+
+UPSERT_BEST = '''
+INSERT INTO best (game, player, score) VALUES (?, ?, ?)
+ON CONFLICT (game, player) DO UPDATE SET score = excluded.score WHERE excluded.score > best.score
+'''
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return 'player'
+
+
+class ScoreCounts:
+    # Number of players at each best score, as a Fenwick tree over score
+    # values, so "how many players scored more than s" is O(log max score)
+    def __init__(self, size=1024):
+        self.tree = [0] * (size + 1)
+
+    def add(self, score, count=1):
+        if score < 0:
+            raise ValueError('scores must not be negative')
+        while score + 1 >= len(self.tree):
+            self._grow()
+        i = score + 1
+        tree = self.tree
+        while i < len(tree):
+            tree[i] += count
+            i += i & -i
+
+    def count_at_most(self, score):
+        i = min(score + 1, len(self.tree) - 1)
+        total = 0
+        tree = self.tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.count_at_most(len(self.tree) - 2)
+
+    def count_above(self, score):
+        if score < 0:
+            return self.total()
+        return self.total() - self.count_at_most(score)
+
+    def _grow(self):
+        # Rebuild at double the size; tree nodes depend on the size
+        old = self.tree
+        counts = [self.count_at_most(s) - self.count_at_most(s - 1) if s else self.count_at_most(0)
+                  for s in range(len(old) - 1)]
+        self.tree = [0] * (2 * (len(old) - 1) + 1)
+        for score, count in enumerate(counts):
+            if count:
+                self.add(score, count)
+
+
+def _connect(path):
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.executescript(SCHEMA)
+    return db
+
+
+def _write_batch(db, scores, best):
+    with db:
+        db.executemany('INSERT INTO scores (game, player, score, played_at) VALUES (?, ?, ?, ?)', scores)
+        db.executemany(UPSERT_BEST, best)
+
+
+class _Writer:
+    # Thread that writes flushed batches through its own connection (an
+    # SQLite connection belongs to the thread that made it)
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='leaderboard', daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def put(self, scores, best):
+        self.queue.put((scores, best))
+
+    def join(self):
+        # Block until every batch handed over so far is written
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        db = _connect(self.path)
+        self.ready.set()
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                db.close()
+                self.queue.task_done()
+                return
+            try:
+                _write_batch(db, *batch)
+            except sqlite3.Error as e:
+                print(f"Could not save scores to {self.path}: {e}")
+            self.queue.task_done()
+
+
+class Leaderboard:
+    def __init__(self, path=DB_FILE, background=False):
+        # background: write on a thread of its own (needs a file path, not
+        # ':memory:', since the writer opens its own connection)
+        self.db = _connect(path)
+        self.pending = []       # (game, player, score, played_at)
+        self.pending_best = {}  # (game, player) -> best including pending
+        self.best_cache = {}    # (game, player) -> best score, None if none
+        self.counts = {}        # game -> ScoreCounts, loaded on first use
+        self.top_cache = {}     # game -> (k, [(player, score)])
+        self.writer = _Writer(path) if background else None
+
+    def close(self):
+        self.sync()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.db.close()
+
+    def preload(self, game, player, k=10):
+        # Load what record() and the rank and best lookups need for one
+        # player, so a game can call them from its frame loop
+        self._counts(game)
+        self.top(game, k)
+        self.best(game, player)
+
+    # Writing
+
+    def record(self, game, player, score, played_at=None):
+        entry = (game, player, score, time.time() if played_at is None else played_at)
+        self.pending.append(entry)
+        old = self.best(game, player)
+        if old is None or score > old:
+            self.pending_best[game, player] = score
+            self.best_cache[game, player] = score
+            counts = self.counts.get(game)
+            if counts is not None:
+                if old is not None:
+                    counts.add(old, -1)
+                counts.add(score)
+            cached = self.top_cache.get(game)
+            if cached is not None:
+                # The player moves up (or onto) the list; whoever falls off
+                # the end is no longer in the top k
+                k, rows = cached
+                rows = [row for row in rows if row[0] != player] + [(player, score)]
+                rows.sort(key=lambda row: (-row[1], row[0]))
+                self.top_cache[game] = (k, rows[:k])
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        # Write the queued scores; with a background writer, hand them over
+        # and return straight away
+        if not self.pending:
+            return
+        best = [(game, player, score) for (game, player), score in self.pending_best.items()]
+        if self.writer is not None:
+            self.writer.put(self.pending, best)
+        else:
+            _write_batch(self.db, self.pending, best)
+        self.pending = []
+        self.pending_best = {}
+
+    def sync(self):
+        # flush() and wait until everything is on disk, before reading
+        # from the database
+        self.flush()
+        if self.writer is not None:
+            self.writer.join()
+
+    def bulk_import(self, rows):
+        # Many (game, player, score, played_at) rows at once, in one
+        # transaction; much faster than record() for migrations
+        self.sync()
+        best = {}
+        for game, player, score, _ in rows:
+            if score > best.get((game, player), -1):
+                best[game, player] = score
+        with self.db:
+            self.db.executemany('INSERT INTO scores (game, player, score, played_at) VALUES (?, ?, ?, ?)', rows)
+            self.db.executemany(UPSERT_BEST, [(game, player, score) for (game, player), score in best.items()])
+        self.counts.clear()
+        self.top_cache.clear()
+        self.best_cache.clear()
+
+    # Reading
+
+    def best(self, game, player):
+        # The player's best score, or None if they have never played
+        key = (game, player)
+        if key in self.best_cache:
+            return self.best_cache[key]
+        self.sync()
+        row = self.db.execute('SELECT score FROM best WHERE game = ? AND player = ?', key).fetchone()
+        best = self.best_cache[key] = row[0] if row else None
+        return best
+
+    def top(self, game, k=10):
+        # [(player, best score)] best first
+        cached = self.top_cache.get(game)
+        if cached is not None and cached[0] >= k:
+            return cached[1][:k]
+        self.sync()
+        rows = self.db.execute('SELECT player, score FROM best WHERE game = ? ORDER BY score DESC, player LIMIT ?',
+                               (game, k)).fetchall()
+        self.top_cache[game] = (k, rows)
+        return rows
+
+    def high_score(self, game):
+        rows = self.top(game, 1)
+        return rows[0][1] if rows else 0
+
+    def rank_of_score(self, game, score):
+        # Place a best score of `score` holds (1 = top); ties share a place
+        return self._counts(game).count_above(score) + 1
+
+    def rank(self, game, player):
+        best = self.best(game, player)
+        return None if best is None else self.rank_of_score(game, best)
+
+    def players(self, game):
+        return self._counts(game).total()
+
+    def history(self, game, player, limit=20):
+        # [(score, played_at)] most recent first
+        self.sync()
+        return self.db.execute('SELECT score, played_at FROM scores WHERE game = ? AND player = ? '
+                               'ORDER BY played_at DESC LIMIT ?', (game, player, limit)).fetchall()
+
+    def _counts(self, game):
+        counts = self.counts.get(game)
+        if counts is None:
+            self.sync()
+            counts = ScoreCounts()
+            for score, count in self.db.execute('SELECT score, COUNT(*) FROM best WHERE game = ? GROUP BY score',
+                                                (game,)):
+                counts.add(score, count)
+            self.counts[game] = counts
+        return counts
+
+
+def import_highscore_file(board, path, game, player=None):
+    # One-off migration of the old single-number high score file; skipped
+    # once the game has any scores on the board
+    if not os.path.exists(path) or board.top(game, 1):
+        return False
+    try:
+        with open(path, 'r') as f:
+            score = int(f.read())
+    except ValueError:
+        return False
+    board.record(game, player or default_player(), score, os.path.getmtime(path))
+    board.flush()
+    return True
+
+
+def import_csv(board, path):
+    # Rows of game,player,score[,played_at]
+    now = time.time()
+    with open(path, newline='') as f:
+        rows = [(row[0], row[1], int(row[2]), float(row[3]) if len(row) > 3 else now)
+                for row in csv.reader(f) if row]
+    board.bulk_import(rows)
+    return len(rows)
+
+
+def benchmark(rows=1_000_000, players=100_000, lookups=10_000):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        board = Leaderboard(os.path.join(tmp, 'bench.db'))
+        rng = random.Random(0)
+        data = [('paddle', f'player{rng.randrange(players)}', int(rng.expovariate(1 / 30)), i)
+                for i in range(rows)]
+        start = time.perf_counter()
+        board.bulk_import(data)
+        results['bulk_import_rows_per_sec'] = rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        board.players('paddle')
+        results['rank_index_load_ms'] = (time.perf_counter() - start) * 1000
+
+        names = [f'player{rng.randrange(players)}' for _ in range(lookups)]
+        start = time.perf_counter()
+        for name in names:
+            board.rank('paddle', name)
+        results['rank_of_player_us'] = (time.perf_counter() - start) / lookups * 1e6
+
+        start = time.perf_counter()
+        for name in names:
+            board.rank_of_score('paddle', rng.randrange(200))
+        results['rank_of_score_us'] = (time.perf_counter() - start) / lookups * 1e6
+
+        board.top_cache.clear()
+        start = time.perf_counter()
+        board.top('paddle', 10)
+        results['top10_uncached_ms'] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(lookups):
+            board.top('paddle', 10)
+        results['top10_cached_us'] = (time.perf_counter() - start) / lookups * 1e6
+
+        start = time.perf_counter()
+        for name in names[:1000]:
+            board.history('paddle', name)
+        results['history_us'] = (time.perf_counter() - start) / 1000 * 1e6
+
+        start = time.perf_counter()
+        for i, name in enumerate(names):
+            board.record('paddle', name, rng.randrange(100), rows + i)
+        board.flush()
+        results['record_batched_us'] = (time.perf_counter() - start) / lookups * 1e6
+        board.close()
+    return results
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['import'] and len(sys.argv) == 3:
+        board = Leaderboard()
+        print(f'Imported {import_csv(board, sys.argv[2])} scores into {DB_FILE}')
+        board.close()
+    elif sys.argv[1:2] == ['top']:
+        board = Leaderboard()
+        game = sys.argv[2] if len(sys.argv) > 2 else 'paddle'
+        for place, (player, score) in enumerate(board.top(game, 10), 1):
+            print(f'{place:>3}. {player:<20} {score}')
+    elif sys.argv[1:2] in ([], ['benchmark']):
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+        for name, value in benchmark(rows).items():
+            print(f'{name:>26}: {value:,.2f}')
+    else:
+        print('usage: leaderboard.py [benchmark [ROWS] | import FILE.csv | top [GAME]]')
+        sys.exit(2)
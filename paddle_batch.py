@@ -0,0 +1,192 @@
+import sys
+import time
+
+import numpy as np
+
+from paddle_physics import (
+    WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, PADDLE_SPEED,
+    BALL_SPEED_X, BALL_SPEED_Y, RULES,
+)
+
+# NumPy version of paddle_physics.step() that advances many independent games
+# in lockstep. State is kept as one array per field (structure of arrays) so
+# every rule is a handful of whole-array operations instead of a Python loop
+# per game. Results match paddle_physics.step() game for game, apart from
+# the achievements noted below.
+
+# Achievements as a bitmask: bit i is the i-th score milestone in ascending
+# order. Only achievements that need nothing but a score are tracked here;
+# streak, speed and time rules are left to paddle_physics.
+MILESTONES = np.array([value for value, _ in RULES.milestones('score')], dtype=np.int32)
+ACHIEVEMENT_NAMES = [name for _, name in RULES.milestones('score')]
+# Bits earned once a score has passed the first k milestones
+_PREFIX_BITS = (np.int64(1) << np.arange(len(MILESTONES) + 1, dtype=np.int64)) - 1
+
+# Actions
+UP, STAY, DOWN = -1, 0, 1
+
+
+def achievement_bits(names):
+    bits = 0
+    for i, name in enumerate(ACHIEVEMENT_NAMES):
+        if name in names:
+            bits |= 1 << i
+    return bits
+
+
+class BatchGame:
+    def __init__(self, n, earned_achievements=None):
+        self.n = n
+        self.paddle_y = np.empty(n, dtype=np.int32)
+        self.ball_x = np.empty(n, dtype=np.int32)
+        self.ball_y = np.empty(n, dtype=np.int32)
+        self.ball_vel_x = np.empty(n, dtype=np.int32)
+        self.ball_vel_y = np.empty(n, dtype=np.int32)
+        self.score = np.empty(n, dtype=np.int32)
+        self.speed_level = np.empty(n, dtype=np.int32)
+        self.earned = np.empty(n, dtype=np.int64)
+        self.over = np.empty(n, dtype=bool)
+        self.initial_earned = achievement_bits(earned_achievements or ())
+        self.reset()
+
+    def reset(self, mask=None):
+        # Restart every game, or only the games selected by a boolean mask
+        idx = slice(None) if mask is None else mask
+        self.paddle_y[idx] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.ball_x[idx] = WIDTH // 2
+        self.ball_y[idx] = HEIGHT // 2
+        self.ball_vel_x[idx] = -BALL_SPEED_X
+        self.ball_vel_y[idx] = BALL_SPEED_Y
+        self.score[idx] = 0
+        self.speed_level[idx] = 1
+        self.earned[idx] = self.initial_earned
+        self.over[idx] = False
+
+    def step(self, actions):
+        # actions: int array of UP/STAY/DOWN, one per game.
+        # Returns per-game paddle hit counts, boolean masks (miss, level_up)
+        # and the bitmask of achievements each game unlocked this step.
+        live = ~self.over
+        paddle_y = self.paddle_y
+        ball_x = self.ball_x
+        ball_y = self.ball_y
+        vel_x = self.ball_vel_x
+        vel_y = self.ball_vel_y
+
+        # Paddle movement
+        paddle_y -= PADDLE_SPEED * ((actions < 0) & live & (paddle_y > 0))
+        paddle_y += PADDLE_SPEED * ((actions > 0) & live & (paddle_y < HEIGHT - PADDLE_HEIGHT))
+
+        # Ball movement, swept against walls and the paddle face exactly as
+        # in paddle_physics.step (finished games stay frozen)
+        start_y = ball_y.copy()
+        start_vel_y = vel_y.copy()
+        new_y, new_vel_y = _bounce(ball_y + vel_y, vel_y, 0, HEIGHT - BALL_SIZE)
+        ball_y[:] = np.where(live, new_y, ball_y)
+        vel_y[:] = np.where(live, new_vel_y, vel_y)
+        new_x = ball_x + vel_x
+        hits = np.zeros(self.n, dtype=np.int32)
+        contact = live & ((new_x <= PADDLE_WIDTH) | (new_x > WIDTH - BALL_SIZE))
+        if contact.any():
+            new_x, new_vel_x, hits = _sweep_x(contact, ball_x, new_x, vel_x, start_y, start_vel_y, paddle_y)
+            vel_x[:] = new_vel_x
+        ball_x[:] = np.where(live, new_x, ball_x)
+
+        # Ball collision with paddle. A speed-up takes effect from the next step.
+        new_bits = np.zeros(self.n, dtype=np.int64)
+        level_up = np.zeros(self.n, dtype=bool)
+        hit = hits > 0
+        if hit.any():
+            self.score += hits
+            level_up = self._level_up(hit)
+            reached = _PREFIX_BITS[np.searchsorted(MILESTONES, self.score, side='right')]
+            new_bits = np.where(hit, reached & ~self.earned, 0)
+            self.earned |= new_bits
+
+        # Ball out of bounds (game over)
+        miss = live & (ball_x < 0)
+        self.over |= miss
+        return hits, miss, level_up, new_bits
+
+    def _level_up(self, hit):
+        # Increase ball speed every 10 points
+        new_level = self.score // 10 + 1
+        level_up = hit & (new_level > self.speed_level)
+        if level_up.any():
+            self.speed_level[level_up] = new_level[level_up]
+            level = self.speed_level
+            vel_x = self.ball_vel_x
+            vel_y = self.ball_vel_y
+            vel_x[:] = np.where(level_up, np.where(vel_x > 0, BALL_SPEED_X, -BALL_SPEED_X) * level, vel_x)
+            vel_y[:] = np.where(level_up, np.where(vel_y > 0, BALL_SPEED_Y, -BALL_SPEED_Y) * level, vel_y)
+        return level_up
+
+    def tracking_actions(self):
+        # Vectorised paddle_physics.tracking_bot
+        centre = self.paddle_y + PADDLE_HEIGHT // 2
+        target = self.ball_y + BALL_SIZE // 2
+        return ((target > centre + PADDLE_SPEED).astype(np.int8) -
+                (target < centre - PADDLE_SPEED).astype(np.int8))
+
+
+def _bounce(pos, vel, lo, hi):
+    # Vectorised paddle_physics._bounce
+    span = hi - lo
+    k, u = np.divmod(pos - lo, span)
+    contacts = np.where(k > 0, k, np.where(u == 0, 1 - k, -k))
+    pos = np.where(k % 2 == 1, hi - u, lo + u)
+    return pos, np.where(contacts % 2 == 1, -vel, vel)
+
+
+def _sweep_x(pending, start, end, vel_x, ball_y, vel_y, paddle_y):
+    # Vectorised paddle_physics._sweep_x. Every pass handles the next
+    # contact of each game still moving into the paddle face or right wall;
+    # more than one pass is only needed at extreme speeds.
+    start = start.astype(np.int64)
+    end = end.astype(np.int64)
+    vel_x = vel_x.astype(np.int64)
+    speed = np.abs(vel_x)
+    travelled = np.zeros_like(start)
+    hits = np.zeros_like(start)
+    while True:
+        to_paddle = pending & (vel_x < 0) & (end <= PADDLE_WIDTH) & (start > PADDLE_WIDTH)
+        to_wall = pending & (vel_x > 0) & (end > WIDTH - BALL_SIZE)
+        if not (to_paddle.any() or to_wall.any()):
+            break
+        travelled = np.where(to_paddle, travelled + start - PADDLE_WIDTH, travelled)
+        y = _bounce(ball_y + vel_y * travelled / speed, vel_y, 0, HEIGHT - BALL_SIZE)[0]
+        hit = to_paddle & (paddle_y < y + BALL_SIZE) & (y < paddle_y + PADDLE_HEIGHT)
+        travelled = np.where(to_wall, travelled + WIDTH - BALL_SIZE - start, travelled)
+        start = np.where(hit, PADDLE_WIDTH, np.where(to_wall, WIDTH - BALL_SIZE, start))
+        end = np.where(hit, 2 * PADDLE_WIDTH - end, np.where(to_wall, 2 * (WIDTH - BALL_SIZE) - end, end))
+        bounced = hit | to_wall
+        vel_x = np.where(bounced, -vel_x, vel_x)
+        hits += hit
+        pending = bounced
+    return end, vel_x, hits
+
+
+def achievement_events(new_bits):
+    # Expand the per-game bitmasks from step() into (game index, name) pairs
+    events = []
+    for i, name in enumerate(ACHIEVEMENT_NAMES):
+        for game in np.flatnonzero(new_bits & (1 << i)):
+            events.append((int(game), name))
+    return events
+
+
+def benchmark(n=10_000, steps=1_000):
+    games = BatchGame(n)
+    start = time.perf_counter()
+    for _ in range(steps):
+        games.step(games.tracking_actions())
+        if games.over.any():
+            games.reset(games.over)
+    elapsed = time.perf_counter() - start
+    return n * steps / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    print(f'{benchmark(n, steps):,.0f} game-steps/sec across {n:,} games')
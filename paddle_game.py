@@ -1,410 +1,482 @@
+import time
+_import_started = time.perf_counter()  # for --startup-time
+
 import pygame
-import sys
+import argparse
+import os
 import json
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
-
-# Game settings
-WIDTH, HEIGHT = 600, 400
-PADDLE_WIDTH, PADDLE_HEIGHT = 10, 60
-BALL_SIZE = 15
-PADDLE_SPEED = 6
-BALL_SPEED_X, BALL_SPEED_Y = 4, 4
-FPS = 60
-
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BLUE = (30, 144, 255)
-GREEN = (0, 255, 128)
-RED = (255, 64, 64)
-YELLOW = (255, 255, 0)
-ORANGE = (255, 165, 0)
-
-# Set up display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Bounce Master')
-clock = pygame.time.Clock()
-font = pygame.font.SysFont('Arial', 24)
-small_font = pygame.font.SysFont('Arial', 16)
+import arena
+import audio
+import fonts
+import frame_profiler
+import game_loop
+import leaderboard
+import paddle_physics
+import paddle_render
+import persistence
+import replay
+import scenes
+import text_cache
+import toasts
+# Game settings, colors and achievements are shared with the headless engine
+from paddle_physics import (
+    WIDTH, HEIGHT, WHITE, BLUE, GREEN, YELLOW, ACHIEVEMENTS, RULES,
+)
+
+# Physics runs at a fixed SIM_RATE (ball speeds are pixels per step) no
+# matter how fast frames are drawn; RENDER_FPS caps the draw rate (0 = no cap)
+SIM_RATE = paddle_physics.STEPS_PER_SECOND
+RENDER_FPS = 60
+# 'dirty' only repaints what changed; 'full' redraws and flips every frame
+RENDER_MODE = 'dirty'
+# Balls served at the start of an arena game (--arena-balls)
+ARENA_BALLS = 500
+
+# Display, clock and fonts are created by init(), not at import. Sounds
+# load on a background thread while the menu is already up (a synthesized
+# blip stands in for a missing hit.wav).
+screen = None
+clock = None
+font = None
+small_font = None
+sounds = audio.AudioManager({'hit': ('hit.wav', (880, 660, 60), 0.3)}, music='background_music.mp3')
+
+# Directory to save a replay log of each game in (--record DIR)
+record_dir = None
+# Frame profiler overlay (--profile, F3 toggles) and per-frame JSONL log
+# (--profile-log FILE)
+profile = False
+profile_log = None
+# Print how long the first menu frame took to appear, then quit
+# (--startup-time)
+startup_time = False
+startup_marks = {}  # step -> seconds since import started
+
+# Scores go to the leaderboard shared with snake_game, under this player
+# name (--player)
+GAME = 'paddle'
+player = leaderboard.default_player()
+board = None
 
 # Music settings
 music_enabled = True
-try:
-    # Try to load background music (you can add your own music file)
-    pygame.mixer.music.load('background_music.mp3')  # Add your music file here
-    pygame.mixer.music.set_volume(0.5)
-except:
-    print("No background music file found. Add 'background_music.mp3' to enable music.")
-
-# Sound effects
-try:
-    hit_sound = pygame.mixer.Sound('hit.wav')  # Add your sound file here
-    hit_sound.set_volume(0.3)
-except:
-    hit_sound = None
-    print("No hit sound file found. Add 'hit.wav' to enable sound effects.")
-
-# Achievement system
-ACHIEVEMENTS = {
-    1: {"name": "First Hit", "description": "Score your first point", "color": GREEN},
-    5: {"name": "Beginner", "description": "Score 5 points", "color": YELLOW},
-    10: {"name": "Amateur", "description": "Score 10 points", "color": ORANGE},
-    25: {"name": "Pro", "description": "Score 25 points", "color": RED},
-    50: {"name": "Master", "description": "Score 50 points", "color": BLUE},
-    100: {"name": "Legend", "description": "Score 100 points", "color": GREEN},
-    200: {"name": "Unstoppable", "description": "Score 200 points", "color": YELLOW}
-}
+
+def init():
+    global screen, clock, font, small_font
+    if screen is not None:
+        return
+    startup_marks['imports'] = time.perf_counter() - _import_started
+    # Only what the menu needs; pygame.init() would also bring up audio,
+    # joysticks and the rest before the first frame
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Bounce Master')
+    clock = pygame.time.Clock()
+    startup_marks['display'] = time.perf_counter() - _import_started
+    font = fonts.load('Arial', 24)
+    small_font = fonts.load('Arial', 16)
+    startup_marks['fonts'] = time.perf_counter() - _import_started
+    sounds.start()
+
+def report_startup():
+    startup_marks['first frame'] = time.perf_counter() - _import_started
+    if sounds.ready.wait(5):
+        startup_marks['audio'] = sounds.loaded_at - _import_started
+    for step, seconds in sorted(startup_marks.items(), key=lambda item: item[1]):
+        print(f'{step:>12}: {seconds * 1000:7.1f} ms')
 
 def load_achievements():
+    persistence.recover('achievements.json')
     try:
         with open('achievements.json', 'r') as f:
-            return json.load(f)
+            return set(json.load(f))
     except:
-        return []
+        return set()
 
 def save_achievements(achievements):
-    with open('achievements.json', 'w') as f:
-        json.dump(achievements, f)
-
-def check_achievements(score, earned_achievements):
-    new_achievements = []
-    for milestone, achievement in ACHIEVEMENTS.items():
-        if score >= milestone and achievement["name"] not in earned_achievements:
-            new_achievements.append(achievement["name"])
-            earned_achievements.append(achievement["name"])
-    return new_achievements, earned_achievements
-
-def show_achievement_popup(achievement_name, color):
-    # Show achievement popup for 3 seconds
-    start_time = pygame.time.get_ticks()
-    while pygame.time.get_ticks() - start_time < 3000:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        
-        # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        
-        # Achievement popup
-        popup_width, popup_height = 300, 100
-        popup_x = (WIDTH - popup_width) // 2
-        popup_y = (HEIGHT - popup_height) // 2
-        
-        pygame.draw.rect(screen, color, (popup_x, popup_y, popup_width, popup_height))
-        pygame.draw.rect(screen, WHITE, (popup_x, popup_y, popup_width, popup_height), 3)
-        
-        # Achievement text
-        title_text = font.render("ACHIEVEMENT UNLOCKED!", True, WHITE)
-        achievement_text = font.render(achievement_name, True, WHITE)
-        
-        screen.blit(title_text, (popup_x + (popup_width - title_text.get_width()) // 2, popup_y + 20))
-        screen.blit(achievement_text, (popup_x + (popup_width - achievement_text.get_width()) // 2, popup_y + 50))
-        
-        pygame.display.flip()
-        clock.tick(FPS)
-
-def show_achievements_screen(earned_achievements):
-    screen.fill(BLUE)
-    title_text = font.render('ACHIEVEMENTS', True, YELLOW)
-    screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
-    
-    y_pos = 120
-    for milestone, achievement in ACHIEVEMENTS.items():
-        if achievement["name"] in earned_achievements:
-            # Earned achievement
-            color = achievement["color"]
-            status = "✓ EARNED"
+    # Written atomically on the persistence thread, never on the frame thread
+    persistence.write_json('achievements.json', sorted(achievements))
+
+class InfoScene(scenes.Scene):
+    # A static screen that any key leaves
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.stack.pop()
+
+    def draw_back_hint(self, screen, y):
+        back_text = text_cache.render(font, 'Press any key to go back', True, WHITE)
+        screen.blit(back_text, (WIDTH // 2 - back_text.get_width() // 2, y))
+
+class AchievementsScene(InfoScene):
+    def __init__(self, earned_achievements):
+        super().__init__()
+        self.earned_achievements = earned_achievements
+
+    def draw(self, screen):
+        screen.fill(BLUE)
+        title_text = text_cache.render(font, 'ACHIEVEMENTS', True, YELLOW)
+        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
+
+        y_pos = 120
+        for achievement in ACHIEVEMENTS:
+            if achievement["name"] in self.earned_achievements:
+                # Earned achievement
+                color = achievement["color"]
+                status = "✓ EARNED"
+            else:
+                # Locked achievement
+                color = WHITE
+                status = f"Locked ({RULES.describe(achievement['name'])} needed)"
+
+            name_text = text_cache.render(font, achievement["name"], True, color)
+            desc_text = text_cache.render(small_font, achievement["description"], True, WHITE)
+            status_text = text_cache.render(small_font, status, True, color)
+
+            screen.blit(name_text, (50, y_pos))
+            screen.blit(desc_text, (50, y_pos + 25))
+            screen.blit(status_text, (50, y_pos + 40))
+
+            y_pos += 70
+
+        self.draw_back_hint(screen, HEIGHT - 50)
+
+class HighScoreScene(InfoScene):
+    def draw(self, screen):
+        screen.fill(BLUE)
+        title_text = text_cache.render(font, 'HIGH SCORE', True, YELLOW)
+        score_text = text_cache.render(font, f'{board.high_score(GAME)}', True, GREEN)
+        best = board.best(GAME, player)
+        if best is None:
+            rank_line = f'{player}: no games yet'
         else:
-            # Locked achievement
-            color = WHITE
-            status = f"Locked ({milestone} points needed)"
-        
-        name_text = font.render(achievement["name"], True, color)
-        desc_text = small_font.render(achievement["description"], True, WHITE)
-        status_text = small_font.render(status, True, color)
-        
-        screen.blit(name_text, (50, y_pos))
-        screen.blit(desc_text, (50, y_pos + 25))
-        screen.blit(status_text, (50, y_pos + 40))
-        
-        y_pos += 70
-    
-    back_text = font.render('Press any key to go back', True, WHITE)
-    screen.blit(back_text, (WIDTH // 2 - back_text.get_width() // 2, HEIGHT - 50))
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                waiting = False
+            rank_line = f'{player}: best {best}, rank #{board.rank(GAME, player)} of {board.players(GAME)}'
+        rank_text = text_cache.render(small_font, rank_line, True, WHITE)
+
+        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
+        screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 200))
+        screen.blit(rank_text, (WIDTH // 2 - rank_text.get_width() // 2, 240))
+        self.draw_back_hint(screen, HEIGHT - 100)
+
+class InstructionsScene(InfoScene):
+    def draw(self, screen):
+        screen.fill(BLUE)
+        title_text = text_cache.render(font, 'INSTRUCTIONS', True, YELLOW)
+        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
+
+        instructions = [
+            'Use UP/DOWN arrow keys to move your paddle',
+            'Hit the ball with your paddle to score points',
+            'Don\'t let the ball pass your paddle!',
+            'Try to beat your high score!',
+            'Press SPACEBAR to pause the game',
+            'Earn achievements by reaching score milestones!',
+            'Ball speed increases every 10 points!',
+            'Toggle music in the main menu'
+        ]
+
+        for i, instruction in enumerate(instructions):
+            text = text_cache.render(font, instruction, True, WHITE)
+            y_pos = 120 + i * 40
+            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y_pos))
+
+        self.draw_back_hint(screen, HEIGHT - 100)
+
+class MessageScene(scenes.Scene):
+    # Lines of text on a blank screen. Closes on `key` (None: any key), or
+    # after `duration` ms when given, ignoring keys.
+    def __init__(self, lines, key=None, duration=None):
+        super().__init__()
+        self.lines = lines  # [(text, color)]
+        self.key = key
+        self.until = None if duration is None else pygame.time.get_ticks() + duration
+
+    def draw(self, screen):
+        screen.fill(BLUE)
+        y = HEIGHT // 2 - 20 * len(self.lines)
+        for line, color in self.lines:
+            text = text_cache.render(font, line, True, color)
+            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y))
+            y += 40
+
+    def timeout(self):
+        if self.until is None:
+            return 0
+        return max(1, self.until - pygame.time.get_ticks())
+
+    def handle(self, event):
+        if self.until is not None:
+            if pygame.time.get_ticks() >= self.until:
+                self.stack.pop()
+        elif event.type == pygame.KEYDOWN and (self.key is None or event.key == self.key):
+            self.stack.pop()
 
 def toggle_music():
     global music_enabled
     music_enabled = not music_enabled
     if music_enabled:
-        try:
-            pygame.mixer.music.play(-1)  # Loop music
-        except:
-            pass
+        sounds.play_music()
     else:
-        pygame.mixer.music.stop()
+        sounds.stop_music()
 
-def main():
-    # High score handling
-    highscore_file = 'highscore.txt'
-    try:
-        with open(highscore_file, 'r') as f:
-            high_score = int(f.read())
-    except:
-        high_score = 0
+class MenuScene(scenes.Scene):
+    def __init__(self, earned_achievements, profiler):
+        super().__init__()
+        self.earned_achievements = earned_achievements
+        self.profiler = profiler
+        self.selected_option = 0
 
-    # Load achievements
-    earned_achievements = load_achievements()
+    def options(self):
+        return ['Play Game', 'Arena', 'High Score', 'Achievements', 'Music: ON' if music_enabled else 'Music: OFF',
+                'Instructions', 'Quit']
 
-    # Home screen menu
-    menu_options = ['Play Game', 'High Score', 'Achievements', 'Music: ON' if music_enabled else 'Music: OFF', 'Instructions', 'Quit']
-    selected_option = 0
-    menu_running = True
-    
-    while menu_running:
+    def draw(self, screen):
         screen.fill(BLUE)
-        
+
         # Title
-        title_text = font.render('BOUNCE MASTER', True, YELLOW)
+        title_text = text_cache.render(font, 'BOUNCE MASTER', True, YELLOW)
         screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
-        
+
         # Menu options
-        for i, option in enumerate(menu_options):
-            color = GREEN if i == selected_option else WHITE
-            text = font.render(option, True, color)
-            y_pos = 150 + i * 50
+        for i, option in enumerate(self.options()):
+            color = GREEN if i == self.selected_option else WHITE
+            text = text_cache.render(font, option, True, color)
+            y_pos = 110 + i * 34
             screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y_pos))
-        
+
         # Instructions at bottom
-        instruction_text = font.render('Use UP/DOWN arrows to navigate, ENTER to select', True, WHITE)
+        instruction_text = text_cache.render(font, 'Use UP/DOWN arrows to navigate, ENTER to select', True, WHITE)
         screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT - 50))
-        
+
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        count = len(self.options())
+        if event.key == pygame.K_UP:
+            self.selected_option = (self.selected_option - 1) % count
+            self.dirty = True
+        elif event.key == pygame.K_DOWN:
+            self.selected_option = (self.selected_option + 1) % count
+            self.dirty = True
+        elif event.key == pygame.K_RETURN:
+            stack = self.stack
+            if self.selected_option == 0:  # Play Game
+                stack.push(PlayScene(self.earned_achievements, self.profiler))
+                stack.push(MessageScene([('Press any key to start the game', YELLOW)]))
+            elif self.selected_option == 1:  # Arena
+                stack.push(ArenaScene(ARENA_BALLS, self.profiler))
+                stack.push(MessageScene([('Press any key to start the game', YELLOW)]))
+            elif self.selected_option == 2:  # High Score
+                stack.push(HighScoreScene())
+            elif self.selected_option == 3:  # Achievements
+                stack.push(AchievementsScene(self.earned_achievements))
+            elif self.selected_option == 4:  # Music Toggle
+                toggle_music()
+                self.dirty = True
+            elif self.selected_option == 5:  # Instructions
+                stack.push(InstructionsScene())
+            elif self.selected_option == 6:  # Quit
+                stack.clear()
+
+def main():
+    global board
+    init()
+
+    # High score handling; scores from the old highscore.txt are carried over
+    if board is None:
+        # Writes go to a background thread and the game's lookups are
+        # loaded now, so finishing a game never waits on the database
+        board = leaderboard.Leaderboard(background=True)
+        leaderboard.import_highscore_file(board, 'highscore.txt', GAME, player)
+        board.preload(GAME, player)
+
+    # Load achievements
+    earned_achievements = load_achievements()
+
+    # One profiler for the whole run, so its log covers every game
+    profiler = frame_profiler.create(profile, profile_log, RENDER_FPS)
+    menu = MenuScene(earned_achievements, profiler)
+    if startup_time:
+        menu.draw(screen)
         pygame.display.flip()
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_option = (selected_option - 1) % len(menu_options)
-                elif event.key == pygame.K_DOWN:
-                    selected_option = (selected_option + 1) % len(menu_options)
-                elif event.key == pygame.K_RETURN:
-                    if selected_option == 0:  # Play Game
-                        menu_running = False
-                        play_game(high_score, highscore_file, earned_achievements)
-                        return main()  # Return to menu after game
-                    elif selected_option == 1:  # High Score
-                        show_high_score(high_score)
-                    elif selected_option == 2:  # Achievements
-                        show_achievements_screen(earned_achievements)
-                    elif selected_option == 3:  # Music Toggle
-                        toggle_music()
-                        menu_options[3] = 'Music: ON' if music_enabled else 'Music: OFF'
-                    elif selected_option == 4:  # Instructions
-                        show_instructions()
-                    elif selected_option == 5:  # Quit
-                        pygame.quit()
-                        sys.exit()
-
-def show_high_score(high_score):
-    screen.fill(BLUE)
-    title_text = font.render('HIGH SCORE', True, YELLOW)
-    score_text = font.render(f'{high_score}', True, GREEN)
-    back_text = font.render('Press any key to go back', True, WHITE)
-    
-    screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 100))
-    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 200))
-    screen.blit(back_text, (WIDTH // 2 - back_text.get_width() // 2, HEIGHT - 100))
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                waiting = False
-
-def show_instructions():
-    screen.fill(BLUE)
-    title_text = font.render('INSTRUCTIONS', True, YELLOW)
-    screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
-    
-    instructions = [
-        'Use UP/DOWN arrow keys to move your paddle',
-        'Hit the ball with your paddle to score points',
-        'Don\'t let the ball pass your paddle!',
-        'Try to beat your high score!',
-        'Press SPACEBAR to pause the game',
-        'Earn achievements by reaching score milestones!',
-        'Ball speed increases every 10 points!',
-        'Toggle music in the main menu'
-    ]
-    
-    for i, instruction in enumerate(instructions):
-        text = font.render(instruction, True, WHITE)
-        y_pos = 120 + i * 40
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y_pos))
-    
-    back_text = font.render('Press any key to go back', True, WHITE)
-    screen.blit(back_text, (WIDTH // 2 - back_text.get_width() // 2, HEIGHT - 100))
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                waiting = False
+        report_startup()
+    else:
+        stack = scenes.SceneStack(screen)
+        stack.push(menu)
+        stack.run()
 
-def play_game(high_score, highscore_file, earned_achievements):
-    # Start background music
-    if music_enabled:
-        try:
-            pygame.mixer.music.play(-1)  # Loop music
-        except:
-            pass
-    
-    # Paddle position
-    paddle_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
-    # Ball position and velocity
-    ball_x = WIDTH // 2
-    ball_y = HEIGHT // 2
-    ball_vel_x = -BALL_SPEED_X
-    ball_vel_y = BALL_SPEED_Y
-    score = 0
-    speed_level = 1
-    base_speed_x = BALL_SPEED_X
-    base_speed_y = BALL_SPEED_Y
-    running = True
-    paused = False
-
-    # Show start message
-    screen.fill(BLUE)
-    start_text = font.render('Press any key to start the game', True, YELLOW)
-    screen.blit(start_text, (WIDTH // 2 - start_text.get_width() // 2, HEIGHT // 2 - start_text.get_height() // 2))
-    pygame.display.flip()
-    waiting = True
-    while waiting:
+    profiler.close()
+    sounds.stop()
+    persistence.flush()
+    board.close()
+    pygame.quit()
+
+class PlayScene(scenes.Scene):
+    animated = True
+
+    def __init__(self, earned_achievements, profiler):
+        super().__init__()
+        # Start background music
+        if music_enabled:
+            sounds.play_music()
+
+        # Paddle and ball state lives in the headless engine
+        self.state = paddle_physics.GameState(earned_achievements)
+        self.high_score = board.high_score(GAME)
+        self.recorder = replay.Recorder(replay.PADDLE)
+        self.renderer = paddle_render.RENDERERS[RENDER_MODE](screen, font)
+        self.achievement_toasts = toasts.ToastQueue(font)
+        self.timestep = game_loop.FixedTimestep(SIM_RATE)
+        self.view = paddle_render.InterpolatedView(self.state)
+        self.profiler = profiler
+
+    def enter(self):
+        # Started, or back from the pause or start screen: repaint
+        # everything and don't catch up on the time spent away
+        self.renderer.invalidate()
+        self.timestep.reset()
+
+    def frame(self):
+        state = self.state
+        profiler = self.profiler
+        renderer = self.renderer
+        profiler.start_frame()
+        clock.tick(RENDER_FPS)
+        profiler.lap('wait')
         for event in pygame.event.get():
+            if profiler.handle_event(event):
+                renderer.invalidate()
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.finish()
+                self.stack.clear()
+                profiler.abort_frame()
+                return
             elif event.type == pygame.KEYDOWN:
-                waiting = False
+                if event.key == pygame.K_SPACE:
+                    self.stack.push(MessageScene([('PAUSED', YELLOW), ('Press SPACEBAR to resume', WHITE)],
+                                                 pygame.K_SPACE))
+                    profiler.abort_frame()
+                    return
+
+        # Paddle movement and ball physics, in fixed steps
+        keys = pygame.key.get_pressed()
+        up, down = keys[pygame.K_UP], keys[pygame.K_DOWN]
+        profiler.lap('events')
+        for _ in range(self.timestep.advance()):
+            self.view.snapshot()
+            self.recorder.record((replay.KEY_UP if up else 0) | (replay.KEY_DOWN if down else 0))
+            events = paddle_physics.step(state, up, down)
+            profiler.lap('physics')
+            for kind, value in events:
+                if kind == paddle_physics.HIT:
+                    sounds.play('hit')
+                elif kind == paddle_physics.ACHIEVEMENT:
+                    save_achievements(state.achievements.earned)
+                    self.achievement_toasts.push(value)
+            profiler.lap('achievements')
+            if state.over:
+                break
+
+        # Ball out of bounds (game over)
+        if state.over:
+            score = state.score
+            board.record(GAME, player, score)
+            board.flush()
+            high_score = max(self.high_score, score)
+            self.finish()
+            self.stack.replace(MessageScene([(f'Game Over! Score: {score}', YELLOW),
+                                             (f'High Score: {high_score}', YELLOW)], duration=2000))
+            profiler.abort_frame()
+            return
+        # Draw everything
+        self.view.blend(self.timestep.alpha)
+        renderer.paint(self.view, self.high_score, self.achievement_toasts.update(pygame.time.get_ticks()))
+        panel = profiler.draw(screen)
+        profiler.lap('draw')
+        renderer.present(panel)
+        profiler.lap('flip')
+        profiler.end_frame()
 
-    while running:
-        clock.tick(FPS)
+    def finish(self):
+        if record_dir is not None:
+            persistence.write_bytes(os.path.join(record_dir, self.recorder.filename()),
+                                    self.recorder.encode(self.state.score))
+        # Stop music when game ends
+        sounds.stop_music()
+
+class ArenaScene(scenes.Scene):
+    # Arena mode: many balls and no achievements, replays or leaderboard
+    animated = True
+
+    def __init__(self, balls, profiler):
+        super().__init__()
+        if music_enabled:
+            sounds.play_music()
+        self.arena = arena.Arena(balls)
+        self.renderer = paddle_render.ArenaRenderer(screen, font, self.arena.radius)
+        self.timestep = game_loop.FixedTimestep(SIM_RATE)
+        self.profiler = profiler
+
+    def enter(self):
+        self.timestep.reset()
+
+    def frame(self):
+        game = self.arena
+        profiler = self.profiler
+        profiler.start_frame()
+        clock.tick(RENDER_FPS)
+        profiler.lap('wait')
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
-                running = False
+                sounds.stop_music()
+                self.stack.clear()
+                profiler.abort_frame()
+                return
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    paused = not paused
-        
-        if paused:
-            # Show pause screen
-            screen.fill(BLUE)
-            pause_text = font.render('PAUSED', True, YELLOW)
-            resume_text = font.render('Press SPACEBAR to resume', True, WHITE)
-            screen.blit(pause_text, (WIDTH // 2 - pause_text.get_width() // 2, HEIGHT // 2 - 30))
-            screen.blit(resume_text, (WIDTH // 2 - resume_text.get_width() // 2, HEIGHT // 2 + 10))
-            pygame.display.flip()
-            continue
-        
-        # Paddle movement
+                    self.stack.push(MessageScene([('PAUSED', YELLOW), ('Press SPACEBAR to resume', WHITE)],
+                                                 pygame.K_SPACE))
+                    profiler.abort_frame()
+                    return
+
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP] and paddle_y > 0:
-            paddle_y -= PADDLE_SPEED
-        if keys[pygame.K_DOWN] and paddle_y < HEIGHT - PADDLE_HEIGHT:
-            paddle_y += PADDLE_SPEED
-        # Ball movement
-        ball_x += ball_vel_x
-        ball_y += ball_vel_y
-        # Ball collision with top/bottom
-        if ball_y <= 0 or ball_y >= HEIGHT - BALL_SIZE:
-            ball_vel_y *= -1
-        # Ball collision with paddle
-        if (ball_x <= PADDLE_WIDTH and
-            paddle_y < ball_y + BALL_SIZE and
-            ball_y < paddle_y + PADDLE_HEIGHT):
-            ball_vel_x *= -1
-            score += 1
-            
-            # Play hit sound
-            if hit_sound:
-                hit_sound.play()
-            
-            # Increase ball speed every 10 points
-            new_speed_level = (score // 10) + 1
-            if new_speed_level > speed_level:
-                speed_level = new_speed_level
-                # Update ball speed
-                ball_vel_x = base_speed_x * speed_level if ball_vel_x > 0 else -base_speed_x * speed_level
-                ball_vel_y = base_speed_y * speed_level if ball_vel_y > 0 else -base_speed_y * speed_level
-            
-            # Check for achievements
-            new_achievements, earned_achievements = check_achievements(score, earned_achievements)
-            if new_achievements:
-                save_achievements(earned_achievements)
-                for achievement_name in new_achievements:
-                    for milestone, achievement in ACHIEVEMENTS.items():
-                        if achievement["name"] == achievement_name:
-                            show_achievement_popup(achievement_name, achievement["color"])
-                            break
-        
-        # Ball out of bounds (game over)
-        if ball_x < 0:
-            if score > high_score:
-                high_score = score
-                with open(highscore_file, 'w') as f:
-                    f.write(str(high_score))
-            game_over_text = font.render(f'Game Over! Score: {score}', True, YELLOW)
-            high_score_text = font.render(f'High Score: {high_score}', True, YELLOW)
-            pygame.display.flip()
-            pygame.time.wait(2000)
-            running = False
-            continue
-        # Ball collision with right wall
-        if ball_x > WIDTH - BALL_SIZE:
-            ball_vel_x *= -1
-        # Draw everything
-        screen.fill(BLUE)
-        pygame.draw.rect(screen, GREEN, (0, paddle_y, PADDLE_WIDTH, PADDLE_HEIGHT))
-        pygame.draw.ellipse(screen, RED, (ball_x, ball_y, BALL_SIZE, BALL_SIZE))
-        score_text = font.render(f'Score: {score}', True, YELLOW)
-        high_score_text = font.render(f'High Score: {high_score}', True, YELLOW)
-        speed_text = font.render(f'Speed Level: {speed_level}', True, ORANGE)
-        screen.blit(score_text, (10, 10))
-        screen.blit(high_score_text, (10, 40))
-        screen.blit(speed_text, (10, 70))
-        pygame.display.flip()
-    
-    # Stop music when game ends
-    pygame.mixer.music.stop()
-    pygame.quit()
-    sys.exit()
+        up, down = keys[pygame.K_UP], keys[pygame.K_DOWN]
+        profiler.lap('events')
+        for _ in range(self.timestep.advance()):
+            for kind, value in game.step(up, down):
+                if kind == paddle_physics.HIT:
+                    sounds.play('hit')
+            if game.over:
+                break
+        profiler.lap('physics')
+
+        if game.over:
+            sounds.stop_music()
+            self.stack.replace(MessageScene([(f'Game Over! Score: {game.score}', YELLOW)], duration=2000))
+            profiler.abort_frame()
+            return
+        self.renderer.paint(game)
+        panel = profiler.draw(screen)
+        profiler.lap('draw')
+        self.renderer.present(panel)
+        profiler.lap('flip')
+        profiler.end_frame()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bounce Master')
+    parser.add_argument('--record', metavar='DIR', help='save a replay log of each game in DIR')
+    parser.add_argument('--profile', action='store_true', help='show frame timings (F3 toggles)')
+    parser.add_argument('--profile-log', metavar='FILE', help='write per-frame timings to FILE as JSON lines')
+    parser.add_argument('--arena-balls', type=int, default=ARENA_BALLS, help='balls in an arena game (default %(default)s)')
+    parser.add_argument('--player', default=player, help='name to put on the leaderboard (default %(default)s)')
+    parser.add_argument('--startup-time', action='store_true', help='time how long the menu takes to appear, then quit')
+    args = parser.parse_args()
+    record_dir = args.record
+    profile = args.profile
+    profile_log = args.profile_log
+    startup_time = args.startup_time
+    player = args.player
+    ARENA_BALLS = args.arena_balls
     main() 
\ No newline at end of file
@@ -0,0 +1,254 @@
+import sys
+import time
+
+import achievement_rules
+
+# Headless Bounce Master rules. Nothing in here imports pygame, so the game
+# can be stepped as fast as Python allows for bots, balancing and regression
+# runs. paddle_game.play_game is a thin frontend over step().
+
+# Game settings
+WIDTH, HEIGHT = 600, 400
+PADDLE_WIDTH, PADDLE_HEIGHT = 10, 60
+BALL_SIZE = 15
+PADDLE_SPEED = 6
+BALL_SPEED_X, BALL_SPEED_Y = 4, 4
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (30, 144, 255)
+GREEN = (0, 255, 128)
+RED = (255, 64, 64)
+YELLOW = (255, 255, 0)
+ORANGE = (255, 165, 0)
+
+# Physics steps per second of game time (ball speeds are pixels per step)
+STEPS_PER_SECOND = 60
+
+# Achievement system. Each achievement is earned the first time every stat
+# in its `when` reaches the given value in one game. Stats:
+#   score        points this game
+#   speed_level  ball speed level (starts at 1)
+#   streak       paddle hits in a row with the middle half of the paddle
+#   seconds      seconds the ball has been in play
+ACHIEVEMENTS = [
+    {"name": "First Hit", "description": "Score your first point", "color": GREEN, "when": {"score": 1}},
+    {"name": "Beginner", "description": "Score 5 points", "color": YELLOW, "when": {"score": 5}},
+    {"name": "Amateur", "description": "Score 10 points", "color": ORANGE, "when": {"score": 10}},
+    {"name": "Pro", "description": "Score 25 points", "color": RED, "when": {"score": 25}},
+    {"name": "Master", "description": "Score 50 points", "color": BLUE, "when": {"score": 50}},
+    {"name": "Legend", "description": "Score 100 points", "color": GREEN, "when": {"score": 100}},
+    {"name": "Unstoppable", "description": "Score 200 points", "color": YELLOW, "when": {"score": 200}},
+    {"name": "Sweet Spot", "description": "Hit with the middle of the paddle 5 times in a row", "color": ORANGE,
+     "when": {"streak": 5}},
+    {"name": "Sharpshooter", "description": "Hit with the middle of the paddle 15 times in a row", "color": RED,
+     "when": {"streak": 15}},
+    {"name": "Survivor", "description": "Keep the ball in play for a minute", "color": GREEN,
+     "when": {"seconds": 60}},
+    {"name": "Marathon", "description": "Keep the ball in play for five minutes", "color": BLUE,
+     "when": {"seconds": 300}},
+    {"name": "Speed Demon", "description": "Hit the middle 5 times in a row at speed level 3", "color": ORANGE,
+     "when": {"speed_level": 3, "streak": 5}},
+]
+STAT_LABELS = {
+    'score': '{} points',
+    'speed_level': 'speed level {}',
+    'streak': '{} middle hits in a row',
+    'seconds': '{} seconds',
+}
+RULES = achievement_rules.RuleSet(ACHIEVEMENTS, STAT_LABELS)
+
+# Event kinds returned by step() as (kind, value) tuples
+HIT = 'hit'                  # value: new score
+MISS = 'miss'                # value: final score
+LEVEL_UP = 'level_up'        # value: new speed level
+ACHIEVEMENT = 'achievement'  # value: achievement name
+
+NO_EVENTS = ()
+
+
+class GameState:
+    __slots__ = ('paddle_y', 'ball_x', 'ball_y', 'ball_vel_x', 'ball_vel_y',
+                 'score', 'speed_level', 'streak', 'steps', 'achievements', 'over')
+
+    def __init__(self, earned_achievements=None):
+        # earned_achievements: set of names, shared with the caller and
+        # added to as achievements are earned
+        # Paddle position
+        self.paddle_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        # Ball position and velocity
+        self.ball_x = WIDTH // 2
+        self.ball_y = HEIGHT // 2
+        self.ball_vel_x = -BALL_SPEED_X
+        self.ball_vel_y = BALL_SPEED_Y
+        self.score = 0
+        self.speed_level = 1
+        self.streak = 0
+        self.steps = 0
+        self.achievements = RULES.tracker(earned_achievements, speed_level=1)
+        self.over = False
+
+    def copy(self):
+        other = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.achievements = self.achievements.copy()
+        return other
+
+
+def step(state, up, down):
+    # Advance one frame. Mutates state and returns a tuple of events.
+    if state.over:
+        return NO_EVENTS
+    events = NO_EVENTS
+    steps = state.steps = state.steps + 1
+    if steps % STEPS_PER_SECOND == 0:
+        for name in state.achievements.update('seconds', steps // STEPS_PER_SECOND):
+            events += ((ACHIEVEMENT, name),)
+
+    # Paddle movement
+    paddle_y = state.paddle_y
+    if up and paddle_y > 0:
+        paddle_y -= PADDLE_SPEED
+    if down and paddle_y < HEIGHT - PADDLE_HEIGHT:
+        paddle_y += PADDLE_SPEED
+    state.paddle_y = paddle_y
+
+    # Ball movement. Walls and the paddle face are swept over the whole
+    # step, so a fast ball can't tunnel through the paddle or overshoot a
+    # wall. Positions are reflected at each contact and stay integers.
+    ball_x = state.ball_x
+    ball_y = state.ball_y
+    vel_x = state.ball_vel_x
+    vel_y = state.ball_vel_y
+    new_y = ball_y + vel_y
+    if 0 < new_y < HEIGHT - BALL_SIZE:
+        state.ball_y = new_y
+    else:
+        state.ball_y, state.ball_vel_y = _bounce(new_y, vel_y, 0, HEIGHT - BALL_SIZE)
+    new_x = ball_x + vel_x
+    hits = 0
+    if new_x <= PADDLE_WIDTH or new_x > WIDTH - BALL_SIZE:
+        new_x, vel_x, hits, contact_y = _sweep_x(ball_x, new_x, vel_x, ball_y, vel_y, paddle_y)
+    state.ball_x = new_x
+    state.ball_vel_x = vel_x
+
+    # Ball collision with paddle. A speed-up takes effect from the next step.
+    if hits:
+        for _ in range(hits):
+            events += _hit(state, contact_y)
+
+    # Ball out of bounds (game over)
+    if new_x < 0:
+        state.over = True
+        return events + ((MISS, state.score),)
+    return events
+
+
+def _bounce(pos, vel, lo, hi):
+    # Fold a 1-D move that ended at pos back into [lo, hi], flipping vel
+    # once per wall contact. Touching a wall counts as a bounce.
+    if lo < pos < hi:
+        return pos, vel
+    span = hi - lo
+    k, u = divmod(pos - lo, span)
+    contacts = k if k > 0 else (1 - k if u == 0 else -k)
+    pos = hi - u if k % 2 else lo + u
+    return pos, (-vel if contacts % 2 else vel)
+
+
+def _sweep_x(start, end, vel_x, ball_y, vel_y, paddle_y):
+    # Walk the paddle-face and right-wall contacts of one step in time
+    # order. The time of each paddle contact gives the ball's height there,
+    # which decides whether the paddle was in the way. Returns the new x,
+    # x velocity, the number of paddle hits and the ball's height at the
+    # last one.
+    speed = abs(vel_x)
+    travelled = 0
+    hits = 0
+    contact_y = None
+    while True:
+        if vel_x < 0 and end <= PADDLE_WIDTH < start:
+            travelled += start - PADDLE_WIDTH
+            y = _bounce(ball_y + vel_y * travelled / speed, vel_y, 0, HEIGHT - BALL_SIZE)[0]
+            if not (paddle_y < y + BALL_SIZE and y < paddle_y + PADDLE_HEIGHT):
+                break
+            contact_y = y
+            start = PADDLE_WIDTH
+            end = 2 * PADDLE_WIDTH - end
+            vel_x = -vel_x
+            hits += 1
+        elif vel_x > 0 and end > WIDTH - BALL_SIZE:
+            # Ball collision with right wall
+            travelled += WIDTH - BALL_SIZE - start
+            start = WIDTH - BALL_SIZE
+            end = 2 * (WIDTH - BALL_SIZE) - end
+            vel_x = -vel_x
+        else:
+            break
+    return end, vel_x, hits, contact_y
+
+
+def _hit(state, contact_y):
+    score = state.score + 1
+    state.score = score
+    events = [(HIT, score)]
+    achievements = state.achievements
+    unlocked = achievements.update('score', score)
+
+    # Increase ball speed every 10 points
+    new_speed_level = (score // 10) + 1
+    if new_speed_level > state.speed_level:
+        speed_level = state.speed_level = new_speed_level
+        state.ball_vel_x = BALL_SPEED_X * speed_level if state.ball_vel_x > 0 else -BALL_SPEED_X * speed_level
+        state.ball_vel_y = BALL_SPEED_Y * speed_level if state.ball_vel_y > 0 else -BALL_SPEED_Y * speed_level
+        events.append((LEVEL_UP, speed_level))
+        unlocked += achievements.update('speed_level', speed_level)
+
+    # Middle hit: ball centre within a quarter paddle of the paddle centre
+    if abs(2 * contact_y + BALL_SIZE - 2 * state.paddle_y - PADDLE_HEIGHT) <= PADDLE_HEIGHT // 2:
+        state.streak += 1
+    else:
+        state.streak = 0
+    unlocked += achievements.update('streak', state.streak)
+
+    for name in unlocked:
+        events.append((ACHIEVEMENT, name))
+    return tuple(events)
+
+
+def tracking_bot(state):
+    # Simple policy used by benchmarks: keep the paddle centred on the ball.
+    centre = state.paddle_y + PADDLE_HEIGHT // 2
+    target = state.ball_y + BALL_SIZE // 2
+    return target < centre - PADDLE_SPEED, target > centre + PADDLE_SPEED
+
+
+def run(policy, max_steps, state=None):
+    # Run one game headlessly until it ends or max_steps is reached.
+    state = GameState() if state is None else state
+    steps = 0
+    while not state.over and steps < max_steps:
+        up, down = policy(state)
+        step(state, up, down)
+        steps += 1
+    return state, steps
+
+
+def benchmark(total_steps=1_000_000):
+    steps_done = 0
+    start = time.perf_counter()
+    while steps_done < total_steps:
+        state = GameState()
+        while not state.over and steps_done < total_steps:
+            centre = state.paddle_y + PADDLE_HEIGHT // 2
+            step(state, state.ball_y < centre, state.ball_y > centre)
+            steps_done += 1
+    elapsed = time.perf_counter() - start
+    return steps_done / elapsed
+
+
+if __name__ == '__main__':
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'{benchmark(steps):,.0f} steps/sec')
@@ -0,0 +1,286 @@
+import sys
+import time
+
+import pygame
+
+import text_cache
+
+from paddle_physics import (
+    WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE,
+    BLUE, GREEN, RED, YELLOW, ORANGE,
+    GameState, step, tracking_bot,
+)
+
+# Renderers for the Bounce Master play screen. FullRenderer repaints and
+# flips the whole surface every frame; DirtyRenderer only repaints the areas
+# that changed (paddle, ball, HUD lines whose value changed) and pushes them
+# with pygame.display.update(rects). Both accept an optional overlay
+# (surface, rect), such as an achievement toast, drawn on top of everything.
+# draw() is paint() followed by present(); call them separately to draw
+# something else on top, or to time drawing and flipping apart.
+
+HUD_POSITIONS = ((10, 10), (10, 40), (10, 70))
+HUD_COLORS = (YELLOW, YELLOW, ORANGE)
+
+
+def hud_lines(state, high_score):
+    return (f'Score: {state.score}', f'High Score: {high_score}', f'Speed Level: {state.speed_level}')
+
+
+class FullRenderer:
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+
+    def invalidate(self):
+        pass
+
+    def draw(self, state, high_score, overlay=None):
+        self.paint(state, high_score, overlay)
+        self.present()
+
+    def paint(self, state, high_score, overlay=None):
+        screen = self.screen
+        screen.fill(BLUE)
+        pygame.draw.rect(screen, GREEN, (0, state.paddle_y, PADDLE_WIDTH, PADDLE_HEIGHT))
+        pygame.draw.ellipse(screen, RED, (state.ball_x, state.ball_y, BALL_SIZE, BALL_SIZE))
+        for text, color, pos in zip(hud_lines(state, high_score), HUD_COLORS, HUD_POSITIONS):
+            screen.blit(text_cache.render(self.font, text, True, color), pos)
+        if overlay is not None:
+            screen.blit(*overlay)
+
+    def present(self, extra=None):
+        # extra: a rect drawn over the frame after paint(); flip covers it
+        pygame.display.flip()
+
+
+class DirtyRenderer:
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.hud = [None] * len(HUD_POSITIONS)  # (text, surface, rect) per line
+        self.paddle_rect = None
+        self.ball_rect = None
+        self.overlay = None
+        self.full_redraw = True
+        self.dirty = None  # rects painted but not yet presented; None = all
+
+    def invalidate(self):
+        # Something else drew over the play field (pause screen, popup);
+        # repaint everything on the next frame
+        self.full_redraw = True
+
+    def draw(self, state, high_score, overlay=None):
+        self.paint(state, high_score, overlay)
+        self.present()
+
+    def paint(self, state, high_score, overlay=None):
+        paddle_rect = pygame.Rect(0, state.paddle_y, PADDLE_WIDTH, PADDLE_HEIGHT)
+        ball_rect = pygame.Rect(state.ball_x, state.ball_y, BALL_SIZE, BALL_SIZE)
+        dirty = []
+
+        # Only re-render HUD text when its value changes
+        for i, text in enumerate(hud_lines(state, high_score)):
+            cached = self.hud[i]
+            if cached is None or cached[0] != text:
+                surface = text_cache.render(self.font, text, True, HUD_COLORS[i])
+                rect = surface.get_rect(topleft=HUD_POSITIONS[i])
+                if cached is not None:
+                    dirty.append(cached[2])
+                dirty.append(rect)
+                self.hud[i] = (text, surface, rect)
+
+        if overlay is not self.overlay:
+            if self.overlay is not None:
+                dirty.append(self.overlay[1])
+            if overlay is not None:
+                dirty.append(overlay[1])
+            self.overlay = overlay
+
+        if self.full_redraw:
+            self.screen.fill(BLUE)
+            self._draw_objects(paddle_rect, ball_rect, None)
+            self.dirty = None
+            self.full_redraw = False
+        else:
+            if paddle_rect != self.paddle_rect:
+                dirty.append(self.paddle_rect)
+                dirty.append(paddle_rect)
+            if ball_rect != self.ball_rect:
+                dirty.append(self.ball_rect)
+                dirty.append(ball_rect)
+            if dirty:
+                # Repaint each area clipped to itself so anti-aliased text
+                # is never blended over its own pixels twice
+                for rect in dirty:
+                    self.screen.set_clip(rect)
+                    self.screen.fill(BLUE)
+                    self._draw_objects(paddle_rect, ball_rect, rect)
+                self.screen.set_clip(None)
+            self.dirty = dirty
+
+        self.paddle_rect = paddle_rect
+        self.ball_rect = ball_rect
+
+    def present(self, extra=None):
+        # extra: a rect drawn over the frame after paint(), pushed as well
+        if self.dirty is None:
+            pygame.display.flip()
+        else:
+            if extra is not None:
+                self.dirty.append(extra)
+            if self.dirty:
+                pygame.display.update(self.dirty)
+        self.dirty = []
+
+    def _draw_objects(self, paddle_rect, ball_rect, area):
+        # Redraw everything that touches the repainted area, in the same
+        # order as FullRenderer so overlaps look identical
+        screen = self.screen
+        if area is None or paddle_rect.colliderect(area):
+            pygame.draw.rect(screen, GREEN, paddle_rect)
+        if area is None or ball_rect.colliderect(area):
+            pygame.draw.ellipse(screen, RED, ball_rect)
+        for text, surface, rect in self.hud:
+            if area is None or rect.colliderect(area):
+                screen.blit(surface, rect)
+        overlay = self.overlay
+        if overlay is not None and (area is None or overlay[1].colliderect(area)):
+            screen.blit(*overlay)
+
+
+class InterpolatedView:
+    # What the renderers draw when physics and rendering run at different
+    # rates: positions blended between the previous and the current physics
+    # step, updated in place so it costs no allocation per frame
+    __slots__ = ('state', 'prev_paddle_y', 'prev_ball_x', 'prev_ball_y',
+                 'paddle_y', 'ball_x', 'ball_y', 'score', 'speed_level')
+
+    def __init__(self, state):
+        self.state = state
+        self.snapshot()
+        self.blend(0.0)
+
+    def snapshot(self):
+        # Call before each physics step
+        state = self.state
+        self.prev_paddle_y = state.paddle_y
+        self.prev_ball_x = state.ball_x
+        self.prev_ball_y = state.ball_y
+
+    def blend(self, alpha):
+        state = self.state
+        self.paddle_y = round(self.prev_paddle_y + (state.paddle_y - self.prev_paddle_y) * alpha)
+        self.ball_x = round(self.prev_ball_x + (state.ball_x - self.prev_ball_x) * alpha)
+        self.ball_y = round(self.prev_ball_y + (state.ball_y - self.prev_ball_y) * alpha)
+        self.score = state.score
+        self.speed_level = state.speed_level
+
+
+RENDERERS = {'full': FullRenderer, 'dirty': DirtyRenderer}
+
+ARENA_BALL_COLORS = (RED, YELLOW, ORANGE, GREEN)
+
+
+class ArenaRenderer:
+    # Play screen of the arena mode. With hundreds of balls moving every
+    # frame there is little left to skip, so it repaints and flips the whole
+    # surface; the balls are one pre-rendered sprite per colour, all drawn
+    # with a single Surface.blits call.
+    def __init__(self, screen, font, radius):
+        self.screen = screen
+        self.font = font
+        self.sprites = []
+        for color in ARENA_BALL_COLORS:
+            sprite = pygame.Surface((2 * radius, 2 * radius), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self.sprites.append(sprite.convert_alpha())
+
+    def invalidate(self):
+        pass
+
+    def draw(self, arena, overlay=None):
+        self.paint(arena, overlay)
+        self.present()
+
+    def paint(self, arena, overlay=None):
+        screen = self.screen
+        screen.fill(BLUE)
+        pygame.draw.rect(screen, GREEN, (0, arena.paddle_y, PADDLE_WIDTH, PADDLE_HEIGHT))
+        sprites = map(self.sprites.__getitem__, arena.color.tolist())
+        screen.blits(zip(sprites, arena.sprite_positions()), doreturn=False)
+        lines = (f'Score: {arena.score}', f'Balls: {arena.balls}')
+        for text, color, pos in zip(lines, HUD_COLORS, HUD_POSITIONS):
+            screen.blit(text_cache.render(self.font, text, True, color), pos)
+        if overlay is not None:
+            screen.blit(*overlay)
+
+    def present(self, extra=None):
+        pygame.display.flip()
+
+
+def compare_render_modes(frames=600):
+    # Frame-time comparison of the two renderers on the same bot-driven
+    # rally. Run on the target machine; set SDL_VIDEODRIVER=dummy to try it
+    # without a display.
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.SysFont('Arial', 24)
+    results = {}
+    for name, renderer_class in RENDERERS.items():
+        state = GameState()
+        renderer = renderer_class(screen, font)
+        times = []
+        for _ in range(frames):
+            if state.over:
+                state = GameState()
+            up, down = tracking_bot(state)
+            step(state, up, down)
+            start = time.perf_counter()
+            renderer.draw(state, 0)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        results[name] = {
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p95_ms': times[int(len(times) * 0.95)] * 1000,
+            'max_ms': times[-1] * 1000,
+        }
+    pygame.quit()
+    return results
+
+
+def arena_frame_times(ball_counts=(100, 250, 500, 1000, 2000), frames=300):
+    # Frame time of the arena mode (one physics step and a full redraw)
+    # against the number of balls, with the bot moving the paddle and lost
+    # balls served again so the count holds. Same display notes as above.
+    import arena
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.SysFont('Arial', 24)
+    results = {}
+    for balls in ball_counts:
+        game = arena.Arena(balls, seed=0, respawn=True)
+        renderer = ArenaRenderer(screen, font, game.radius)
+        times = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            game.step(*arena.tracking_bot(game))
+            renderer.draw(game)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        results[balls] = {
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p95_ms': times[int(len(times) * 0.95)] * 1000,
+            'max_ms': times[-1] * 1000,
+        }
+    pygame.quit()
+    return results
+
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    for name, result in compare_render_modes(frames).items():
+        print(f"{name:>5}: mean {result['mean_ms']:.3f} ms  p95 {result['p95_ms']:.3f} ms  max {result['max_ms']:.3f} ms")
+    print('arena frame time by ball count (60 FPS = 16.7 ms):')
+    for balls, result in arena_frame_times(frames=frames // 2).items():
+        print(f"{balls:>5}: mean {result['mean_ms']:.3f} ms  p95 {result['p95_ms']:.3f} ms  max {result['max_ms']:.3f} ms")
@@ -0,0 +1,157 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+# Background, batched, atomic saving for high scores and achievements.
+# The frame loop only hands the new file contents to a writer thread; the
+# thread coalesces repeated saves of the same file (only the latest content
+# is written) and writes each file atomically through a temp file + rename,
+# so a crash leaves either the old or the new file on disk, never half of one.
+
+TEMP_SUFFIX = '.tmp'
+
+
+def atomic_write(path, data):
+    temp_path = path + TEMP_SUFFIX
+    with open(temp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def recover(path):
+    # A temp file left behind means we crashed before the rename; the real
+    # file still holds the last complete save, so drop the partial one
+    try:
+        os.remove(path + TEMP_SUFFIX)
+    except OSError:
+        pass
+
+
+class AsyncWriter:
+    def __init__(self):
+        self.pending = {}  # path -> latest data
+        self.busy = False
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='persistence', daemon=True)
+        self.thread.start()
+
+    def write(self, path, data):
+        with self.cond:
+            self.pending[path] = data
+            self.cond.notify()
+
+    def flush(self, timeout=None):
+        # Block until everything submitted so far is on disk
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or self.closed)
+                if not self.pending:
+                    return
+                batch = self.pending
+                self.pending = {}
+                self.busy = True
+            for path, data in batch.items():
+                try:
+                    atomic_write(path, data)
+                except OSError as e:
+                    print(f"Could not save {path}: {e}")
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AsyncWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def write_text(path, text):
+    get_writer().write(path, text)
+
+
+def write_bytes(path, data):
+    get_writer().write(path, data)
+
+
+def write_json(path, obj):
+    # Serialise now so later changes to obj don't race with the writer
+    get_writer().write(path, json.dumps(obj))
+
+
+def flush(timeout=None):
+    if _writer is not None:
+        return _writer.flush(timeout)
+    return True
+
+
+def benchmark_unlock_frames(frames=20_000, path='bench_achievements.json'):
+    # Worst-case frame time of a headless bot game that saves achievements
+    # on every unlock, with the old synchronous save and with AsyncWriter
+    from paddle_physics import ACHIEVEMENT, GameState, step, tracking_bot
+
+    def sync_save(data):
+        with open(path, 'w') as f:
+            f.write(data)
+
+    def async_save(data):
+        write_text(path, data)
+
+    get_writer()  # start the thread outside the timed frames
+    results = {}
+    for name, save in (('sync', sync_save), ('async', async_save)):
+        worst = 0.0
+        worst_unlock = 0.0
+        unlock_frames = 0
+        state = GameState()
+        for _ in range(frames):
+            if state.over:
+                state = GameState()
+            unlocked = False
+            start = time.perf_counter()
+            for kind, value in step(state, *tracking_bot(state)):
+                if kind == ACHIEVEMENT:
+                    save(json.dumps(sorted(state.achievements.earned)))
+                    unlocked = True
+            elapsed = time.perf_counter() - start
+            worst = max(worst, elapsed)
+            if unlocked:
+                unlock_frames += 1
+                worst_unlock = max(worst_unlock, elapsed)
+        flush()
+        results[name] = {'worst_frame_ms': worst * 1000,
+                         'worst_unlock_frame_ms': worst_unlock * 1000,
+                         'unlock_frames': unlock_frames}
+    os.remove(path)
+    return results
+
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    for name, result in benchmark_unlock_frames(frames).items():
+        print(f"{name:>5}: worst frame {result['worst_frame_ms']:.3f} ms, "
+              f"worst unlock frame {result['worst_unlock_frame_ms']:.3f} ms "
+              f"({result['unlock_frames']} unlock frames)")
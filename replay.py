@@ -0,0 +1,190 @@
+import glob
+import os
+import struct
+import sys
+import time
+
+import paddle_physics
+import snake_rules
+
+# Compact binary session logs and headless replay. A session is the game
+# kind, the RNG seed and the input of every simulation tick, run-length
+# encoded (inputs rarely change from one tick to the next). Replaying runs
+# the headless rules over the log as fast as Python allows and checks that
+# the final score matches the recorded one.
+#
+# Layout (integers after the header are LEB128 varints):
+#   b'BMRP' | version u8 | game u8 | seed u64 | width u16 | height u16 (LE)
+#   final score | ticks | number of runs | (input u8, run length) * runs
+
+MAGIC = b'BMRP'
+HEADER = '<BBQHH'
+VERSION = 1
+MAX_SEED = 2 ** 64 - 1
+PADDLE = 0
+SNAKE = 1
+GAME_NAMES = {PADDLE: 'paddle', SNAKE: 'snake'}
+SUFFIX = '.bmr'
+
+# Paddle inputs are key bits per physics step
+KEY_UP = 1
+KEY_DOWN = 2
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError('truncated session log')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    def __init__(self, game, seed=0, width=0, height=0):
+        # width/height: board size in cells for snake, unused for paddle
+        self.game = game
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.runs = []  # [input, count]
+        self.ticks = 0
+
+    def record(self, value):
+        # Call once per simulation tick with that tick's input
+        self.ticks += 1
+        runs = self.runs
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+
+    def encode(self, score):
+        out = bytearray(MAGIC)
+        out += struct.pack(HEADER, VERSION, self.game, self.seed, self.width, self.height)
+        _write_varint(out, score)
+        _write_varint(out, self.ticks)
+        _write_varint(out, len(self.runs))
+        for value, count in self.runs:
+            out.append(value)
+            _write_varint(out, count)
+        return bytes(out)
+
+    def filename(self):
+        return f'{GAME_NAMES[self.game]}-{time.strftime("%Y%m%d-%H%M%S")}-{self.seed}{SUFFIX}'
+
+
+class Session:
+    def __init__(self, game, seed, width, height, score, ticks, runs):
+        self.game = game
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.score = score
+        self.ticks = ticks
+        self.runs = runs
+
+    def inputs(self):
+        for value, count in self.runs:
+            for _ in range(count):
+                yield value
+
+
+def decode(data):
+    if data[:4] != MAGIC:
+        raise ReplayError('not a session log')
+    if len(data) < 4 + struct.calcsize(HEADER):
+        raise ReplayError('truncated session log')
+    version, game, seed, width, height = struct.unpack_from(HEADER, data, 4)
+    if version != VERSION:
+        raise ReplayError(f'unsupported session log version {version}')
+    if game not in GAME_NAMES:
+        raise ReplayError(f'unknown game {game}')
+    pos = 4 + struct.calcsize(HEADER)
+    score, pos = _read_varint(data, pos)
+    ticks, pos = _read_varint(data, pos)
+    count, pos = _read_varint(data, pos)
+    runs = []
+    for _ in range(count):
+        if pos >= len(data):
+            raise ReplayError('truncated session log')
+        value = data[pos]
+        if game == SNAKE and value >= len(snake_rules.DIRECTIONS):
+            raise ReplayError(f'bad snake direction {value}')
+        length, pos = _read_varint(data, pos + 1)
+        runs.append((value, length))
+    return Session(game, seed, width, height, score, ticks, runs)
+
+
+def replay_paddle(session):
+    state = paddle_physics.GameState()
+    step = paddle_physics.step
+    for value, count in session.runs:
+        up = value & KEY_UP
+        down = value & KEY_DOWN
+        for _ in range(count):
+            step(state, up, down)
+    return state.score
+
+
+def replay_snake(session):
+    state = snake_rules.SnakeState(session.width, session.height, session.seed)
+    step = snake_rules.step
+    directions = snake_rules.DIRECTIONS
+    for value, count in session.runs:
+        direction = directions[value]
+        for _ in range(count):
+            step(state, direction)
+    return state.score
+
+
+def replay(data):
+    # Re-run a recorded session headlessly; returns (recorded, replayed) score
+    session = decode(data)
+    if session.game == PADDLE:
+        return session.score, replay_paddle(session)
+    return session.score, replay_snake(session)
+
+
+def replay_files(paths):
+    # Returns (number replayed, list of (path, recorded, replayed) mismatches)
+    mismatches = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            recorded, replayed = replay(f.read())
+        if recorded != replayed:
+            mismatches.append((path, recorded, replayed))
+    return len(paths), mismatches
+
+
+if __name__ == '__main__':
+    paths = []
+    for arg in sys.argv[1:]:
+        paths += sorted(glob.glob(os.path.join(arg, '*' + SUFFIX))) if os.path.isdir(arg) else [arg]
+    start = time.perf_counter()
+    count, mismatches = replay_files(paths)
+    elapsed = time.perf_counter() - start
+    for path, recorded, replayed in mismatches:
+        print(f'MISMATCH {path}: recorded {recorded}, replayed {replayed}')
+    print(f'{count} sessions replayed in {elapsed:.2f}s, {len(mismatches)} mismatches')
+    sys.exit(1 if mismatches else 0)
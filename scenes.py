@@ -0,0 +1,95 @@
+import pygame
+
+# Scene stack for the game front ends: one main loop runs whichever scene
+# is on top. Static scenes (menus, score screens, pause) sleep in
+# pygame.event.wait() and are redrawn only when they mark themselves dirty,
+# so an idle menu uses no CPU. Animated scenes (the game itself) get one
+# frame() call per loop and pace themselves. Scenes switch by pushing and
+# popping, never by calling each other, so nothing recurses and every
+# finished scene is dropped however many games are played.
+
+# Window events after which a static scene must be drawn again
+_REDRAW_EVENTS = {pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED,
+                  pygame.WINDOWSIZECHANGED}
+
+
+class Scene:
+    animated = False  # True: frame() every loop instead of waiting for events
+
+    def __init__(self):
+        self.stack = None
+        self.dirty = True
+
+    def enter(self):
+        # Now on top: just pushed, or the scene above it was popped
+        pass
+
+    def handle(self, event):
+        # Static scenes: one event (NOEVENT when timeout() ran out)
+        pass
+
+    def draw(self, screen):
+        # Static scenes: paint the whole screen; the stack flips it
+        pass
+
+    def timeout(self):
+        # Static scenes: ms to wait for an event before a NOEVENT; 0: forever
+        return 0
+
+    def frame(self):
+        # Animated scenes: one frame, including its own events and flip
+        pass
+
+
+class SceneStack:
+    def __init__(self, screen):
+        self.screen = screen
+        self.scenes = []
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    def push(self, scene):
+        scene.stack = self
+        scene.dirty = True
+        self.scenes.append(scene)
+        scene.enter()
+
+    def pop(self):
+        scene = self.scenes.pop()
+        scene.stack = None
+        if self.scenes:
+            self.scenes[-1].dirty = True
+            self.scenes[-1].enter()
+        return scene
+
+    def replace(self, scene):
+        # Swap the top scene without re-entering the one below
+        self.scenes.pop().stack = None
+        self.push(scene)
+
+    def clear(self):
+        # Drop every scene, which ends run()
+        for scene in self.scenes:
+            scene.stack = None
+        self.scenes.clear()
+
+    def run(self):
+        # Until the stack is empty or the window is closed
+        while self.scenes:
+            scene = self.scenes[-1]
+            if scene.animated:
+                scene.frame()
+                continue
+            if scene.dirty:
+                scene.dirty = False
+                scene.draw(self.screen)
+                pygame.display.flip()
+            event = pygame.event.wait(scene.timeout())
+            if event.type == pygame.QUIT:
+                self.clear()
+            elif event.type in _REDRAW_EVENTS:
+                scene.dirty = True
+            else:
+                scene.handle(event)
@@ -0,0 +1,418 @@
+import argparse
+import asyncio
+import os
+import resource
+import struct
+import sys
+import time
+
+import paddle_physics
+
+# Authoritative Bounce Master server. One asyncio process hosts many rooms;
+# every room runs paddle_physics at a fixed tick, the first client to join a
+# room controls its paddle and everyone in the room receives compact binary
+# state deltas after each tick.
+#
+# A client that reads too slowly is not buffered for without limit: once
+# WRITE_BUFFER_HIGH bytes are waiting for it, it stops getting deltas until
+# its buffer drains, then gets one full state to catch up. A client stalled
+# for STALL_SECONDS is dropped.
+#
+# Wire protocol (TCP, big-endian, no framing beyond the message type byte):
+#   client -> server
+#     b'J' room u32                 join a room (created on first join)
+#     b'I' keys u8  seq u32         paddle input, KEY_UP | KEY_DOWN bits
+#     b'Q'                          ask for server stats
+#   server -> client
+#     b'S' tick u32 ack u32 mask u8 fields...
+#         state delta: ack is the player's last applied input seq; bit i of
+#         mask says FIELDS[i] follows, OVER_BIT says the game ended this
+#         tick (the room restarts it)
+#     b'T' ticks u32 rooms u32 clients u32 rss u64 tick_us f32
+#         stats reply
+
+TICK_RATE = 60
+WRITE_BUFFER_HIGH = 16 * 1024  # bytes queued for a client before it's skipped
+STALL_SECONDS = 10             # how long a client may stay backed up
+
+KEY_UP = 1
+KEY_DOWN = 2
+
+FIELDS = ('paddle_y', 'ball_x', 'ball_y', 'score', 'speed_level')
+FIELD_FORMATS = ('h', 'h', 'h', 'I', 'H')
+ALL_FIELDS = (1 << len(FIELDS)) - 1
+OVER_BIT = 1 << len(FIELDS)
+
+JOIN = struct.Struct('>cI')
+INPUT = struct.Struct('>cBI')
+STATE_HEADER = struct.Struct('>cIIB')
+STATS = struct.Struct('>cIIIQf')
+# One struct per combination of changed fields
+FIELD_STRUCTS = [
+    struct.Struct('>' + ''.join(fmt for i, fmt in enumerate(FIELD_FORMATS) if mask & (1 << i)))
+    for mask in range(ALL_FIELDS + 1)
+]
+
+
+def rss_bytes():
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def state_values(state):
+    return (state.paddle_y, state.ball_x, state.ball_y, state.score, state.speed_level)
+
+
+def encode_state(tick, ack, values, last, over=False):
+    # Delta against last (None sends every field)
+    mask = OVER_BIT if over else 0
+    changed = []
+    for i, value in enumerate(values):
+        if last is None or value != last[i]:
+            mask |= 1 << i
+            changed.append(value)
+    return STATE_HEADER.pack(b'S', tick, ack, mask) + FIELD_STRUCTS[mask & ALL_FIELDS].pack(*changed)
+
+
+def message_size(data, pos):
+    # Size of the complete message starting at pos, or None if not all here
+    kind = bytes(data[pos:pos + 1])
+    if kind == b'S':
+        if len(data) - pos < STATE_HEADER.size:
+            return None
+        mask = data[pos + STATE_HEADER.size - 1]
+        return STATE_HEADER.size + FIELD_STRUCTS[mask & ALL_FIELDS].size
+    size = {b'J': JOIN.size, b'I': INPUT.size, b'Q': 1, b'T': STATS.size}.get(kind)
+    if size is None:
+        raise ValueError(f'unknown message type {kind!r}')
+    return size
+
+
+class Room:
+    __slots__ = ('id', 'state', 'keys', 'ack', 'clients', 'last')
+
+    def __init__(self, room_id):
+        self.id = room_id
+        self.state = paddle_physics.GameState()
+        self.keys = 0
+        self.ack = 0
+        self.clients = []  # clients[0] controls the paddle
+        self.last = None   # field values in the last broadcast
+
+
+class ClientConnection(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.room = None
+        self.buffer = bytearray()
+        self.paused_at = None  # tick when the write buffer filled up
+        self.resync = False    # send a full state next, not a delta
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        self.server.clients += 1
+
+    def pause_writing(self):
+        self.paused_at = self.server.ticks
+
+    def resume_writing(self):
+        # The deltas skipped meanwhile are gone; start over from everything
+        self.paused_at = None
+        self.resync = True
+
+    def connection_lost(self, exc):
+        self.server.clients -= 1
+        if self.room is not None:
+            self.server.leave(self)
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        pos = 0
+        try:
+            while pos < len(buffer):
+                size = message_size(buffer, pos)
+                if size is None or len(buffer) - pos < size:
+                    break
+                self.handle(buffer, pos)
+                pos += size
+        except ValueError:
+            self.transport.close()
+            return
+        del buffer[:pos]
+
+    def handle(self, data, pos):
+        kind = data[pos:pos + 1]
+        if kind == b'I':
+            _, keys, seq = INPUT.unpack_from(data, pos)
+            room = self.room
+            if room is not None and room.clients[0] is self:
+                room.keys = keys
+                room.ack = seq
+        elif kind == b'J':
+            _, room_id = JOIN.unpack_from(data, pos)
+            if self.room is not None:
+                self.server.leave(self)
+            self.server.join(self, room_id)
+        elif kind == b'Q':
+            self.transport.write(self.server.stats())
+        else:
+            raise ValueError(f'unexpected message {kind!r}')
+
+
+class GameServer:
+    def __init__(self, tick_rate=TICK_RATE):
+        self.tick_time = 1.0 / tick_rate
+        self.stall_ticks = round(STALL_SECONDS * tick_rate)
+        self.rooms = {}
+        self.clients = 0
+        self.ticks = 0
+        self.tick_us = 0.0  # moving average of time spent per tick
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(lambda: ClientConnection(self), host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    def join(self, client, room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id)
+        room.clients.append(client)
+        client.room = room
+        # Newcomers get every field once, then deltas with everyone else
+        client.transport.write(encode_state(self.ticks, room.ack, state_values(room.state), None))
+
+    def leave(self, client):
+        room = client.room
+        client.room = None
+        room.clients.remove(client)
+        if not room.clients:
+            del self.rooms[room.id]
+
+    def stats(self):
+        return STATS.pack(b'T', self.ticks, len(self.rooms), self.clients, rss_bytes(), self.tick_us)
+
+    def tick(self):
+        self.ticks += 1
+        tick = self.ticks
+        step = paddle_physics.step
+        for room in self.rooms.values():
+            state = room.state
+            keys = room.keys
+            step(state, keys & KEY_UP, keys & KEY_DOWN)
+            over = state.over
+            values = state_values(state)
+            message = encode_state(tick, room.ack, values, room.last, over)
+            full = None
+            for client in room.clients:
+                if client.paused_at is not None:
+                    # Backed up: skip it, or drop it if it has been too long
+                    if tick - client.paused_at > self.stall_ticks:
+                        client.transport.abort()
+                elif client.resync:
+                    if full is None:
+                        full = encode_state(tick, room.ack, values, None, over)
+                    client.transport.write(full)
+                    client.resync = False
+                else:
+                    client.transport.write(message)
+            if over:
+                room.state = paddle_physics.GameState()
+                values = None  # next broadcast carries the full new game
+            room.last = values
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            self.tick()
+            self.tick_us += ((time.perf_counter() - start) * 1e6 - self.tick_us) * 0.05
+            next_tick += self.tick_time
+            delay = next_tick - loop.time()
+            if delay < -5 * self.tick_time:
+                # Too far behind: drop the backlog rather than bursting
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(delay, 0))
+
+    async def serve_forever(self, host, port):
+        port = await self.start(host, port)
+        print(f'Bounce Master server on {host}:{port}, {1 / self.tick_time:.0f} ticks/sec', flush=True)
+        await self.run()
+
+
+class BotClient(asyncio.Protocol):
+    # Loopback client used by the load test: joins a room, mirrors the state
+    # from deltas, steers with paddle_physics.tracking_bot and records the
+    # input-to-state latency of every acknowledged input
+    def __init__(self, room_id, input_every=6):
+        self.room_id = room_id
+        self.input_every = input_every
+        self.transport = None
+        self.buffer = bytearray()
+        self.values = [0] * len(FIELDS)
+        self.seq = 0
+        self.sent = {}  # seq -> send time
+        self.latencies = []
+        self.states = 0
+        self.stats = None
+        self.stats_ready = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(JOIN.pack(b'J', self.room_id))
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        pos = 0
+        while pos < len(buffer):
+            size = message_size(buffer, pos)
+            if size is None or len(buffer) - pos < size:
+                break
+            if buffer[pos:pos + 1] == b'S':
+                self.on_state(buffer, pos)
+            else:
+                self.stats = STATS.unpack_from(buffer, pos)[1:]
+                if self.stats_ready is not None:
+                    self.stats_ready.set_result(self.stats)
+                    self.stats_ready = None
+            pos += size
+        del buffer[:pos]
+
+    def on_state(self, data, pos):
+        _, tick, ack, mask = STATE_HEADER.unpack_from(data, pos)
+        changed = FIELD_STRUCTS[mask & ALL_FIELDS].unpack_from(data, pos + STATE_HEADER.size)
+        values = self.values
+        j = 0
+        for i in range(len(FIELDS)):
+            if mask & (1 << i):
+                values[i] = changed[j]
+                j += 1
+        now = time.perf_counter()
+        sent = self.sent
+        while sent and min(sent) <= ack:
+            self.latencies.append(now - sent.pop(min(sent)))
+        self.states += 1
+        if self.states % self.input_every == 0:
+            paddle_y, ball_y = values[0], values[2]
+            centre = paddle_y + paddle_physics.PADDLE_HEIGHT // 2
+            target = ball_y + paddle_physics.BALL_SIZE // 2
+            keys = ((KEY_UP if target < centre - paddle_physics.PADDLE_SPEED else 0) |
+                    (KEY_DOWN if target > centre + paddle_physics.PADDLE_SPEED else 0))
+            self.seq += 1
+            sent[self.seq] = now
+            self.transport.write(INPUT.pack(b'I', keys, self.seq))
+
+    async def query_stats(self, timeout=5.0):
+        self.stats_ready = asyncio.get_running_loop().create_future()
+        self.transport.write(b'Q')
+        return await asyncio.wait_for(self.stats_ready, timeout)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def load_test(rooms=1000, seconds=10.0, tick_rate=TICK_RATE, connect_batch=200):
+    # Starts a server subprocess, connects one bot per room over loopback
+    # and reports ticks/sec, latency percentiles and memory per room
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), 'serve', '--port', '0', '--tick-rate', str(tick_rate),
+        stdout=asyncio.subprocess.PIPE)
+    line = (await proc.stdout.readline()).decode()
+    port = int(line.split(':')[1].split(',')[0])
+    loop = asyncio.get_running_loop()
+    try:
+        _, probe = await loop.create_connection(lambda: BotClient(0xFFFFFFFF), '127.0.0.1', port)
+        await asyncio.sleep(0.5)
+        base = await probe.query_stats()
+
+        bots = []
+        for start in range(0, rooms, connect_batch):
+            batch = [loop.create_connection(lambda i=i: BotClient(i), '127.0.0.1', port)
+                     for i in range(start, min(rooms, start + connect_batch))]
+            bots += [protocol for _, protocol in await asyncio.gather(*batch)]
+        await asyncio.sleep(1.0)  # let the server settle before measuring
+        for bot in bots:
+            bot.latencies.clear()
+
+        before = await probe.query_stats()
+        began = time.perf_counter()
+        await asyncio.sleep(seconds)
+        after = await probe.query_stats()
+        elapsed = time.perf_counter() - began
+
+        per_room_p99 = []
+        samples = []
+        for bot in bots:
+            latencies = sorted(bot.latencies)
+            samples += latencies
+            per_room_p99.append(percentile(latencies, 0.99))
+        samples.sort()
+        per_room_p99.sort()
+        for bot in bots:
+            bot.transport.close()
+        probe.transport.close()
+        return {
+            'rooms': rooms,
+            'ticks_per_sec': (after[0] - before[0]) / elapsed,
+            'target_ticks_per_sec': tick_rate,
+            'tick_cost_us': after[4],
+            'latency_ms': {name: percentile(samples, q) * 1000
+                           for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))},
+            'worst_room_p99_ms': (per_room_p99[-1] if per_room_p99 else 0.0) * 1000,
+            'median_room_p99_ms': percentile(per_room_p99, 0.5) * 1000,
+            'rss_base_mb': base[3] / 2 ** 20,
+            'rss_mb': after[3] / 2 ** 20,
+            'bytes_per_room': (after[3] - base[3]) / max(rooms, 1),
+        }
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bounce Master multiplayer server')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='run the server')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=7777)
+    serve.add_argument('--tick-rate', type=int, default=TICK_RATE)
+    test = sub.add_parser('loadtest', help='run loopback bots against a server subprocess')
+    test.add_argument('--rooms', type=int, default=1000)
+    test.add_argument('--seconds', type=float, default=10.0)
+    test.add_argument('--tick-rate', type=int, default=TICK_RATE)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = GameServer(args.tick_rate)
+        try:
+            asyncio.run(server.serve_forever(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(load_test(args.rooms, args.seconds, args.tick_rate))
+        print(f"{result['rooms']} rooms: {result['ticks_per_sec']:.1f} ticks/sec "
+              f"(target {result['target_ticks_per_sec']}), {result['tick_cost_us']:.0f} us per tick")
+        latency = result['latency_ms']
+        print(f"input latency: p50 {latency['p50']:.2f} ms  p95 {latency['p95']:.2f} ms  "
+              f"p99 {latency['p99']:.2f} ms  (per-room p99: median {result['median_room_p99_ms']:.2f} ms, "
+              f"worst {result['worst_room_p99_ms']:.2f} ms)")
+        print(f"memory: {result['rss_base_mb']:.1f} MB idle -> {result['rss_mb']:.1f} MB, "
+              f"{result['bytes_per_room']:.0f} bytes per room")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import sys
+import time
+
+import numpy as np
+
+from snake_rules import DIRECTIONS, OPPOSITE, RIGHT
+
+# NumPy version of snake_rules.step() that advances many independent snake
+# games in lockstep, for training agents and large analyses without a
+# window. The rules are the same: the head moves one cell a step, leaving
+# the board or running into the body (tail included) ends the game, food
+# makes the snake one longer and new food lands on a random empty cell.
+#
+# Each game's board is one row of `board` (cell y * width + x holds EMPTY,
+# FOOD, BODY or HEAD), which is both the collision grid and the
+# observation. The body is a ring buffer of cell indices per game, so a
+# move writes the new head and clears the tail cell without shifting
+# anything. Food comes from each game's own xorshift64* generator, seeded
+# from the game's seed, so a batch replays exactly for the same seeds and
+# actions; the picks differ from snake_rules' random.Random ones.
+#
+# BatchEnv.step(actions) follows the Gym vector-env convention: it returns
+# (observations, rewards, dones, info), and games that ended are reset in
+# the same call; their final scores are in info['score'].
+
+EMPTY, FOOD, BODY, HEAD = 0, 1, 2, 3
+
+# Actions index snake_rules.DIRECTIONS
+ACTIONS = len(DIRECTIONS)
+_DX = np.array([d[0] for d in DIRECTIONS], dtype=np.int32)
+_DY = np.array([d[1] for d in DIRECTIONS], dtype=np.int32)
+_REVERSE = np.array([DIRECTIONS.index(OPPOSITE[d]) for d in DIRECTIONS], dtype=np.int8)
+_START_DIRECTION = DIRECTIONS.index(RIGHT)
+
+# Rewards
+EAT_REWARD = 1.0
+DEATH_REWARD = -1.0
+
+_U64 = np.uint64
+
+
+def _splitmix64(values):
+    # Well-mixed non-zero generator states from small integer seeds
+    z = values.astype(_U64) + _U64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> _U64(27))) * _U64(0x94D049BB133111EB)
+    z ^= z >> _U64(31)
+    return np.where(z == 0, _U64(1), z)
+
+
+class BatchEnv:
+    def __init__(self, n, width=20, height=20, seed=0, max_hunger=None):
+        # n games on width x height boards; game i's food generator is
+        # seeded with seed + i. max_hunger: end (truncate) a game after this
+        # many steps without food, so agents that circle forever are reset.
+        self.n = n
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.max_hunger = max_hunger
+        self.rows = np.arange(n)
+        self.board = np.zeros((n, self.cells), dtype=np.uint8)
+        self.body = np.zeros((n, self.cells), dtype=np.int32)  # ring buffer of cells
+        self.head_pos = np.zeros(n, dtype=np.int32)            # ring index of the head
+        self.length = np.zeros(n, dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int32)                # head cell
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.food = np.zeros(n, dtype=np.int32)                # -1: board full
+        self.score = np.zeros(n, dtype=np.int32)
+        self.hunger = np.zeros(n, dtype=np.int32)              # steps since food
+        self.rng = _splitmix64(np.arange(seed, seed + n, dtype=np.int64))
+        self.reset()
+
+    def observations(self):
+        # (n, height, width) view of the boards; copy it to keep a frame
+        return self.board.reshape(self.n, self.height, self.width)
+
+    def reset(self, mask=None):
+        # Restart every game, or only the games selected by a boolean mask;
+        # returns the observations. Generators carry on from where they were.
+        idx = self.rows if mask is None else np.flatnonzero(mask)
+        if len(idx):
+            start = (self.height // 2) * self.width + self.width // 2
+            self.board[idx] = EMPTY
+            self.board[idx, start] = HEAD
+            self.body[idx, 0] = start
+            self.head_pos[idx] = 0
+            self.length[idx] = 1
+            self.head[idx] = start
+            self.direction[idx] = _START_DIRECTION
+            self.score[idx] = 0
+            self.hunger[idx] = 0
+            self._place_food(idx)
+        return self.observations()
+
+    def step(self, actions):
+        # actions: one index into snake_rules.DIRECTIONS per game; turning
+        # straight back is ignored, as in snake_rules.step
+        actions = np.asarray(actions, dtype=np.int8)
+        rows = self.rows
+        board = self.board
+        width = self.width
+
+        direction = np.where(actions == _REVERSE[self.direction], self.direction, actions)
+        self.direction[:] = direction
+        x = self.head % width + _DX[direction]
+        y = self.head // width + _DY[direction]
+        outside = (x < 0) | (x >= width) | (y < 0) | (y >= self.height)
+        new = np.where(outside, 0, y * width + x)
+        target = board[rows, new]
+        died = outside | (target >= BODY)
+        ate = ~died & (target == FOOD)
+
+        # Move the survivors: old head becomes body, then the tail of every
+        # snake that didn't eat is released
+        alive = np.flatnonzero(~died)
+        head = self.head[alive]
+        new_head = new[alive]
+        board[alive, head] = BODY
+        board[alive, new_head] = HEAD
+        head_pos = (self.head_pos[alive] + 1) % self.cells
+        self.head_pos[alive] = head_pos
+        self.body[alive, head_pos] = new_head
+        self.head[alive] = new_head
+        grew = ate[alive]
+        moved = alive[~grew]
+        tail_pos = (self.head_pos[moved] - self.length[moved]) % self.cells
+        board[moved, self.body[moved, tail_pos]] = EMPTY
+
+        eaters = alive[grew]
+        self.length[eaters] += 1
+        self.score[eaters] += 1
+        self.hunger += 1
+        self.hunger[eaters] = 0
+        if len(eaters):
+            self._place_food(eaters)
+
+        done = died | (self.food < 0)
+        if self.max_hunger is not None:
+            done |= self.hunger >= self.max_hunger
+        rewards = ate * EAT_REWARD + died * DEATH_REWARD
+        info = {'died': died}
+        if done.any():
+            info['score'] = np.where(done, self.score, -1)
+            self.reset(done)
+        return self.observations(), rewards, done, info
+
+    def food_actions(self):
+        # Simple vectorised policy for benchmarks: head for the food, x
+        # first, ignoring the body
+        width = self.width
+        dx = self.food % width - self.head % width
+        dy = self.food // width - self.head // width
+        return np.where(dx > 0, DIRECTIONS.index(RIGHT),
+                        np.where(dx < 0, DIRECTIONS.index((-1, 0)),
+                                 np.where(dy < 0, DIRECTIONS.index((0, -1)),
+                                          DIRECTIONS.index((0, 1))))).astype(np.int8)
+
+    def _random(self, idx):
+        # Next 31-bit draw from the generators of games idx
+        x = self.rng[idx]
+        x ^= x >> _U64(12)
+        x ^= x << _U64(25)
+        x ^= x >> _U64(27)
+        self.rng[idx] = x
+        return (x * _U64(0x2545F4914F6CDD1D)) >> _U64(33)
+
+    def _place_food(self, idx):
+        # Food on a uniformly chosen empty cell: the r-th empty cell of the
+        # board for a random r, or -1 when there is none left
+        empty = self.board[idx] == EMPTY
+        counts = empty.sum(axis=1)
+        pick = (self._random(idx) % np.maximum(counts, 1).astype(_U64)).astype(np.int64)
+        cell = np.argmax(np.cumsum(empty, axis=1) > pick[:, None], axis=1)
+        full = counts == 0
+        self.food[idx] = np.where(full, -1, cell)
+        placed = idx[~full]
+        self.board[placed, cell[~full]] = FOOD
+
+
+def benchmark(n=4096, steps=1_000, width=20, height=20):
+    # Env-steps per second with the food-seeking policy
+    env = BatchEnv(n, width, height, max_hunger=4 * width * height)
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(env.food_actions())
+    elapsed = time.perf_counter() - start
+    return n * steps / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    print(f'{benchmark(n, steps):,.0f} env-steps/sec across {n:,} games')
@@ -0,0 +1,96 @@
+import random
+from array import array
+from collections import deque
+
+# Snake body shared by snake_game and terminal_snake. The body is a deque of
+# (x, y) cells, head first, backed by a bytearray occupancy grid so collision
+# checks are O(1). Cells that are neither snake nor blocked are kept in a
+# free-cell list (with a reverse index for O(1) swap-removal), so picking a
+# random free cell for food is O(1) no matter how full the board is.
+
+SNAKE = 1
+BLOCKED = 2
+
+
+class SnakeBody:
+    def __init__(self, width, height, cells=()):
+        self.width = width
+        self.height = height
+        self.cells = deque()
+        self.grid = bytearray(width * height)
+        self.free = array('i', range(width * height))
+        self.free_pos = array('i', range(width * height))
+        for cell in cells:
+            self.push_tail(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __contains__(self, cell):
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y * self.width + x] & SNAKE
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    @property
+    def tail(self):
+        return self.cells[-1]
+
+    def in_bounds(self, cell):
+        return 0 <= cell[0] < self.width and 0 <= cell[1] < self.height
+
+    def push_head(self, cell):
+        self._occupy(cell)
+        self.cells.appendleft(cell)
+
+    def push_tail(self, cell):
+        self._occupy(cell)
+        self.cells.append(cell)
+
+    def pop_tail(self):
+        cell = self.cells.pop()
+        self._release(cell)
+        return cell
+
+    def block(self, cell):
+        # Keep a cell out of the free list (e.g. walls) without making it snake
+        index = cell[1] * self.width + cell[0]
+        if not self.grid[index]:
+            self._take_free(index)
+        self.grid[index] |= BLOCKED
+
+    def free_count(self):
+        return len(self.free)
+
+    def random_free(self, rng=random):
+        # Uniformly random free cell, or None when the board is full
+        if not self.free:
+            return None
+        index = self.free[int(rng.random() * len(self.free))]
+        return (index % self.width, index // self.width)
+
+    def _occupy(self, cell):
+        index = cell[1] * self.width + cell[0]
+        if not self.grid[index]:
+            self._take_free(index)
+        self.grid[index] |= SNAKE
+
+    def _release(self, cell):
+        index = cell[1] * self.width + cell[0]
+        self.grid[index] &= ~SNAKE
+        if not self.grid[index]:
+            self.free_pos[index] = len(self.free)
+            self.free.append(index)
+
+    def _take_free(self, index):
+        # Swap the last free cell into this slot and shrink the list
+        pos = self.free_pos[index]
+        last = self.free.pop()
+        if last != index:
+            self.free[pos] = last
+            self.free_pos[last] = pos
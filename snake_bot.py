@@ -0,0 +1,255 @@
+import heapq
+import sys
+import time
+from collections import deque
+
+from snake_body import SNAKE, SnakeBody
+from snake_rules import DIRECTIONS, RIGHT
+
+# Autopilot for the snake games (soak tests and attract mode). It steers
+# along an A* path to the food, but only if the snake could still reach its
+# own tail after eating; otherwise it chases its tail until the food becomes
+# safe to take.
+#
+# Planning is incremental. A food plan stays valid until the food is eaten,
+# because until then the tail only vacates cells and the head only takes
+# the planned ones, so it is searched once per food rather than once per
+# move. A tail-chasing plan is
+# extended in O(1) per move with the tail's new cell, so the head follows
+# the tail's own route and can never catch up with it. Searches only run
+# again when a plan is used up or its next cell turns out to be blocked,
+# and retries after a failed search are spaced out.
+
+FOOD = 'food'
+TAIL = 'tail'
+RETRY_MOVES = 8  # moves between retries of a failed or deferred search
+ROOM_LIMIT = 1024  # most cells counted when sizing up open space
+
+
+class Autopilot:
+    def __init__(self, snake, direction=RIGHT):
+        self.snake = snake
+        self.direction = direction
+        self.plan = deque()   # cells to visit, next move last
+        self.mode = None
+        self.food = None
+        self.last_tail = snake.tail
+        self.food_retry_in = 0
+        self.tail_retry_in = 0
+        self.searches = 0
+
+    def next_direction(self, food):
+        snake = self.snake
+        tail = snake.tail
+        if tail != self.last_tail:
+            if self.mode == TAIL and self.plan:
+                self.plan.appendleft(tail)
+            self.last_tail = tail
+        self.food_retry_in -= 1
+        self.tail_retry_in -= 1
+
+        grid = snake.grid
+        head = snake.head
+        guard = None
+        if len(snake) == 1:
+            # A lone head can't turn back either, so plan as if it had a neck
+            cell = (head[0] - self.direction[0], head[1] - self.direction[1])
+            if snake.in_bounds(cell):
+                guard = cell[1] * snake.width + cell[0]
+                grid[guard] |= SNAKE
+
+        if food != self.food or (self.mode == TAIL and self.food_retry_in <= 0):
+            self.food = food
+            if food is not None:
+                self._plan_food(food)
+        if not self.plan or not self._free(self.plan[-1]):
+            self.plan.clear()
+            if self.mode != TAIL or self.tail_retry_in <= 0:
+                self._plan_tail()
+
+        if self.plan:
+            cell = self.plan.pop()
+        else:
+            cell = self._roomiest_neighbour(head)
+        if guard is not None:
+            grid[guard] &= ~SNAKE
+        if cell is None:
+            return self.direction  # boxed in; nothing is safe
+        self.direction = (cell[0] - head[0], cell[1] - head[1])
+        return self.direction
+
+    def _free(self, cell):
+        x, y = cell
+        snake = self.snake
+        return 0 <= x < snake.width and 0 <= y < snake.height and not snake.grid[y * snake.width + x]
+
+    def _plan_food(self, food):
+        snake = self.snake
+        path = _astar(snake.grid, snake.width, snake.height, snake.head, food)
+        self.searches += 1
+        if path is not None and self._safe_after(path):
+            self.plan = deque(path)
+            self.mode = FOOD
+        elif self.mode == FOOD:
+            self.plan.clear()
+        self.food_retry_in = RETRY_MOVES
+
+    def _safe_after(self, path):
+        # After following path and eating, can the head still reach the tail?
+        snake = self.snake
+        width = snake.width
+        grid = bytearray(snake.grid)
+        body = list(snake.cells)
+        length = len(body) + 1
+        # path is stored reversed: path[0] is the food, path[-1] the next cell
+        virtual = path + body
+        for x, y in path:
+            grid[y * width + x] |= SNAKE
+        for x, y in virtual[length - 1:]:
+            # Vacated by then; the new tail moves on as the head advances
+            grid[y * width + x] &= ~SNAKE
+        tail = virtual[length - 1]
+        self.searches += 1
+        return _astar(grid, width, snake.height, path[0], tail, adjacent_ok=False) is not None
+
+    def _plan_tail(self):
+        snake = self.snake
+        tail = snake.tail
+        grid = snake.grid
+        index = tail[1] * snake.width + tail[0]
+        # The tail cell is free by the time the head gets there
+        saved = grid[index]
+        grid[index] = 0
+        path = _astar(grid, snake.width, snake.height, snake.head, tail, adjacent_ok=False)
+        grid[index] = saved
+        self.searches += 1
+        self.plan = deque(path or ())
+        self.mode = TAIL
+        self.tail_retry_in = RETRY_MOVES
+
+    def _roomiest_neighbour(self, head):
+        # No usable plan: step towards the most open space. Room beyond one
+        # snake length (or ROOM_LIMIT) makes no difference, so stop counting
+        # there to keep the flood cheap on big boards.
+        snake = self.snake
+        limit = min(len(snake) + 1, ROOM_LIMIT)
+        best = None
+        best_room = -1
+        for dx, dy in DIRECTIONS:
+            cell = (head[0] + dx, head[1] + dy)
+            if self._free(cell):
+                room = _room(snake.grid, snake.width, snake.height, cell, limit)
+                if room > best_room:
+                    best, best_room = cell, room
+        return best
+
+
+def _room(grid, width, height, start, limit):
+    # Number of free cells reachable from start, counting up to limit
+    seen = {start[1] * width + start[0]}
+    frontier = [start[1] * width + start[0]]
+    while frontier and len(seen) < limit:
+        index = frontier.pop()
+        x = index % width
+        y = index // width
+        for nx, ny, neighbour in ((x + 1, y, index + 1), (x - 1, y, index - 1),
+                                  (x, y + 1, index + width), (x, y - 1, index - width)):
+            if 0 <= nx < width and 0 <= ny < height and not grid[neighbour] and neighbour not in seen:
+                seen.add(neighbour)
+                frontier.append(neighbour)
+    return len(seen)
+
+
+def _astar(grid, width, height, start, goal, adjacent_ok=True):
+    # Shortest 4-connected path over free cells (grid value 0) from start
+    # to goal, returned goal first and excluding start; None if unreachable.
+    # adjacent_ok=False rules out the one-step path, for chasing a tail
+    # (moving onto the tail cell while the tail is still on it is a crash).
+    # The search runs backwards from the goal: an unreachable goal is
+    # nearly always the food or the tail shut in a small pocket, so a failed
+    # search costs the size of the pocket rather than of the whole board.
+    start_x, start_y = start
+    start_index = start_y * width + start_x
+    goal_index = goal[1] * width + goal[0]
+    came_from = {goal_index: -1}
+    cost = {goal_index: 0}
+    # Ties on f go to the deepest node, so open ground costs about the path
+    # length instead of a whole diamond of equally good cells
+    heap = [(abs(goal[0] - start_x) + abs(goal[1] - start_y), 0, goal_index)]
+    while heap:
+        _, g, index = heapq.heappop(heap)
+        g = -g
+        if index == start_index:
+            path = []
+            index = came_from[index]
+            while index != -1:
+                path.append((index % width, index // width))
+                index = came_from[index]
+            path.reverse()
+            return path
+        if g > cost[index]:
+            continue
+        x = index % width
+        y = index // width
+        g += 1
+        for nx, ny, neighbour in ((x + 1, y, index + 1), (x - 1, y, index - 1),
+                                  (x, y + 1, index + width), (x, y - 1, index - width)):
+            if 0 <= nx < width and 0 <= ny < height and (not grid[neighbour] or neighbour == start_index):
+                if neighbour == start_index and index == goal_index and not adjacent_ok:
+                    continue
+                if g < cost.get(neighbour, sys.maxsize):
+                    cost[neighbour] = g
+                    came_from[neighbour] = index
+                    heapq.heappush(heap, (g + abs(nx - start_x) + abs(ny - start_y), -g, neighbour))
+    return None
+
+
+def _serpentine_snake(width, height, length):
+    # Long snake laid out row by row from the top, head at the end
+    cells = []
+    for y in range(height):
+        row = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        for x in row:
+            cells.append((x, y))
+            if len(cells) == length:
+                return SnakeBody(width, height, reversed(cells))
+    raise ValueError('snake does not fit on the board')
+
+
+def benchmark(sizes=(20, 100, 500, 1000), fill=(0.01, 0.25, 0.5), moves=200):
+    # Mean and worst planning time per move for each grid size and snake
+    # length (as a fraction of the board)
+    import random
+    import snake_rules
+
+    results = []
+    for size in sizes:
+        for fraction in fill:
+            length = max(2, int(size * size * fraction))
+            state = snake_rules.SnakeState(size, size, seed=size)
+            state.snake = _serpentine_snake(size, size, length)
+            head, neck = state.snake.cells[0], state.snake.cells[1]
+            state.direction = (head[0] - neck[0], head[1] - neck[1])
+            state.food = state.snake.random_free(random.Random(size))
+            pilot = Autopilot(state.snake)
+            times = []
+            for _ in range(moves):
+                start = time.perf_counter()
+                direction = pilot.next_direction(state.food)
+                times.append(time.perf_counter() - start)
+                snake_rules.step(state, direction)
+                if state.over:
+                    break
+            results.append({
+                'grid': size, 'length': length, 'moves': len(times),
+                'mean_ms': sum(times) / len(times) * 1000, 'max_ms': max(times) * 1000,
+                'searches': pilot.searches, 'alive': not state.over,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    for r in benchmark():
+        print(f"{r['grid']:>4}x{r['grid']:<4} length {r['length']:>7}: mean {r['mean_ms']:8.3f} ms  "
+              f"max {r['max_ms']:8.2f} ms  searches {r['searches']:>3} over {r['moves']} moves"
+              f"{'' if r['alive'] else '  (died)'}")
@@ -1,10 +1,24 @@
 import pygame
+import argparse
+import os
 import sys
 import random
 
+import audio
+import frame_profiler
+import game_loop
+import leaderboard
+import persistence
+import replay
+import snake_bot
+import snake_render
+import snake_rules
+import snake_world
+import text_cache
+from snake_rules import UP, DOWN, LEFT, RIGHT
+
 # Initialize Pygame
 pygame.init()
-pygame.mixer.init()
 
 # Game settings
 CELL_SIZE = 20
@@ -12,7 +26,14 @@ GRID_WIDTH = 20
 GRID_HEIGHT = 20
 SCREEN_WIDTH = CELL_SIZE * GRID_WIDTH
 SCREEN_HEIGHT = CELL_SIZE * GRID_HEIGHT
-FPS = 5
+# The snake moves MOVES_PER_SECOND cells a second on a fixed timestep;
+# frames are drawn (and input polled) at RENDER_FPS, interpolating in between
+MOVES_PER_SECOND = 5
+RENDER_FPS = 60
+# Big-world mode (--world WxH or --world endless): the world is stored in
+# chunks and the window is a camera VIEW_WIDTH x VIEW_HEIGHT cells in size
+world_size = None  # (width, height); None for either means no edge
+VIEW_WIDTH, VIEW_HEIGHT = 32, 24
 
 # Colors
 WHITE = (255, 255, 255)
@@ -20,42 +41,77 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 BLACK = (0, 0, 0)
 
-# Directions
-UP = (0, -1)
-DOWN = (0, 1)
-LEFT = (-1, 0)
-RIGHT = (1, 0)
+# Scores go to the leaderboard shared with paddle_game, under this player
+# name (--player)
+GAME = 'snake'
+WORLD_GAME = 'snake-world'
+player = leaderboard.default_player()
+
+# Directory to save a replay log of each session in (--record DIR)
+record_dir = None
+# Let snake_bot steer (--bot), for soak tests and attract mode
+bot = False
+# Frame profiler overlay (--profile, F3 toggles) and per-frame JSONL log
+# (--profile-log FILE)
+profile = False
+profile_log = None
+
+# A synthesized chirp stands in for a missing eat.wav
+sounds = audio.AudioManager({'eat': ('eat.wav', (440, 880, 90), 0.5)})
 
 def draw_rect(screen, color, pos):
     rect = pygame.Rect(pos[0] * CELL_SIZE, pos[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
     pygame.draw.rect(screen, color, rect)
 
-def random_food(snake):
-    while True:
-        pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-        if pos not in snake:
-            return pos
+def draw_rect_between(screen, color, start, end, alpha):
+    # Cell drawn part way from start to end, for interpolated movement
+    x = start[0] + (end[0] - start[0]) * alpha
+    y = start[1] + (end[1] - start[1]) * alpha
+    rect = pygame.Rect(round(x * CELL_SIZE), round(y * CELL_SIZE), CELL_SIZE, CELL_SIZE)
+    pygame.draw.rect(screen, color, rect)
+
+def parse_world(text):
+    # 'endless' or WxH, for --world
+    if text == 'endless':
+        return (None, None)
+    try:
+        width, height = (int(n) for n in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH or 'endless', not {text!r}")
+    if width < 2 or height < 2:
+        raise argparse.ArgumentTypeError('the world must be at least 2x2')
+    return (width, height)
+
+def parse_seed(text):
+    # A seed replay logs can store (an unsigned 64-bit integer), for --seed
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected an integer, not {text!r}')
+    if not 0 <= seed <= replay.MAX_SEED:
+        raise argparse.ArgumentTypeError(f'the seed must be from 0 to {replay.MAX_SEED}')
+    return seed
 
-def main():
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+def main(seed=None):
+    world = world_size is not None
+    if world:
+        screen = pygame.display.set_mode((VIEW_WIDTH * CELL_SIZE, VIEW_HEIGHT * CELL_SIZE))
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption('Snake Game')
     clock = pygame.time.Clock()
     
     # Set up font for score
     font = pygame.font.SysFont('Arial', 24)
 
-    # Load sound (use a simple beep if no file)
-    try:
-        eat_sound = pygame.mixer.Sound('eat.wav')
-    except:
-        eat_sound = None
+    sounds.start()
 
     # Start screen
     screen.fill(BLACK)
-    start_text = font.render('Press any key to start', True, WHITE)
-    screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, SCREEN_HEIGHT // 2 - start_text.get_height() // 2))
+    start_text = text_cache.render(font, 'Press any key to start', True, WHITE)
+    screen.blit(start_text, (screen.get_width() // 2 - start_text.get_width() // 2, screen.get_height() // 2 - start_text.get_height() // 2))
     pygame.display.flip()
-    waiting = True
+    waiting = not bot
     while waiting:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -64,69 +120,140 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 waiting = False
 
-    snake = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-    direction = RIGHT
-    food = random_food(snake)
-    score = 0
+    # All game rules and the seeded food RNG live in snake_rules
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    # (big worlds: snake_world, drawn through a camera; no replays, since
+    # replay only knows the classic rules)
+    if world:
+        rules = snake_world
+        game = snake_world.WorldState(*world_size, seed)
+        renderer = snake_render.WorldRenderer(screen, VIEW_WIDTH, VIEW_HEIGHT)
+        recorder = None
+    else:
+        rules = snake_rules
+        game = snake_rules.SnakeState(GRID_WIDTH, GRID_HEIGHT, seed)
+        renderer = None
+        recorder = replay.Recorder(replay.SNAKE, seed, GRID_WIDTH, GRID_HEIGHT)
+    snake = game.snake
+    name = WORLD_GAME if world else GAME
+    # One board for the session, opened before play starts; writes go to a
+    # background thread and lookups are loaded now, off the frame loop
+    board = leaderboard.Leaderboard(background=True)
+    board.preload(name, player)
+    next_direction = game.direction
+    pilot = snake_bot.Autopilot(snake, game.direction) if bot and not world else None
 
+    timestep = game_loop.FixedTimestep(MOVES_PER_SECOND)
+    profiler = frame_profiler.create(profile, profile_log, RENDER_FPS)
     running = True
     while running:
-        clock.tick(FPS)
+        profiler.start_frame()
+        clock.tick(RENDER_FPS)
+        profiler.lap('wait')
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
+                # Compare against the last direction actually moved, so two
+                # quick presses within one move can't reverse the snake
+                direction = game.direction
                 if event.key == pygame.K_UP and direction != DOWN:
-                    direction = UP
+                    next_direction = UP
                 elif event.key == pygame.K_DOWN and direction != UP:
-                    direction = DOWN
+                    next_direction = DOWN
                 elif event.key == pygame.K_LEFT and direction != RIGHT:
-                    direction = LEFT
+                    next_direction = LEFT
                 elif event.key == pygame.K_RIGHT and direction != LEFT:
-                    direction = RIGHT
-
-        # Move snake
-        new_head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
-        # Check collisions
-        if (
-            new_head[0] < 0 or new_head[0] >= GRID_WIDTH or
-            new_head[1] < 0 or new_head[1] >= GRID_HEIGHT or
-            new_head in snake
-        ):
-            print(f'Game Over! Your score: {score}')
-            # Show Game Over on screen
-            screen.fill(BLACK)
-            over_text = font.render(f'Game Over! Score: {score}', True, RED)
-            screen.blit(over_text, (SCREEN_WIDTH // 2 - over_text.get_width() // 2, SCREEN_HEIGHT // 2 - over_text.get_height() // 2))
-            pygame.display.flip()
-            pygame.time.wait(2000)  # Wait 2 seconds
-            running = False
+                    next_direction = RIGHT
+        profiler.lap('events')
+
+        for _ in range(timestep.advance()):
+            # Move snake
+            if pilot is not None:
+                next_direction = pilot.next_direction(game.food)
+            elif bot:
+                next_direction = snake_world.food_bot(game)
+            if recorder is not None:
+                recorder.record(snake_rules.DIRECTIONS.index(next_direction))
+            events = rules.step(game, next_direction)
+            if renderer is not None:
+                renderer.moved(game)
+            profiler.lap('physics')
+            if snake_rules.DIED in events:
+                score = game.score
+                # Written in the background; rank and best come from memory
+                board.record(name, player, score)
+                board.flush()
+                rank = board.rank_of_score(name, score)
+                best = board.high_score(name)
+                print(f'Game Over! Your score: {score} (rank #{rank}, best {best})')
+                # Show Game Over on screen
+                screen.fill(BLACK)
+                over_text = text_cache.render(font, f'Game Over! Score: {score}', True, RED)
+                best_text = text_cache.render(font, f'Best: {best}', True, WHITE)
+                center_x = screen.get_width() // 2
+                center_y = screen.get_height() // 2
+                screen.blit(over_text, (center_x - over_text.get_width() // 2, center_y - over_text.get_height() // 2))
+                screen.blit(best_text, (center_x - best_text.get_width() // 2, center_y + over_text.get_height()))
+                pygame.display.flip()
+                pygame.time.wait(2000)  # Wait 2 seconds
+                running = False
+                break
+            if snake_rules.ATE in events:
+                sounds.play('eat')
+        if not running:
+            profiler.abort_frame()
             continue
-        snake.insert(0, new_head)
-        if new_head == food:
-            score += 1
-            food = random_food(snake)
-            # Play sound
-            if eat_sound:
-                eat_sound.play()
-            else:
-                # Fallback beep
-                pygame.mixer.music.load(pygame.mixer.Sound(buffer=b'\x00' * 1000))
-        else:
-            snake.pop()
 
-        # Draw everything
-        screen.fill(BLACK)
-        draw_rect(screen, RED, food)
-        for segment in snake:
-            draw_rect(screen, GREEN, segment)
+        # Draw everything; head and tail slide between cells
+        alpha = timestep.alpha
+        if renderer is not None:
+            # Only the viewport, from the renderer's layer of painted cells
+            renderer.paint(game, alpha)
+        else:
+            screen.fill(BLACK)
+            if game.food is not None:
+                draw_rect(screen, RED, game.food)
+            segments = iter(snake)
+            next(segments)
+            for segment in segments:
+                draw_rect(screen, GREEN, segment)
+            draw_rect_between(screen, GREEN, game.prev_head, snake.head, alpha)
+            if game.prev_tail is not None:
+                draw_rect_between(screen, GREEN, game.prev_tail, snake.tail, alpha)
         # Draw score
-        score_text = font.render(f'Score: {score}', True, WHITE)
+        score_text = text_cache.render(font, f'Score: {game.score}', True, WHITE)
         screen.blit(score_text, (10, 10))
+        profiler.draw(screen)
+        profiler.lap('draw')
         pygame.display.flip()
+        profiler.lap('flip')
+        profiler.end_frame()
 
+    profiler.close()
+    board.close()
+    if record_dir is not None and recorder is not None:
+        persistence.write_bytes(os.path.join(record_dir, recorder.filename()), recorder.encode(game.score))
+        persistence.flush()
     pygame.quit()
     sys.exit()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Snake Game')
+    parser.add_argument('--record', metavar='DIR', help='save a replay log of the session in DIR')
+    parser.add_argument('--seed', type=parse_seed, help='food RNG seed (random by default)')
+    parser.add_argument('--bot', action='store_true', help='let the autopilot play')
+    parser.add_argument('--world', type=parse_world, metavar='WxH', help="play on a big world (e.g. 10000x10000, or 'endless') through a scrolling camera")
+    parser.add_argument('--player', default=player, help='name to put on the leaderboard (default %(default)s)')
+    parser.add_argument('--profile', action='store_true', help='show frame timings (F3 toggles)')
+    parser.add_argument('--profile-log', metavar='FILE', help='write per-frame timings to FILE as JSON lines')
+    args = parser.parse_args()
+    record_dir = args.record
+    bot = args.bot
+    profile = args.profile
+    profile_log = args.profile_log
+    player = args.player
+    world_size = args.world
+    main(args.seed)
\ No newline at end of file
@@ -0,0 +1,199 @@
+import sys
+import time
+
+import pygame
+
+import snake_world
+
+# Camera renderer for snake_game --world. The world can be far bigger than
+# the window, so it keeps a layer surface a margin wider than the viewport
+# that holds the painted cells around the camera, and only changes what
+# changed: each move repaints the old head (now body), the old tail (now
+# empty) and any food that grew, one cached cell sprite each. Every frame is
+# one blit of the viewport's part of the layer plus the sliding head and
+# tail, so its cost depends on the viewport, not on the size of the world
+# or the length of the snake. When the camera gets close to the edge of the
+# layer, the layer is scrolled by whole cells and only the strip that came
+# into view is painted from the world.
+
+CELL_SIZE = 20
+MARGIN = 8  # cells of layer around the viewport on every side
+
+# Colors
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BACKGROUND = ((0, 0, 0), (16, 16, 24))  # checkerboard, so scrolling shows
+WALL = (64, 64, 80)                     # outside a bounded world
+
+
+def _sprite(color):
+    sprite = pygame.Surface((CELL_SIZE, CELL_SIZE))
+    sprite.fill(color)
+    return sprite
+
+
+class WorldRenderer:
+    def __init__(self, screen, view_width, view_height, margin=MARGIN):
+        # view_width, view_height: viewport size in cells
+        self.screen = screen
+        self.view_width = view_width
+        self.view_height = view_height
+        self.margin = margin
+        self.layer_width = view_width + 2 * margin
+        self.layer_height = view_height + 2 * margin
+        self.layer = pygame.Surface((self.layer_width * CELL_SIZE, self.layer_height * CELL_SIZE))
+        self.background = [_sprite(color) for color in BACKGROUND]
+        self.wall = _sprite(WALL)
+        self.body = _sprite(GREEN)
+        self.food = _sprite(RED)
+        self.origin = None  # world cell at the layer's top left; None: repaint
+
+    def invalidate(self):
+        # Paint the whole layer again on the next frame
+        self.origin = None
+
+    def moved(self, state):
+        # Call after every step, before the next frame is drawn. The new
+        # head's cell is cleared too, in case it held the food just eaten.
+        if self.origin is None:
+            return
+        for cell in (state.prev_head, state.snake.head, state.prev_tail, state.new_food):
+            if cell is not None:
+                self._paint_cell(state, cell)
+
+    def draw(self, state, alpha, overlay=None):
+        self.paint(state, alpha, overlay)
+        self.present()
+
+    def paint(self, state, alpha, overlay=None):
+        # Camera centred on the head as it slides from its last cell
+        snake = state.snake
+        head_x, head_y = _between(state.prev_head, snake.head, alpha)
+        camera_x = round((head_x + 0.5 - self.view_width / 2) * CELL_SIZE)
+        camera_y = round((head_y + 0.5 - self.view_height / 2) * CELL_SIZE)
+        self._follow(state, camera_x, camera_y)
+
+        screen = self.screen
+        origin_x, origin_y = self.origin
+        area = pygame.Rect(camera_x - origin_x * CELL_SIZE, camera_y - origin_y * CELL_SIZE,
+                           self.view_width * CELL_SIZE, self.view_height * CELL_SIZE)
+        screen.blit(self.layer, (0, 0), area)
+        screen.blit(self.body, (round(head_x * CELL_SIZE) - camera_x, round(head_y * CELL_SIZE) - camera_y))
+        if state.prev_tail is not None:
+            tail_x, tail_y = _between(state.prev_tail, snake.tail, alpha)
+            screen.blit(self.body, (round(tail_x * CELL_SIZE) - camera_x, round(tail_y * CELL_SIZE) - camera_y))
+        if overlay is not None:
+            screen.blit(*overlay)
+
+    def present(self, extra=None):
+        pygame.display.flip()
+
+    def _follow(self, state, camera_x, camera_y):
+        # Scroll the layer so it covers the viewport at the camera position
+        left = camera_x // CELL_SIZE
+        top = camera_y // CELL_SIZE
+        if self.origin is not None:
+            origin_x, origin_y = self.origin
+            if (origin_x <= left and left + self.view_width < origin_x + self.layer_width and
+                    origin_y <= top and top + self.view_height < origin_y + self.layer_height):
+                return
+        new_x = left - self.margin
+        new_y = top - self.margin
+        if self.origin is None:
+            self.origin = (new_x, new_y)
+            self._paint_area(state, 0, 0, self.layer_width, self.layer_height)
+            return
+        dx = origin_x - new_x
+        dy = origin_y - new_y
+        self.origin = (new_x, new_y)
+        if abs(dx) >= self.layer_width or abs(dy) >= self.layer_height:
+            self._paint_area(state, 0, 0, self.layer_width, self.layer_height)
+            return
+        self.layer.scroll(dx * CELL_SIZE, dy * CELL_SIZE)
+        # Paint the columns and rows that scrolled in
+        if dx > 0:
+            self._paint_area(state, 0, 0, dx, self.layer_height)
+        elif dx < 0:
+            self._paint_area(state, self.layer_width + dx, 0, -dx, self.layer_height)
+        if dy > 0:
+            self._paint_area(state, 0, 0, self.layer_width, dy)
+        elif dy < 0:
+            self._paint_area(state, 0, self.layer_height + dy, self.layer_width, -dy)
+
+    def _sprite_at(self, state, cell):
+        # The head is drawn over the layer every frame, so it isn't painted
+        world = state.world
+        if not world.in_bounds(cell):
+            return self.wall
+        if world.snake_at(cell) and cell != state.snake.head:
+            return self.body
+        if world.food_at(cell):
+            return self.food
+        return self.background[(cell[0] + cell[1]) & 1]
+
+    def _paint_area(self, state, x, y, width, height):
+        # Layer cells x..x+width, y..y+height, straight from the world
+        origin_x, origin_y = self.origin
+        self.layer.blits([(self._sprite_at(state, (origin_x + i, origin_y + j)), (i * CELL_SIZE, j * CELL_SIZE))
+                          for j in range(y, y + height) for i in range(x, x + width)], doreturn=False)
+
+    def _paint_cell(self, state, cell):
+        i = cell[0] - self.origin[0]
+        j = cell[1] - self.origin[1]
+        if 0 <= i < self.layer_width and 0 <= j < self.layer_height:
+            self.layer.blit(self._sprite_at(state, cell), (i * CELL_SIZE, j * CELL_SIZE))
+
+
+def _between(start, end, alpha):
+    return start[0] + (end[0] - start[0]) * alpha, start[1] + (end[1] - start[1]) * alpha
+
+
+def coiled_state(width, height, length):
+    # A snake of the given length coiled back and forth below its head,
+    # which is at the right end of the top row, heading right
+    row = min(400, (width or 800) // 2)
+    x0 = (width or 0) // 2 - row // 2
+    y0 = (height or 0) // 2 - length // row // 2
+    cells = []
+    for i in range(length):
+        y, x = divmod(i, row)
+        cells.append((x0 + (row - 1 - x if y % 2 == 0 else x), y0 + y))
+    return snake_world.WorldState(width, height, seed=0, cells=cells)
+
+
+def frame_times(worlds=((100, 100), (10_000, 10_000), (None, None)), lengths=(10, 1_000, 100_000),
+                view=(32, 24), frames=240):
+    # Mean frame time (a move with its redraw every fourth frame, as at 15
+    # moves a second, and the frame itself) by world size and snake length,
+    # with snake_world.food_bot steering.
+    # Set SDL_VIDEODRIVER=dummy to run it without a display.
+    pygame.init()
+    screen = pygame.display.set_mode((view[0] * CELL_SIZE, view[1] * CELL_SIZE))
+    results = {}
+    for width, height in worlds:
+        for length in lengths:
+            if width is not None and length > width * height // 4:
+                continue
+            state = coiled_state(width, height, length)
+            renderer = WorldRenderer(screen, *view)
+            renderer.draw(state, 0.0)
+            times = []
+            for frame in range(frames):
+                start = time.perf_counter()
+                if frame % 4 == 0:
+                    snake_world.step(state, snake_world.food_bot(state))
+                    renderer.moved(state)
+                    if state.over:
+                        break
+                renderer.draw(state, (frame % 4) / 4)
+                times.append(time.perf_counter() - start)
+            results[(width, height, length)] = sum(times) / len(times) * 1000
+    pygame.quit()
+    return results
+
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 240
+    for (width, height, length), ms in frame_times(frames=frames).items():
+        size = 'endless' if width is None else f'{width}x{height}'
+        print(f'{size:>12} world, snake {length:>7,}: {ms:.3f} ms/frame')
@@ -0,0 +1,66 @@
+import random
+
+from snake_body import SnakeBody
+
+# Headless snake rules used by snake_game.main and replays. Food placement
+# draws from the game's own seeded RNG, so a seed plus the sequence of
+# directions fully determines a game.
+
+# Directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+# Event kinds returned by step()
+ATE = 'ate'
+DIED = 'died'
+
+NO_EVENTS = ()
+
+
+def random_food(snake, rng=random):
+    # O(1) pick from the snake's free-cell list; None once the board is full
+    return snake.random_free(rng)
+
+
+class SnakeState:
+    def __init__(self, width, height, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.snake = SnakeBody(width, height, [(width // 2, height // 2)])
+        self.direction = RIGHT
+        self.food = random_food(self.snake, self.rng)
+        self.score = 0
+        self.over = False
+        # Where the head and tail were before the last move, for interpolation
+        self.prev_head = self.snake.head
+        self.prev_tail = None
+
+
+def step(state, direction):
+    # Move one cell. A direction opposite to the current one is ignored.
+    if state.over:
+        return NO_EVENTS
+    if direction != OPPOSITE[state.direction]:
+        state.direction = direction
+    snake = state.snake
+    head = snake.head
+    new_head = (head[0] + state.direction[0], head[1] + state.direction[1])
+
+    # Check collisions
+    if not snake.in_bounds(new_head) or new_head in snake:
+        state.over = True
+        return (DIED,)
+
+    state.prev_head = head
+    snake.push_head(new_head)
+    if new_head == state.food:
+        state.score += 1
+        state.food = random_food(snake, state.rng)
+        state.prev_tail = None
+        return (ATE,)
+    state.prev_tail = snake.pop_tail()
+    return NO_EVENTS
@@ -0,0 +1,262 @@
+import random
+from collections import deque
+
+from snake_rules import DIRECTIONS, OPPOSITE, RIGHT, ATE, DIED, NO_EVENTS
+
+# Headless snake rules for huge and endless worlds (snake_game --world).
+# The world is stored in CHUNK x CHUNK chunks that are only created when
+# something first looks at them: a chunk holds the snake's cells in it (a
+# bytearray, as in snake_body) and its food, which is scattered when the
+# chunk loads from a generator seeded with the world seed and the chunk's
+# position, so the same seed always gives the same world. Memory grows with
+# the area visited, not with the size of the world, and every lookup is a
+# dict get plus an index.
+#
+# There are many pieces of food instead of one; eating one grows a new one
+# elsewhere in the same chunk (or a neighbouring one, if that chunk is
+# full), so the density stays the same. Chunks on the edge of a bounded
+# world only use, and only get food for, their cells inside it. step() has
+# the same contract as snake_rules.step.
+
+CHUNK = 32           # chunk side in cells
+FOOD_PER_CHUNK = 4   # food scattered in a newly loaded chunk (pro rata at edges)
+GROW_TRIES = 8       # random picks for new food before scanning for a cell
+
+
+class Chunk:
+    __slots__ = ('snake', 'food')
+
+    def __init__(self, food):
+        self.snake = bytearray(CHUNK * CHUNK)
+        self.food = food  # set of indices within the chunk
+
+
+class World:
+    def __init__(self, width=None, height=None, seed=0, food_per_chunk=FOOD_PER_CHUNK):
+        # width, height: world size in cells, or None for no edge that way
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.food_per_chunk = food_per_chunk
+        self.chunks = {}  # (chunk x, chunk y) -> Chunk
+
+    def in_bounds(self, cell):
+        x, y = cell
+        return ((self.width is None or 0 <= x < self.width) and
+                (self.height is None or 0 <= y < self.height))
+
+    def chunk(self, cx, cy):
+        # The chunk at chunk coordinates (cx, cy), loaded on first use
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            chunk = self.chunks[(cx, cy)] = Chunk(self._scatter_food(cx, cy))
+        return chunk
+
+    def _area(self, cx, cy):
+        # The chunk's cells inside the world, as local (x0, x1, y0, y1)
+        # half-open ranges, or None when it lies wholly outside
+        x0, x1, y0, y1 = 0, CHUNK, 0, CHUNK
+        if self.width is not None:
+            x0 = max(x0, -cx * CHUNK)
+            x1 = min(x1, self.width - cx * CHUNK)
+        if self.height is not None:
+            y0 = max(y0, -cy * CHUNK)
+            y1 = min(y1, self.height - cy * CHUNK)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, x1, y0, y1
+
+    def _scatter_food(self, cx, cy):
+        area = self._area(cx, cy)
+        food = set()
+        if area is None:
+            return food
+        x0, x1, y0, y1 = area
+        cells = (x1 - x0) * (y1 - y0)
+        count = min(cells, max(1, round(self.food_per_chunk * cells / (CHUNK * CHUNK))))
+        rng = random.Random(f'{self.seed}:{cx}:{cy}')
+        while len(food) < count:
+            food.add(rng.randrange(y0, y1) * CHUNK + rng.randrange(x0, x1))
+        return food
+
+    def _locate(self, cell):
+        # (chunk, index within it) of a cell
+        x, y = cell
+        return self.chunk(x // CHUNK, y // CHUNK), (y % CHUNK) * CHUNK + x % CHUNK
+
+    def snake_at(self, cell):
+        chunk, index = self._locate(cell)
+        return chunk.snake[index]
+
+    def set_snake(self, cell, on):
+        chunk, index = self._locate(cell)
+        chunk.snake[index] = on
+
+    def food_at(self, cell):
+        chunk, index = self._locate(cell)
+        return index in chunk.food
+
+    def take_food(self, cell):
+        chunk, index = self._locate(cell)
+        chunk.food.discard(index)
+
+    def grow_food(self, cell, rng):
+        # New food on a random free cell of the chunk holding cell, or of a
+        # neighbouring chunk when that one is full; returns it, or None when
+        # there is no free cell anywhere near (a small world filled up)
+        cx, cy = cell[0] // CHUNK, cell[1] // CHUNK
+        new = self._grow_in(cx, cy, rng)
+        if new is None:
+            neighbours = [(cx + dx, cy + dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+            rng.shuffle(neighbours)
+            for x, y in neighbours:
+                new = self._grow_in(x, y, rng)
+                if new is not None:
+                    break
+        return new
+
+    def _grow_in(self, cx, cy, rng):
+        area = self._area(cx, cy)
+        if area is None:
+            return None
+        x0, x1, y0, y1 = area
+        chunk = self.chunk(cx, cy)
+        snake = chunk.snake
+        food = chunk.food
+        index = None
+        for _ in range(GROW_TRIES):
+            pick = rng.randrange(y0, y1) * CHUNK + rng.randrange(x0, x1)
+            if not snake[pick] and pick not in food:
+                index = pick
+                break
+        else:
+            # Mostly taken: pick from the free cells that are left
+            free = [y * CHUNK + x for y in range(y0, y1) for x in range(x0, x1)
+                    if not snake[y * CHUNK + x] and y * CHUNK + x not in food]
+            if free:
+                index = rng.choice(free)
+        if index is None:
+            return None
+        food.add(index)
+        return (cx * CHUNK + index % CHUNK, cy * CHUNK + index // CHUNK)
+
+    def food_near(self, cell, radius=1):
+        # Food cells in the chunks within radius chunks of cell's
+        cx, cy = cell[0] // CHUNK, cell[1] // CHUNK
+        for y in range(cy - radius, cy + radius + 1):
+            for x in range(cx - radius, cx + radius + 1):
+                for index in self.chunk(x, y).food:
+                    yield (x * CHUNK + index % CHUNK, y * CHUNK + index // CHUNK)
+
+
+class WorldSnake:
+    # The snake's cells, head first; occupancy lives in the world's chunks
+    def __init__(self, world, cells):
+        self.world = world
+        self.cells = deque()
+        for cell in cells:
+            self.push_tail(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __contains__(self, cell):
+        return self.world.in_bounds(cell) and self.world.snake_at(cell)
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    @property
+    def tail(self):
+        return self.cells[-1]
+
+    def in_bounds(self, cell):
+        return self.world.in_bounds(cell)
+
+    def push_head(self, cell):
+        self.world.set_snake(cell, 1)
+        self.cells.appendleft(cell)
+
+    def push_tail(self, cell):
+        self.world.set_snake(cell, 1)
+        self.cells.append(cell)
+
+    def pop_tail(self):
+        cell = self.cells.pop()
+        self.world.set_snake(cell, 0)
+        return cell
+
+
+class WorldState:
+    def __init__(self, width=None, height=None, seed=None, cells=None):
+        # cells: the starting body, head first (one cell in the middle of
+        # the world, or at the origin of an endless one, by default)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.world = World(width, height, seed)
+        if cells is None:
+            cells = [((width or 0) // 2, (height or 0) // 2)]
+        self.snake = WorldSnake(self.world, cells)
+        # Food under the starting head is moved elsewhere, not lost: it may
+        # be the only piece in a small world
+        if self.world.food_at(self.snake.head):
+            self.world.take_food(self.snake.head)
+            self.world.grow_food(self.snake.head, self.rng)
+        self.direction = RIGHT
+        self.score = 0
+        self.over = False
+        # Where the head and tail were before the last move, for
+        # interpolation, and the food grown by the last move, for redraws
+        self.prev_head = self.snake.head
+        self.prev_tail = None
+        self.new_food = None
+
+
+def step(state, direction):
+    # Move one cell. A direction opposite to the current one is ignored.
+    if state.over:
+        return NO_EVENTS
+    if direction != OPPOSITE[state.direction]:
+        state.direction = direction
+    snake = state.snake
+    world = state.world
+    head = snake.head
+    new_head = (head[0] + state.direction[0], head[1] + state.direction[1])
+    state.new_food = None
+
+    # Check collisions (the tail included, as in snake_rules)
+    if not world.in_bounds(new_head) or world.snake_at(new_head):
+        state.over = True
+        return (DIED,)
+
+    state.prev_head = head
+    if world.food_at(new_head):
+        world.take_food(new_head)
+        snake.push_head(new_head)
+        state.score += 1
+        state.new_food = world.grow_food(new_head, state.rng)
+        state.prev_tail = None
+        return (ATE,)
+    snake.push_head(new_head)
+    state.prev_tail = snake.pop_tail()
+    return NO_EVENTS
+
+
+def food_bot(state):
+    # Head for the nearest food in the surrounding chunks without running
+    # into anything on the next move; keep going when there is none
+    snake = state.snake
+    world = state.world
+    hx, hy = snake.head
+    safe = [d for d in DIRECTIONS if d != OPPOSITE[state.direction]
+            and world.in_bounds((hx + d[0], hy + d[1])) and not world.snake_at((hx + d[0], hy + d[1]))]
+    if not safe:
+        return state.direction
+    target = min(world.food_near(snake.head), key=lambda f: abs(f[0] - hx) + abs(f[1] - hy), default=None)
+    if target is None:
+        return state.direction if state.direction in safe else safe[0]
+    return min(safe, key=lambda d: abs(target[0] - hx - d[0]) + abs(target[1] - hy - d[1]))
@@ -0,0 +1,245 @@
+import os
+import select
+import sys
+import time
+
+# Double-buffered character screen for terminal games played over slow
+# links (SSH). Drawing goes into a back buffer; present() compares it with
+# what the terminal already shows and sends only the changed cells, as one
+# write of ANSI cursor moves and text per frame. Nearby changes on a row
+# are sent as one run when rewriting the cells in between is cheaper than
+# another cursor move.
+#
+# Backends:
+#   AnsiTerminal     the real terminal, through termios (no curses needed)
+#   HeadlessTerminal scripted keys and a fake screen that decodes what was
+#                    written, for tests and measurements
+#
+# Cells hold one ASCII character each.
+
+# Keys returned by read_keys()
+KEY_UP = 'up'
+KEY_DOWN = 'down'
+KEY_LEFT = 'left'
+KEY_RIGHT = 'right'
+KEY_ESCAPE = '\x1b'
+
+_ARROWS = {b'A': KEY_UP, b'B': KEY_DOWN, b'C': KEY_RIGHT, b'D': KEY_LEFT}
+ESC_WAIT = 0.05  # seconds to wait for the rest of an escape sequence
+_UNKNOWN = 0xFF  # front buffer filler that matches no character: repaint
+
+
+class Screen:
+    def __init__(self, backend):
+        self.backend = backend
+        self.width = self.height = 0
+        self.back = []
+        self.front = []
+        self.frames = 0
+        self.bytes_written = 0
+        self.last_frame_bytes = 0
+        self.max_frame_bytes = 0
+        self.fit()
+
+    def fit(self):
+        # Match the terminal size; True if it changed (everything will be
+        # repainted, so the caller should redraw the whole scene)
+        width, height = self.backend.size()
+        if (width, height) == (self.width, self.height):
+            return False
+        self.width, self.height = width, height
+        self.back = [bytearray(b' ' * width) for _ in range(height)]
+        self.front = [bytearray([_UNKNOWN]) * width for _ in range(height)]
+        self.backend.write(b'\x1b[2J')  # old contents are in the wrong places
+        return True
+
+    def clear(self):
+        for row in self.back:
+            row[:] = b' ' * self.width
+
+    def put(self, x, y, char):
+        # Cells off screen are ignored
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.back[y][x] = ord(char)
+
+    def text(self, x, y, text):
+        if 0 <= y < self.height:
+            row = self.back[y]
+            for i, char in enumerate(text.encode('ascii', 'replace')):
+                if 0 <= x + i < self.width:
+                    row[x + i] = char
+
+    def present(self):
+        out = bytearray()
+        for y in range(self.height):
+            back = self.back[y]
+            front = self.front[y]
+            if back != front:
+                _encode_row(out, y, back, front, self.width)
+                front[:] = back
+        if out:
+            self.backend.write(bytes(out))
+        self.frames += 1
+        self.bytes_written += len(out)
+        self.last_frame_bytes = len(out)
+        self.max_frame_bytes = max(self.max_frame_bytes, len(out))
+        return len(out)
+
+    def stats(self):
+        return {'frames': self.frames, 'bytes': self.bytes_written,
+                'mean_bytes_per_frame': self.bytes_written / self.frames if self.frames else 0.0,
+                'max_bytes_per_frame': self.max_frame_bytes}
+
+
+def _move(y, x):
+    return b'\x1b[%d;%dH' % (y + 1, x + 1)
+
+
+def _encode_row(out, y, back, front, width):
+    # Runs of changed cells, merged across gaps shorter than a cursor move
+    limit = len(_move(y, width))
+    x = 0
+    cursor = -1  # column the terminal cursor is at on this row, if known
+    while x < width:
+        if back[x] == front[x]:
+            x += 1
+            continue
+        start = x
+        end = x + 1
+        gap = 0
+        x += 1
+        while x < width:
+            if back[x] != front[x]:
+                end = x + 1
+                gap = 0
+            else:
+                gap += 1
+                if gap >= limit:
+                    break
+            x += 1
+        if cursor != start:
+            out += _move(y, start)
+        out += back[start:end]
+        cursor = end
+
+
+class AnsiTerminal:
+    # The controlling terminal in cbreak mode, on the alternate screen with
+    # the cursor hidden; use as a context manager so it is always restored
+    def __init__(self, stdin=None, stdout=None):
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout.buffer
+        self.saved = None
+
+    def __enter__(self):
+        import termios
+        import tty
+        fd = self.stdin.fileno()
+        self.saved = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        self.write(b'\x1b[?1049h\x1b[?25l\x1b[2J')
+        return self
+
+    def __exit__(self, *exc):
+        import termios
+        self.write(b'\x1b[?25h\x1b[?1049l')
+        termios.tcsetattr(self.stdin.fileno(), termios.TCSADRAIN, self.saved)
+
+    def size(self):
+        columns, lines = os.get_terminal_size(self.stdout.fileno())
+        return columns, lines
+
+    def now(self):
+        return time.monotonic()
+
+    def write(self, data):
+        self.stdout.write(data)
+        self.stdout.flush()
+
+    def read_keys(self, timeout=None):
+        # Keys typed within timeout seconds (None: wait for one); returns as
+        # soon as any arrive
+        fd = self.stdin.fileno()
+        if timeout is not None:
+            timeout = max(timeout, 0)
+        if not select.select([fd], [], [], timeout)[0]:
+            return []
+        data = os.read(fd, 1024)
+        keys = []
+        i = 0
+        while i < len(data):
+            if data[i:i + 1] == b'\x1b':
+                if len(data) - i < 3:
+                    # Maybe the start of an arrow key whose other bytes are
+                    # on their way; if none come soon it was the Esc key
+                    more = os.read(fd, 1024) if select.select([fd], [], [], ESC_WAIT)[0] else b''
+                    if more:
+                        data += more
+                        continue
+                if data[i + 1:i + 2] in (b'[', b'O') and data[i + 2:i + 3] in _ARROWS:
+                    keys.append(_ARROWS[data[i + 2:i + 3]])
+                    i += 3
+                    continue
+            keys.append(data[i:i + 1].decode('latin-1'))
+            i += 1
+        return keys
+
+
+class HeadlessTerminal:
+    # keys: one list of keys per read_keys() call (a missing entry reads as
+    # no keys). Time is simulated: read_keys(timeout) returns at once and
+    # moves the clock on by timeout. Everything written is decoded into
+    # lines() and counted.
+    def __init__(self, width=80, height=24, keys=()):
+        self.width = width
+        self.height = height
+        self.keys = list(keys)
+        self.reads = 0
+        self.clock = 0.0
+        self.written = 0
+        self.cells = [[' '] * width for _ in range(height)]
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = [(row + [' '] * width)[:width] for row in self.cells[:height]]
+        self.cells += [[' '] * width for _ in range(height - len(self.cells))]
+
+    def size(self):
+        return self.width, self.height
+
+    def now(self):
+        return self.clock
+
+    def read_keys(self, timeout=None):
+        if timeout is not None:
+            self.clock += max(timeout, 0)
+        i = self.reads
+        self.reads += 1
+        return self.keys[i] if i < len(self.keys) else []
+
+    def write(self, data):
+        # Understands the escape sequences Screen and AnsiTerminal send
+        self.written += len(data)
+        x = y = 0
+        i = 0
+        while i < len(data):
+            if data[i] == 0x1B:
+                end = i + 2
+                while not 0x40 <= data[end] <= 0x7E:
+                    end += 1
+                params, command = data[i + 2:end], data[end:end + 1]
+                if command == b'H':
+                    row, col = params.split(b';')
+                    y, x = int(row) - 1, int(col) - 1
+                elif command == b'J' and params == b'2':
+                    self.cells = [[' '] * self.width for _ in range(self.height)]
+                i = end + 1
+                continue
+            if 0 <= y < self.height and 0 <= x < self.width:
+                self.cells[y][x] = chr(data[i])
+            x += 1
+            i += 1
+
+    def lines(self):
+        return [''.join(row) for row in self.cells]
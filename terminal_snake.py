@@ -1,69 +1,138 @@
 
+import argparse
 import random
-import time
-import curses
-def main(stdscr):
-    curses.curs_set(0)
-    sh, sw = stdscr.getmaxyx()
-    w = curses.newwin(sh, sw, 0, 0)
-    w.keypad(1)
-    w.timeout(100)
+
+import snake_bot
+import term_screen
+from snake_body import SnakeBody
+from snake_rules import UP, DOWN, LEFT, RIGHT
+
+# Snake in a terminal, drawn through term_screen so each move only sends
+# the few cells that changed. The board is the terminal size at the start
+# of the game; if the terminal is resized mid-game the board is repainted
+# (and cropped if it no longer fits) rather than the game restarted.
+
+TICK = 0.1  # seconds per move (--tick)
+
+KEYS = {term_screen.KEY_UP: UP, term_screen.KEY_DOWN: DOWN,
+        term_screen.KEY_LEFT: LEFT, term_screen.KEY_RIGHT: RIGHT}
+
+def main(terminal, bot=False, tick=TICK, rng=random):
+    # terminal: a term_screen backend. bot: let snake_bot steer, for soak
+    # tests and attract mode. Returns (score, screen) when the game ends.
+    screen = term_screen.Screen(terminal)
+    sw, sh = screen.width, screen.height
 
     snk_x = sw // 4
     snk_y = sh // 2
-    snake = [
-        [snk_y, snk_x],
-        [snk_y, snk_x - 1],
-        [snk_y, snk_x - 2]
-    ]
-    food = [random.randint(1, sh - 2), random.randint(1, sw - 2)]
-    w.addch(food[0], food[1], '*')
-
-    key = curses.KEY_RIGHT
+    # Cells are (x, y); row 0 and column 0 are walls, and food never lands
+    # on the last row or column
+    snake = SnakeBody(sw, sh, [
+        (snk_x, snk_y),
+        (snk_x - 1, snk_y),
+        (snk_x - 2, snk_y)
+    ])
+    for x in range(sw):
+        snake.block((x, 0))
+        snake.block((x, sh - 1))
+    for y in range(sh):
+        snake.block((0, y))
+        snake.block((sw - 1, y))
+    food = snake.random_free(rng)
+
+    direction = RIGHT
     score = 0
+    pilot = snake_bot.Autopilot(snake, RIGHT) if bot else None
+
+    def draw_all():
+        screen.clear()
+        for x, y in snake:
+            screen.put(x, y, '#')
+        if food is not None:
+            screen.put(food[0], food[1], '*')
+        screen.text(2, 0, f'Score: {score} ')
 
+    draw_all()
+    screen.present()
+    next_move = terminal.now() + tick
     while True:
-        next_key = w.getch()
-        key = key if next_key == -1 else next_key
+        for key in terminal.read_keys(next_move - terminal.now()):
+            if key in KEYS:
+                direction = KEYS[key]
+            elif key == 'q':
+                return score, screen
+        now = terminal.now()
+        if now < next_move:
+            continue
+        # Keep a steady pace, but don't race to catch up after a stall
+        next_move = max(next_move + tick, now)
+        if pilot is not None:
+            direction = pilot.next_direction(food)
 
         # Calculate new head
-        head = [snake[0][0], snake[0][1]]
-        if key == curses.KEY_DOWN:
-            head[0] += 1
-        if key == curses.KEY_UP:
-            head[0] -= 1
-        if key == curses.KEY_LEFT:
-            head[1] -= 1
-        if key == curses.KEY_RIGHT:
-            head[1] += 1
+        head_x, head_y = snake.head
+        head_x += direction[0]
+        head_y += direction[1]
+        head = (head_x, head_y)
+
+        if screen.fit():
+            draw_all()
 
         # Check for collision
         if (
-            head[0] in [0, sh] or
-            head[1] in [0, sw] or
+            head_y in [0, sh] or
+            head_x in [0, sw] or
             head in snake
         ):
             msg = f'Game Over! Score: {score}  Press any key to exit.'
-            w.addstr(sh // 2, sw // 2 - len(msg) // 2, msg)
-            w.nodelay(0)
-            w.getch()
-            break
+            screen.text(screen.width // 2 - len(msg) // 2, screen.height // 2, msg)
+            screen.present()
+            terminal.read_keys(None)
+            return score, screen
 
-        snake.insert(0, head)
+        snake.push_head(head)
         if head == food:
             score += 1
-            food = None
-            while food is None:
-                nf = [random.randint(1, sh - 2), random.randint(1, sw - 2)]
-                if nf not in snake:
-                    food = nf
-            w.addch(food[0], food[1], '*')
+            food = snake.random_free(rng)
+            if food is not None:
+                screen.put(food[0], food[1], '*')
         else:
-            tail = snake.pop()
-            w.addch(tail[0], tail[1], ' ')
+            tail = snake.pop_tail()
+            screen.put(tail[0], tail[1], ' ')
+
+        screen.put(head_x, head_y, '#')
+        screen.text(2, 0, f'Score: {score} ')
+        screen.present()
 
-        w.addch(snake[0][0], snake[0][1], '#')
-        w.addstr(0, 2, f'Score: {score} ')
+def measure(sizes=((80, 24), (132, 43), (200, 60)), moves=2000):
+    # Bytes sent per frame by a bot game on a headless terminal of each
+    # size, next to what repainting the whole screen every frame would cost
+    results = []
+    for width, height in sizes:
+        terminal = term_screen.HeadlessTerminal(width, height, keys=[[]] * moves + [['q']])
+        score, screen = main(terminal, bot=True, rng=random.Random(0))
+        stats = screen.stats()
+        stats.update(size=f'{width}x{height}', score=score,
+                     full_repaint_bytes=width * height + len(b'\x1b[H'))
+        results.append(stats)
+    return results
 
 if __name__ == '__main__':
-    curses.wrapper(main) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Terminal Snake')
+    parser.add_argument('--bot', action='store_true', help='let the autopilot play')
+    parser.add_argument('--tick', type=int, default=int(TICK * 1000), help='milliseconds per move (default %(default)s)')
+    parser.add_argument('--stats', action='store_true', help='print bytes written per frame on exit')
+    parser.add_argument('--measure', action='store_true', help='measure bytes per frame headlessly and exit')
+    args = parser.parse_args()
+    if args.measure:
+        for r in measure():
+            print(f"{r['size']:>8}: mean {r['mean_bytes_per_frame']:6.1f} B/frame, max {r['max_bytes_per_frame']:5d} B "
+                  f"over {r['frames']} frames (full repaint {r['full_repaint_bytes']} B)")
+    else:
+        with term_screen.AnsiTerminal() as terminal:
+            score, screen = main(terminal, args.bot, args.tick / 1000)
+        print(f'Score: {score}')
+        if args.stats:
+            stats = screen.stats()
+            print(f"{stats['frames']} frames, {stats['bytes']} bytes, mean {stats['mean_bytes_per_frame']:.1f} "
+                  f"max {stats['max_bytes_per_frame']} bytes per frame")
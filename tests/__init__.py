@@ -0,0 +1,7 @@
+import os
+
+# Tests for the headless parts of both games; run with python -m pytest
+# from the repository root. pygame runs without a window or sound card.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
@@ -0,0 +1,89 @@
+import numpy as np
+
+import paddle_batch
+import paddle_physics
+from paddle_physics import (
+    WIDTH, HEIGHT, PADDLE_HEIGHT, BALL_SIZE, HIT, MISS, LEVEL_UP, ACHIEVEMENT,
+)
+
+# BatchGame has to match paddle_physics.step game for game. Each test runs
+# the same games through both and compares every field after every step.
+
+FIELDS = ('paddle_y', 'ball_x', 'ball_y', 'ball_vel_x', 'ball_vel_y', 'score', 'speed_level', 'over')
+
+
+def _scalar_games(n):
+    return [paddle_physics.GameState(set()) for _ in range(n)]
+
+
+def _check(batch, states):
+    for field in FIELDS:
+        assert getattr(batch, field).tolist() == [getattr(s, field) for s in states], field
+
+
+def _run(batch, states, steps, rng, noise):
+    # Mostly tracking, with some random actions so games end at all sorts
+    # of scores; returns the number of steps checked
+    for _ in range(steps):
+        actions = batch.tracking_actions().astype(np.int32)
+        random = rng.random(batch.n) < noise
+        actions[random] = rng.integers(-1, 2, int(random.sum()))
+        hits, miss, level_up, new_bits = batch.step(actions)
+        for i, state in enumerate(states):
+            events = paddle_physics.step(state, actions[i] < 0, actions[i] > 0)
+            kinds = [kind for kind, _ in events]
+            assert hits[i] == kinds.count(HIT)
+            assert miss[i] == (MISS in kinds)
+            assert level_up[i] == (LEVEL_UP in kinds)
+            names = {value for kind, value in events if kind == ACHIEVEMENT}
+            score_names = names & set(paddle_batch.ACHIEVEMENT_NAMES)
+            assert new_bits[i] == paddle_batch.achievement_bits(score_names)
+        _check(batch, states)
+        if batch.over.all():
+            break
+
+
+def test_matches_scalar_step_from_the_serve():
+    rng = np.random.default_rng(0)
+    n = 32
+    batch = paddle_batch.BatchGame(n)
+    states = _scalar_games(n)
+    _check(batch, states)
+    _run(batch, states, 3000, rng, noise=0.3)
+
+
+def test_matches_scalar_step_from_random_states():
+    # Random positions and fast balls, so wall and paddle sweeps with
+    # several contacts in one step are covered
+    rng = np.random.default_rng(1)
+    n = 200
+    batch = paddle_batch.BatchGame(n)
+    states = _scalar_games(n)
+    batch.paddle_y[:] = rng.integers(0, HEIGHT - PADDLE_HEIGHT + 1, n)
+    batch.ball_x[:] = rng.integers(20, WIDTH - BALL_SIZE, n)
+    batch.ball_y[:] = rng.integers(1, HEIGHT - BALL_SIZE, n)
+    level = rng.integers(1, 40, n)
+    batch.speed_level[:] = level
+    batch.score[:] = (level - 1) * 10
+    batch.ball_vel_x[:] = rng.choice([-1, 1], n) * paddle_physics.BALL_SPEED_X * level
+    batch.ball_vel_y[:] = rng.choice([-1, 1], n) * paddle_physics.BALL_SPEED_Y * level
+    for i, state in enumerate(states):
+        for field in FIELDS[:-1]:
+            setattr(state, field, int(getattr(batch, field)[i]))
+        state.achievements.update('score', state.score)
+    batch.earned[:] = [paddle_batch.achievement_bits(s.achievements.earned) for s in states]
+    _run(batch, states, 300, rng, noise=0.5)
+
+
+def test_reset_restarts_only_masked_games():
+    batch = paddle_batch.BatchGame(4)
+    for _ in range(200):
+        batch.step(np.zeros(4, dtype=np.int32))
+    assert batch.over.all()
+    mask = np.array([True, False, True, False])
+    batch.reset(mask)
+    assert batch.over.tolist() == [False, True, False, True]
+    fresh = paddle_physics.GameState()
+    for field in FIELDS:
+        values = getattr(batch, field)
+        assert values[0] == values[2] == getattr(fresh, field), field
@@ -0,0 +1,82 @@
+import numpy as np
+
+import snake_batch
+from snake_batch import EMPTY, FOOD, BODY, HEAD
+from snake_rules import UP
+
+
+def _check_invariants(env):
+    # The board, the ring buffer and the per-game fields must agree
+    for i in range(env.n):
+        board = env.board[i]
+        length = env.length[i]
+        ring = [env.body[i, (env.head_pos[i] - k) % env.cells] for k in range(length)]
+        assert ring[0] == env.head[i]
+        assert len(set(ring)) == length
+        assert board[ring[0]] == HEAD
+        assert all(board[cell] == BODY for cell in ring[1:])
+        assert np.count_nonzero(board == HEAD) == 1
+        assert np.count_nonzero(board == BODY) == length - 1
+        assert length == env.score[i] + 1
+        if env.food[i] >= 0:
+            assert board[env.food[i]] == FOOD
+            assert np.count_nonzero(board == FOOD) == 1
+        else:
+            assert np.count_nonzero(board == EMPTY) == 0
+
+
+def _play(env, steps, rng):
+    # The food policy with some random moves, so games die in every way
+    scores = []
+    for _ in range(steps):
+        actions = env.food_actions()
+        random = rng.random(env.n) < 0.2
+        actions[random] = rng.integers(0, snake_batch.ACTIONS, int(random.sum()))
+        observations, rewards, dones, info = env.step(actions)
+        _check_invariants(env)
+        if dones.any():
+            scores += info['score'][dones].tolist()
+    return scores
+
+
+def test_occupancy_invariants_hold():
+    env = snake_batch.BatchEnv(64, 10, 8, seed=0, max_hunger=200)
+    _check_invariants(env)
+    scores = _play(env, 400, np.random.default_rng(0))
+    assert scores and max(scores) > 3
+
+
+def test_full_board_ends_the_game():
+    # On a 1x2 board the snake starts at the bottom with the food above
+    # it; eating it fills the board
+    env = snake_batch.BatchEnv(1, 1, 2, seed=0)
+    assert env.food.tolist() == [0]
+    up = snake_batch.DIRECTIONS.index(UP)
+    observations, rewards, dones, info = env.step([up])
+    assert dones.tolist() == [True]
+    assert not info['died'][0]
+    assert info['score'].tolist() == [1]
+    assert rewards.tolist() == [snake_batch.EAT_REWARD]
+    _check_invariants(env)
+
+
+def test_same_seeds_replay_exactly():
+    rng = np.random.default_rng(2)
+    actions = rng.integers(0, snake_batch.ACTIONS, (300, 16))
+    runs = []
+    for _ in range(2):
+        env = snake_batch.BatchEnv(16, 12, 12, seed=7)
+        frames = [env.step(a)[0].copy() for a in actions]
+        runs.append(np.array(frames))
+    assert np.array_equal(runs[0], runs[1])
+
+
+def test_reset_restarts_only_masked_games():
+    env = snake_batch.BatchEnv(3, 10, 10, seed=0)
+    for _ in range(3):
+        env.step(env.food_actions())
+    before = env.board[1].copy()
+    env.reset(np.array([True, False, True]))
+    assert np.array_equal(env.board[1], before)
+    assert env.length[[0, 2]].tolist() == [1, 1]
+    _check_invariants(env)
@@ -0,0 +1,58 @@
+import pygame
+import pytest
+
+import snake_render
+import snake_world
+
+VIEW = (32, 24)
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    yield pygame.display.set_mode((VIEW[0] * snake_render.CELL_SIZE, VIEW[1] * snake_render.CELL_SIZE))
+    pygame.display.quit()
+
+
+def _pixels(surface):
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+def _compare(screen, state, moves, margin=snake_render.MARGIN):
+    # Draw every move incrementally and from scratch, at two points of the
+    # slide between cells, and check the pixels agree
+    reference_screen = pygame.Surface(screen.get_size())
+    reference = snake_render.WorldRenderer(reference_screen, *VIEW, margin=margin)
+    renderer = snake_render.WorldRenderer(screen, *VIEW, margin=margin)
+    for move in range(moves):
+        for alpha in (0.0, 0.5):
+            renderer.paint(state, alpha)
+            reference.invalidate()
+            reference.paint(state, alpha)
+            assert _pixels(screen) == _pixels(reference_screen), f'move {move}, alpha {alpha}'
+        snake_world.step(state, snake_world.food_bot(state))
+        renderer.moved(state)
+        if state.over:
+            break
+    return state
+
+
+def test_incremental_matches_full_render(screen):
+    state = _compare(screen, snake_world.WorldState(60, 40, seed=5), 150)
+    assert state.score > 0
+
+
+def test_incremental_matches_full_render_with_a_small_margin(screen):
+    # The layer scrolls every few moves
+    _compare(screen, snake_world.WorldState(seed=2), 200, margin=1)
+
+
+def test_incremental_matches_full_render_in_a_small_world(screen):
+    # Mostly wall around a world smaller than the viewport
+    state = _compare(screen, snake_world.WorldState(5, 5, seed=1), 200)
+    assert state.score > 0
+
+
+def test_incremental_matches_full_render_for_a_long_snake(screen):
+    state = snake_render.coiled_state(200, 200, 1000)
+    _compare(screen, state, 100)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import snake_world
+from snake_world import CHUNK, World, WorldState
+
+
+def _all_food(world):
+    return {(cx * CHUNK + index % CHUNK, cy * CHUNK + index // CHUNK)
+            for (cx, cy), chunk in world.chunks.items() for index in chunk.food}
+
+
+def _play(state, moves):
+    for _ in range(moves):
+        snake_world.step(state, snake_world.food_bot(state))
+        if state.over:
+            break
+    return state
+
+
+@pytest.mark.parametrize('size', [(2, 2), (3, 3), (5, 5), (33, 40), (100, 100)])
+def test_bounded_worlds_keep_food_in_bounds(size):
+    for seed in range(3):
+        state = _play(WorldState(*size, seed=seed), 500)
+        world = state.world
+        assert all(world.in_bounds(cell) for cell in _all_food(world))
+        assert _all_food(world) or state.over
+
+
+@pytest.mark.parametrize('size', [(3, 3), (5, 5)])
+def test_small_worlds_always_have_food_until_full(size):
+    for seed in range(5):
+        state = WorldState(*size, seed=seed)
+        for _ in range(800):
+            free = size[0] * size[1] - len(state.snake)
+            assert _all_food(state.world) or not free
+            snake_world.step(state, snake_world.food_bot(state))
+            if state.over:
+                break
+        assert state.score >= 3
+
+
+def test_edge_chunks_get_food_pro_rata():
+    world = World(40, 40, seed=1)
+    # Chunk (1, 1) holds the world's last 8x8 cells
+    assert len(world.chunk(1, 1).food) == 1
+    assert len(world.chunk(0, 0).food) == snake_world.FOOD_PER_CHUNK
+    assert world.chunk(2, 0).food == set()
+    assert world.chunk(-1, 0).food == set()
+
+
+def test_grow_food_fills_a_chunk_then_spills_over():
+    world = World(40, 40, seed=0)
+    rng = random.Random(0)
+    cells = set(_all_food(world))
+    for _ in range(300):
+        cell = world.grow_food((39, 39), rng)
+        assert cell is not None and world.in_bounds(cell) and cell not in cells
+        cells.add(cell)
+    # The 8x8 edge chunk filled up; the rest went to its neighbours
+    assert len(world.chunk(1, 1).food) == 64
+
+
+def test_grow_food_gives_up_when_nothing_near_is_free():
+    world = World(2, 2, seed=0)
+    rng = random.Random(0)
+    while world.grow_food((0, 0), rng) is not None:
+        pass
+    assert len(_all_food(world)) == 4
+
+
+def test_endless_world_is_the_same_for_the_same_seed():
+    a = _play(WorldState(seed=4), 400)
+    b = _play(WorldState(seed=4), 400)
+    assert list(a.snake) == list(b.snake)
+    assert a.score == b.score
+    assert _all_food(a.world) == _all_food(b.world)
@@ -0,0 +1,139 @@
+import os
+import random
+import threading
+
+import term_screen
+import terminal_snake
+from term_screen import AnsiTerminal, HeadlessTerminal, Screen
+
+
+def test_first_present_paints_everything():
+    terminal = HeadlessTerminal(20, 5)
+    screen = Screen(terminal)
+    screen.text(2, 1, 'hello')
+    screen.put(0, 4, '#')
+    screen.present()
+    lines = terminal.lines()
+    assert lines[1] == '  hello' + ' ' * 13
+    assert lines[4] == '#' + ' ' * 19
+
+
+def test_unchanged_frame_writes_nothing():
+    terminal = HeadlessTerminal(20, 5)
+    screen = Screen(terminal)
+    screen.text(0, 0, 'score')
+    screen.present()
+    written = terminal.written
+    assert screen.present() == 0
+    assert terminal.written == written
+
+
+def test_only_changed_cells_are_sent():
+    terminal = HeadlessTerminal(80, 24)
+    screen = Screen(terminal)
+    screen.present()
+    screen.put(40, 12, '#')
+    sent = screen.present()
+    # One cursor move and the cell
+    assert sent == len(b'\x1b[13;41H#')
+    assert terminal.lines()[12][40] == '#'
+
+
+def test_nearby_changes_are_sent_as_one_run():
+    terminal = HeadlessTerminal(80, 24)
+    screen = Screen(terminal)
+    screen.present()
+    screen.put(10, 3, 'a')
+    screen.put(12, 3, 'b')
+    sent = screen.present()
+    assert sent == len(b'\x1b[4;11Ha b')
+    assert terminal.lines()[3][10:13] == 'a b'
+
+
+def test_off_screen_cells_are_ignored():
+    terminal = HeadlessTerminal(10, 3)
+    screen = Screen(terminal)
+    screen.put(-1, 0, '#')
+    screen.put(10, 0, '#')
+    screen.put(0, 3, '#')
+    screen.text(8, 1, 'abcd')
+    screen.present()
+    assert terminal.lines() == [' ' * 10, ' ' * 8 + 'ab', ' ' * 10]
+
+
+def test_resize_repaints_the_whole_screen():
+    terminal = HeadlessTerminal(10, 3)
+    screen = Screen(terminal)
+    screen.text(0, 0, 'abc')
+    screen.present()
+    terminal.resize(12, 4)
+    assert screen.fit()
+    assert not screen.fit()
+    screen.text(0, 3, 'xyz')
+    screen.present()
+    assert terminal.lines() == [' ' * 12] * 3 + ['xyz' + ' ' * 9]
+
+
+def test_diffs_match_a_full_repaint_over_random_frames():
+    rng = random.Random(3)
+    terminal = HeadlessTerminal(30, 8)
+    screen = Screen(terminal)
+    for _ in range(200):
+        for _ in range(rng.randrange(10)):
+            screen.put(rng.randrange(30), rng.randrange(8), rng.choice('#* .o'))
+        if rng.random() < 0.05:
+            screen.clear()
+        screen.present()
+        expected = [row.decode('ascii') for row in screen.back]
+        assert terminal.lines() == expected
+
+
+def test_terminal_snake_sends_far_less_than_full_repaints():
+    for width, height in ((40, 12), (80, 24)):
+        terminal = HeadlessTerminal(width, height, keys=[[]] * 300 + [['q']])
+        score, screen = terminal_snake.main(terminal, bot=True, rng=random.Random(0))
+        stats = screen.stats()
+        assert stats['frames'] > 100
+        assert stats['mean_bytes_per_frame'] < width * height / 10
+        assert terminal.lines() == [row.decode('ascii') for row in screen.back]
+
+
+def test_read_keys_advances_the_clock():
+    terminal = HeadlessTerminal(keys=[[term_screen.KEY_UP], [], ['q']])
+    assert terminal.read_keys(0.25) == [term_screen.KEY_UP]
+    assert terminal.read_keys(0.25) == []
+    assert terminal.read_keys(None) == ['q']
+    assert terminal.read_keys(1) == []
+    assert terminal.now() == 1.5
+
+
+def _pipe_terminal():
+    # AnsiTerminal reading from a pipe instead of the keyboard
+    read_fd, write_fd = os.pipe()
+    return AnsiTerminal(stdin=os.fdopen(read_fd, 'rb', buffering=0)), write_fd
+
+
+def test_ansi_read_keys_decodes_arrows_and_characters():
+    terminal, keyboard = _pipe_terminal()
+    os.write(keyboard, b'\x1b[Aq\x1bOD')
+    assert terminal.read_keys(1) == [term_screen.KEY_UP, 'q', term_screen.KEY_LEFT]
+    assert terminal.read_keys(0) == []
+    os.close(keyboard)
+
+
+def test_ansi_read_keys_returns_a_lone_escape():
+    terminal, keyboard = _pipe_terminal()
+    os.write(keyboard, b'\x1b')
+    assert terminal.read_keys(1) == [term_screen.KEY_ESCAPE]
+    os.write(keyboard, b'x\x1b')
+    assert terminal.read_keys(1) == ['x', term_screen.KEY_ESCAPE]
+    os.close(keyboard)
+
+
+def test_ansi_read_keys_joins_an_arrow_split_across_reads(monkeypatch):
+    monkeypatch.setattr(term_screen, 'ESC_WAIT', 5)
+    terminal, keyboard = _pipe_terminal()
+    os.write(keyboard, b'\x1b[')
+    threading.Timer(0.05, os.write, (keyboard, b'B')).start()
+    assert terminal.read_keys(1) == [term_screen.KEY_DOWN]
+    os.close(keyboard)
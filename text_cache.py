@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+# Cache of rendered text surfaces shared by every screen. Rasterising text
+# with font.render is one of the most expensive calls in the frame, and most
+# strings (menu options, HUD labels, instructions) are the same every frame.
+# Entries are keyed by (font, text, color, antialias) and evicted least
+# recently used once the cached pixels exceed the memory budget.
+
+DEFAULT_BUDGET = 4 * 1024 * 1024  # bytes of surface pixels
+
+
+class TextCache:
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()  # key -> (surface, size in bytes)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        # Same argument order as font.render
+        key = (font, text, tuple(color), antialias)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        nbytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        if nbytes > self.budget:
+            return surface
+        self.entries[key] = (surface, nbytes)
+        self.size += nbytes
+        while self.size > self.budget:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self.entries), 'bytes': self.size}
+
+
+default_cache = TextCache()
+
+
+def render(font, text, antialias, color):
+    return default_cache.render(font, text, antialias, color)
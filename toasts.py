@@ -0,0 +1,57 @@
+from collections import deque
+
+import pygame
+
+import text_cache
+from paddle_physics import WIDTH, HEIGHT, WHITE, RULES
+
+# Achievement popups shown as toasts on top of the running game instead of
+# a blocking modal loop. Each popup surface is rendered when its achievement
+# is first pushed (there may be thousands of achievements, and few are earned
+# in any one game) and kept; the main loop calls update() each frame and
+# draws whatever it returns, so showing a toast costs one blit.
+
+POPUP_WIDTH, POPUP_HEIGHT = 300, 100
+TOAST_DURATION = 3000  # ms each toast stays on screen
+
+
+class ToastQueue:
+    def __init__(self, font):
+        self.font = font
+        self.rect = pygame.Rect((WIDTH - POPUP_WIDTH) // 2, (HEIGHT - POPUP_HEIGHT) // 2,
+                                POPUP_WIDTH, POPUP_HEIGHT)
+        self.toasts = {}  # name -> (surface, rect), reused every frame
+        self.queue = deque()
+        self.current = None
+        self.started = 0
+
+    def prerender(self, name, color):
+        surface = pygame.Surface((POPUP_WIDTH, POPUP_HEIGHT))
+        surface.fill(color)
+        pygame.draw.rect(surface, WHITE, (0, 0, POPUP_WIDTH, POPUP_HEIGHT), 3)
+
+        # Achievement text
+        title_text = text_cache.render(self.font, "ACHIEVEMENT UNLOCKED!", True, WHITE)
+        achievement_text = text_cache.render(self.font, name, True, WHITE)
+        surface.blit(title_text, ((POPUP_WIDTH - title_text.get_width()) // 2, 20))
+        surface.blit(achievement_text, ((POPUP_WIDTH - achievement_text.get_width()) // 2, 50))
+        self.toasts[name] = (surface, self.rect)
+
+    def push(self, name):
+        # Several achievements unlocked at once are shown one after another
+        if name not in self.toasts:
+            self.prerender(name, RULES.by_name[name]["color"])
+        self.queue.append(name)
+
+    def update(self, now):
+        # Returns the (surface, rect) to draw this frame, or None
+        if self.current is not None and now - self.started >= TOAST_DURATION:
+            self.current = None
+        if self.current is None and self.queue:
+            self.current = self.toasts[self.queue.popleft()]
+            self.started = now
+        return self.current
+
+    def clear(self):
+        self.queue.clear()
+        self.current = None
@@ -0,0 +1,385 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+from array import array
+from collections import Counter
+
+import paddle_physics
+import persistence
+import snake_bot
+import snake_rules
+
+# Headless bot tournaments: many games per strategy on the pure-Python
+# engines, spread over a process pool, to rank strategies by score.
+#
+# Game i of every strategy uses seed base + i, so strategies face the same
+# serves and food sequences. Games are handed out in batches of BATCH; a
+# worker plays a batch and sends back three arrays (scores, steps and
+# whether each game was cut off rather than lost), so
+# the parent only sees one small message per batch and the workers never
+# wait on each other. Each strategy's scores are tallied as a histogram,
+# which gives the mean, a 95% confidence interval and percentiles in
+# constant memory.
+#
+# With --checkpoint the finished batches and tallies are saved every
+# CHECKPOINT_EVERY seconds and on Ctrl-C; --resume picks the run up from
+# there. Batches are deterministic, so a resumed run ends with exactly the
+# results of an uninterrupted one.
+
+BATCH = 200              # games per task sent to a worker
+CHECKPOINT_EVERY = 30.0  # seconds between checkpoint saves
+MAX_STEPS = {'paddle': 200_000, 'snake': 50_000}  # a game is cut off here
+SNAKE_SIZE = 20          # board cells per side, as in snake_game
+STALL_BOARDS = 4         # snake games are also cut off after this many
+                         # board-fulls of moves without eating
+
+
+# Strategies: factory(state, rng) -> policy. Paddle policies return
+# (up, down) for a GameState, snake policies a direction for a SnakeState.
+
+def _paddle_tracking(state, rng):
+    return paddle_physics.tracking_bot
+
+
+def _paddle_lazy(state, rng):
+    # Only moves while the ball is coming towards the paddle
+    track = paddle_physics.tracking_bot
+
+    def policy(state):
+        if state.ball_vel_x > 0:
+            return False, False
+        return track(state)
+    return policy
+
+
+def _paddle_jittery(state, rng):
+    # Tracks the ball, but a fifth of the time repeats its last move
+    track = paddle_physics.tracking_bot
+    last = (False, False)
+
+    def policy(state):
+        nonlocal last
+        if rng.random() >= 0.2:
+            last = track(state)
+        return last
+    return policy
+
+
+def _snake_autopilot(state, rng):
+    pilot = snake_bot.Autopilot(state.snake, state.direction)
+    return lambda state: pilot.next_direction(state.food)
+
+
+def _safe_moves(state):
+    snake = state.snake
+    head = snake.head
+    moves = []
+    for direction in snake_rules.DIRECTIONS:
+        if direction == snake_rules.OPPOSITE[state.direction]:
+            continue
+        cell = (head[0] + direction[0], head[1] + direction[1])
+        if snake.in_bounds(cell) and cell not in snake:
+            moves.append((direction, cell))
+    return moves
+
+
+def _snake_greedy(state, rng):
+    # Straight for the food, never into a wall or itself on the next move
+    def policy(state):
+        moves = _safe_moves(state)
+        if not moves:
+            return state.direction
+        fx, fy = state.food
+        best = min(abs(cell[0] - fx) + abs(cell[1] - fy) for _, cell in moves)
+        return rng.choice([d for d, cell in moves if abs(cell[0] - fx) + abs(cell[1] - fy) == best])
+    return policy
+
+
+def _snake_random(state, rng):
+    def policy(state):
+        moves = _safe_moves(state)
+        return rng.choice(moves)[0] if moves else state.direction
+    return policy
+
+
+STRATEGIES = {
+    'paddle': {'tracking': _paddle_tracking, 'lazy': _paddle_lazy, 'jittery': _paddle_jittery},
+    'snake': {'autopilot': _snake_autopilot, 'greedy': _snake_greedy, 'random': _snake_random},
+}
+
+
+def play_paddle(strategy, seed, max_steps, size=None):
+    # One game; returns (score, steps, cut off). The seed picks the serve
+    # (height and vertical direction) and drives the strategy's own
+    # randomness.
+    rng = random.Random(seed)
+    state = paddle_physics.GameState()
+    state.ball_y = rng.randrange(paddle_physics.HEIGHT - paddle_physics.BALL_SIZE)
+    state.ball_vel_y = rng.choice((-1, 1)) * paddle_physics.BALL_SPEED_Y
+    policy = STRATEGIES['paddle'][strategy](state, rng)
+    step = paddle_physics.step
+    steps = 0
+    while not state.over and steps < max_steps:
+        step(state, *policy(state))
+        steps += 1
+    return state.score, steps, not state.over
+
+
+def play_snake(strategy, seed, max_steps, size=SNAKE_SIZE):
+    # One game on a size x size board; ends when the snake dies or fills
+    # it, or is cut off when it goes round in circles
+    state = snake_rules.SnakeState(size, size, seed)
+    rng = random.Random(f'strategy {seed}')  # independent of the food RNG
+    policy = STRATEGIES['snake'][strategy](state, rng)
+    step = snake_rules.step
+    stall = STALL_BOARDS * size * size
+    steps = 0
+    hungry = 0
+    while not state.over and state.food is not None and steps < max_steps and hungry < stall:
+        if step(state, policy(state)):
+            hungry = 0
+        else:
+            hungry += 1
+        steps += 1
+    return state.score, steps, not state.over and state.food is not None
+
+
+PLAY = {'paddle': play_paddle, 'snake': play_snake}
+
+
+def run_batch(task):
+    # Worker side: (game, strategy, first seed, count, max steps, size) ->
+    # (strategy, first seed, scores, steps, cut off)
+    game, strategy, first, count, max_steps, size = task
+    play = PLAY[game]
+    scores = array('l')
+    steps = array('l')
+    cut = array('b')
+    for seed in range(first, first + count):
+        score, n, stopped = play(strategy, seed, max_steps, size)
+        scores.append(score)
+        steps.append(n)
+        cut.append(stopped)
+    return strategy, first, scores, steps, cut
+
+
+def _quiet_worker():
+    # Ctrl-C is handled by the parent, which saves a checkpoint
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class Tally:
+    # Score histogram of one strategy
+    def __init__(self, scores=None, games=0, steps=0, capped=0):
+        self.scores = Counter(scores or {})
+        self.games = games
+        self.steps = steps
+        self.capped = capped  # games cut off rather than lost
+
+    def add(self, scores, steps, cut):
+        self.scores.update(scores)
+        self.games += len(scores)
+        self.steps += sum(steps)
+        self.capped += sum(cut)
+
+    def to_json(self):
+        return {'scores': {str(score): count for score, count in sorted(self.scores.items())},
+                'games': self.games, 'steps': self.steps, 'capped': self.capped}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({int(score): count for score, count in data['scores'].items()},
+                   data['games'], data['steps'], data['capped'])
+
+    def summary(self):
+        n = self.games
+        if not n:
+            return {'games': 0}
+        mean = sum(score * count for score, count in self.scores.items()) / n
+        variance = (sum((score - mean) ** 2 * count for score, count in self.scores.items()) / (n - 1)
+                    if n > 1 else 0.0)
+        half = 1.96 * math.sqrt(variance / n)
+        return {'games': n, 'mean': mean, 'sd': math.sqrt(variance),
+                'ci95': (mean - half, mean + half),
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99),
+                'max': max(self.scores), 'mean_steps': self.steps / n, 'capped': self.capped}
+
+    def percentile(self, p):
+        rank = math.ceil(p / 100 * self.games)
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen >= rank:
+                return score
+        return max(self.scores)
+
+
+class Tournament:
+    def __init__(self, game, strategies, games, seed=0, max_steps=None, size=SNAKE_SIZE, batch=BATCH):
+        for strategy in strategies:
+            if strategy not in STRATEGIES[game]:
+                raise ValueError(f'unknown {game} strategy {strategy!r}')
+        self.config = {'game': game, 'strategies': list(strategies), 'games': games, 'seed': seed,
+                       'max_steps': max_steps or MAX_STEPS[game], 'size': size, 'batch': batch}
+        self.tallies = {strategy: Tally() for strategy in strategies}
+        self.done = {strategy: set() for strategy in strategies}  # first seeds of finished batches
+
+    @classmethod
+    def load(cls, path):
+        persistence.recover(path)
+        with open(path) as f:
+            data = json.load(f)
+        config = data['config']
+        tournament = cls(config['game'], config['strategies'], config['games'], config['seed'],
+                         config['max_steps'], config['size'], config['batch'])
+        for strategy in config['strategies']:
+            tournament.tallies[strategy] = Tally.from_json(data['tallies'][strategy])
+            tournament.done[strategy] = set(data['done'][strategy])
+        return tournament
+
+    def save(self, path):
+        data = {'config': self.config,
+                'tallies': {strategy: tally.to_json() for strategy, tally in self.tallies.items()},
+                'done': {strategy: sorted(done) for strategy, done in self.done.items()}}
+        persistence.atomic_write(path, json.dumps(data))
+
+    def tasks(self):
+        # Unfinished batches, all strategies' batch k before any batch k+1
+        # so an interrupted run has comparable samples
+        c = self.config
+        first_seeds = range(c['seed'], c['seed'] + c['games'], c['batch'])
+        return [(c['game'], strategy, first, min(c['batch'], c['seed'] + c['games'] - first),
+                 c['max_steps'], c['size'])
+                for first in first_seeds for strategy in c['strategies']
+                if first not in self.done[strategy]]
+
+    def played(self):
+        return sum(tally.games for tally in self.tallies.values())
+
+    def run(self, workers=None, checkpoint=None, progress=None):
+        # Play every unfinished batch; workers=0 plays in this process.
+        # Saves to checkpoint (if given) periodically and when interrupted.
+        tasks = self.tasks()
+        last_save = time.monotonic()
+        pool = None
+        if workers == 0:
+            results = map(run_batch, tasks)
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_quiet_worker)
+            results = pool.imap_unordered(run_batch, tasks)
+        try:
+            for strategy, first, scores, steps, cut in results:
+                self.tallies[strategy].add(scores, steps, cut)
+                self.done[strategy].add(first)
+                if time.monotonic() - last_save >= CHECKPOINT_EVERY:
+                    last_save = time.monotonic()
+                    if checkpoint:
+                        self.save(checkpoint)
+                    if progress:
+                        progress(self)
+        except KeyboardInterrupt:
+            if pool is not None:
+                pool.terminate()
+            if checkpoint:
+                self.save(checkpoint)
+            raise
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if checkpoint:
+            self.save(checkpoint)
+
+    def ranking(self):
+        # [(strategy, summary)] best mean score first
+        summaries = [(strategy, tally.summary()) for strategy, tally in self.tallies.items()]
+        return sorted(summaries, key=lambda item: -item[1].get('mean', -1))
+
+
+def print_ranking(tournament):
+    print(f"{'strategy':<12}{'games':>9}{'mean':>9}{'95% CI':>19}{'p50':>6}{'p90':>6}{'p99':>6}"
+          f"{'max':>6}{'steps':>9}")
+    for strategy, s in tournament.ranking():
+        if not s['games']:
+            print(f'{strategy:<12}{0:>9}')
+            continue
+        lo, hi = s['ci95']
+        capped = f"  ({s['capped']} cut off)" if s['capped'] else ''
+        print(f"{strategy:<12}{s['games']:>9,}{s['mean']:>9.2f}{f'{lo:.2f} - {hi:.2f}':>19}{s['p50']:>6}"
+              f"{s['p90']:>6}{s['p99']:>6}{s['max']:>6}{s['mean_steps']:>9.0f}{capped}")
+
+
+def benchmark(game='paddle', strategy='tracking', games=2000, worker_counts=None):
+    # Games per second in this process and through pools of 1..cpu_count
+    # workers; near-linear scaling shows up as games/sec rising in step
+    # with workers
+    worker_counts = worker_counts or sorted({1, 2, os.cpu_count() or 1})
+    results = {}
+    for workers in [0] + worker_counts:
+        tournament = Tournament(game, [strategy], games)
+        start = time.perf_counter()
+        tournament.run(workers)
+        results[f'{workers} workers' if workers else 'in-process'] = games / (time.perf_counter() - start)
+    return results
+
+
+def _progress(tournament):
+    total = tournament.config['games'] * len(tournament.config['strategies'])
+    print(f'{tournament.played():,}/{total:,} games', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rank bot strategies over many headless games')
+    parser.add_argument('game', nargs='?', choices=sorted(STRATEGIES))
+    parser.add_argument('strategies', nargs='*', help='strategies to play (default: all)')
+    parser.add_argument('--games', type=int, default=10_000, help='games per strategy (default %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game (default %(default)s)')
+    parser.add_argument('--max-steps', type=int, help='cut games off after this many steps')
+    parser.add_argument('--size', type=int, default=SNAKE_SIZE, help='snake board size (default %(default)s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='processes, 0 to play in this one (default %(default)s)')
+    parser.add_argument('--checkpoint', metavar='FILE', help='save progress to FILE')
+    parser.add_argument('--resume', metavar='FILE', help='continue the run saved in FILE')
+    parser.add_argument('--json', metavar='FILE', help='write the results as JSON to FILE')
+    parser.add_argument('--benchmark', action='store_true', help='measure games/sec per worker count and exit')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for label, rate in benchmark(args.game or 'paddle', (args.strategies or ['tracking'])[0]).items():
+            print(f'{label:>12}: {rate:,.0f} games/sec')
+        sys.exit(0)
+    if args.resume:
+        tournament = Tournament.load(args.resume)
+        checkpoint = args.checkpoint or args.resume
+        print(f'Resuming: {tournament.played():,} games already played', file=sys.stderr)
+    elif args.game:
+        if args.checkpoint and os.path.exists(args.checkpoint):
+            parser.error(f'{args.checkpoint} exists; use --resume {args.checkpoint} to continue it')
+        tournament = Tournament(args.game, args.strategies or list(STRATEGIES[args.game]), args.games,
+                                args.seed, args.max_steps, args.size)
+        checkpoint = args.checkpoint
+    else:
+        parser.error('give a game to play, or --resume FILE')
+
+    start = time.perf_counter()
+    played = tournament.played()
+    try:
+        tournament.run(args.workers, checkpoint, _progress)
+    except KeyboardInterrupt:
+        print_ranking(tournament)
+        if checkpoint:
+            print(f'Interrupted; continue with --resume {checkpoint}', file=sys.stderr)
+        sys.exit(130)
+    elapsed = time.perf_counter() - start
+    print_ranking(tournament)
+    print(f'{tournament.played() - played:,} games in {elapsed:.1f}s '
+          f'({(tournament.played() - played) / elapsed:,.0f} games/sec, {args.workers} workers)')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': tournament.config,
+                       'results': {strategy: summary for strategy, summary in tournament.ranking()}}, f, indent=2)